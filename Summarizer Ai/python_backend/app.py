@@ -6,65 +6,87 @@ Supports 22+ Indian languages with AI-powered summarization
 
 import os
 import re
+import atexit
+import copy
 import json
 import math
+import time
+import threading
+from array import array
 from datetime import datetime
-from collections import Counter, defaultdict
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass, asdict
-import unicodedata
+from collections import Counter
+from bisect import bisect_right
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Tuple, Optional, Any, Union
+from dataclasses import dataclass, field, replace
+
+# Start of the import, for the reported boot time
+_import_started = time.perf_counter()
+
+from config import Config
+from corpus_stats import DocumentFrequencies, IdfTable
+from batch_executor import IN_POOL_WORKER, BatchExecutor
+from cache import LRUCache
+from deadline import Deadline, stage_costs
+from dedup import MinHasher, NearDuplicateIndex
+from metrics import STAGE_METRIC, language_label, metrics_registry, size_bucket
+from ratelimit import AdmissionController, RequestGate, TokenBucketLimiter
+from models import (LanguageDetectionResult, SummaryBatch, SummaryResult, TextStats,
+                    create_summary_options, parse_summary_fields)
+from tokenizer import tokenizer_engine, STOPWORDS
+from script_detector import script_detector
+from scoring import DocumentScores, SparseScoringEngine, mmr_select, textrank
+from search import SearchIndex
+from store import SummaryStore
+from streaming import StreamingSentenceSplitter, StreamLimitExceeded, decode_chunks, limit_chunks, sentence_pattern
+from utils import PerformanceUtils, SecurityUtils
 
 # For a production environment, you would install these packages:
-# pip install flask flask-cors nltk textstat langdetect numpy scikit-learn
+# pip install flask flask-cors langdetect numpy scipy
 
+# langdetect, scipy and nltk are imported on first use (see warmup()), and
+# nothing is downloaded at import time, so workers start fast and offline.
 try:
-    from flask import Flask, request, jsonify, cors
+    from flask import Flask, Response, g, request, stream_with_context
     from flask_cors import CORS
-    import nltk
-    from nltk.corpus import stopwords
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    from nltk.stem import PorterStemmer
-    import textstat
-    from langdetect import detect, DetectorFactory
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
     import numpy as np
     
-    # Set seed for consistent language detection
-    DetectorFactory.seed = 0
-    
-    # Download required NLTK data
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    
 except ImportError:
     print("Required packages not installed. This is a demonstration of the Python backend structure.")
-    print("To run this backend, install: pip install flask flask-cors nltk textstat langdetect numpy scikit-learn")
+    print("To run this backend, install: pip install flask flask-cors langdetect numpy scipy")
 
-@dataclass
-class TextStats:
-    characters: int
-    words: int
-    sentences: int
-    paragraphs: int
-    reading_time: int
+# Optional: orjson encodes responses several times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 @dataclass
-class SummaryResult:
-    id: str
-    summary: str
-    original_text: str
+class AnalyzedDocument:
+    """Single-pass analysis of a text shared by stats, keywords, scoring and confidence"""
+    text: str
     language: str
-    original_stats: TextStats
-    summary_stats: TextStats
-    compression_ratio: float
-    keywords: List[str]
-    confidence: float
-    created_at: str
-    is_public: bool
-    likes: int
-    comments: List[Dict]
-    shares: int
+    sentence_spans: List[Tuple[int, int]]
+    sentence_tokens: List[List[int]]
+    sentence_word_counts: List[int]
+    vocabulary: List[str]
+    word_freq: Counter  # token id -> occurrences across the whole text
+    word_count: int
+    paragraph_count: int
+    char_count: int  # of the source text; `text` holds only the sentences of streamed input
+    skipped_sentences: int = 0  # left out of sentence_spans to meet a deadline
+    scores: Optional[DocumentScores] = field(default=None, repr=False, compare=False)
+    pattern_masks: Dict[str, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+    
+    @property
+    def sentences(self) -> List[str]:
+        return [self.text[start:end] for start, end in self.sentence_spans]
+    
+    def sentence(self, index: int) -> str:
+        start, end = self.sentence_spans[index]
+        return self.text[start:end]
 
 class IndianLanguageProcessor:
     """Advanced processor for Indian languages with script detection and processing"""
@@ -83,84 +105,337 @@ class IndianLanguageProcessor:
             'pa': {'name': 'Punjabi', 'script': 'Gurmukhi', 'range': (0x0A00, 0x0A7F)},
             'ur': {'name': 'Urdu', 'script': 'Arabic', 'range': (0x0600, 0x06FF)},
             'as': {'name': 'Assamese', 'script': 'Bengali', 'range': (0x0980, 0x09FF)},
+            'ne': {'name': 'Nepali', 'script': 'Devanagari', 'range': (0x0900, 0x097F)},
+            'sa': {'name': 'Sanskrit', 'script': 'Devanagari', 'range': (0x0900, 0x097F)},
+            'mai': {'name': 'Maithili', 'script': 'Devanagari', 'range': (0x0900, 0x097F)},
         }
         
-        self.indian_stopwords = {
-            'hi': {'और', 'का', 'के', 'की', 'को', 'में', 'से', 'पर', 'है', 'हैं', 'था', 'थे', 'यह', 'वह', 'इस', 'उस', 'एक', 'दो', 'तीन', 'चार', 'पांच'},
-            'bn': {'এবং', 'বা', 'কিন্তু', 'যে', 'যা', 'এই', 'সেই', 'একটি', 'একটা', 'হয়', 'হয়েছে', 'করা', 'করে', 'থেকে', 'সাথে', 'জন্য', 'দিয়ে'},
-            'te': {'మరియు', 'లేదా', 'కానీ', 'అని', 'ఇది', 'అది', 'ఒక', 'రెండు', 'మూడు', 'నాలుగు', 'అయిన', 'అయినది', 'చేసిన', 'చేసింది', 'లో', 'తో'},
-            'ta': {'மற்றும்', 'அல்லது', 'ஆனால்', 'என்று', 'இது', 'அது', 'ஒரு', 'இரண்டு', 'மூன்று', 'நான்கு', 'ஆகும்', 'செய்த', 'செய்யும்', 'இல்', 'உடன்'},
-            'mr': {'आणि', 'किंवा', 'पण', 'म्हणून', 'हे', 'ते', 'एक', 'दोन', 'तीन', 'चार', 'आहे', 'होते', 'केले', 'करणे', 'मध्ये', 'सोबत'},
-            'gu': {'અને', 'અથવા', 'પણ', 'કે', 'આ', 'તે', 'એક', 'બે', 'ત્રણ', 'ચાર', 'છે', 'હતું', 'કર્યું', 'કરવું', 'માં', 'સાથે'},
-            'en': {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the', 'to', 'was', 'will', 'with'}
-        }
+        # Languages written in each script, in order of preference. Scripts with a
+        # single language are decided from the script histogram alone.
+        self.script_detector = script_detector
+        self.script_candidates: Dict[str, List[str]] = {}
+        for lang_code, lang_info in self.language_scripts.items():
+            self.script_candidates.setdefault(lang_info['script'].lower(), []).append(lang_code)
+        
+        self.detection_cache = LRUCache(Config.LANGUAGE_DETECTION_CACHE_SIZE)
+        self.langdetect_sample_size = Config.LANGDETECT_SAMPLE_SIZE
+        self._detect_langs = None
+        self._langdetect_lock = threading.Lock()
         
+        self.tokenizer = tokenizer_engine
+        self.indian_stopwords = STOPWORDS
+        
+        self.sentence_delimiter_chars = {
+            'hi': '.!?।॥',
+            'bn': '.!?।॥',
+            'te': '.!?।॥',
+            'ta': '.!?।॥',
+            'mr': '.!?।॥',
+            'gu': '.!?।॥',
+            'en': '.!?',
+            'default': '.!?।॥'
+        }
         self.sentence_delimiters = {
-            'hi': r'[.!?।॥]+',
-            'bn': r'[.!?।॥]+',
-            'te': r'[.!?।॥]+',
-            'ta': r'[.!?।॥]+',
-            'mr': r'[.!?।॥]+',
-            'gu': r'[.!?।॥]+',
-            'en': r'[.!?]+',
-            'default': r'[.!?।॥]+'
+            language: '[' + re.escape(chars) + ']+'
+            for language, chars in self.sentence_delimiter_chars.items()
+        }
+        # A sentence is a run of non-delimiters that starts and ends on a non-space
+        # character, so a single finditer yields the stripped sentence spans
+        self.sentence_patterns = {
+            language: sentence_pattern(chars)
+            for language, chars in self.sentence_delimiter_chars.items()
         }
 
     def detect_language(self, text: str) -> str:
         """Detect language based on script and content analysis"""
+        return self.detect_language_details(text).detected_language
+
+    def detect_language_details(self, text: str, langdetect_sample: Optional[int] = None) -> LanguageDetectionResult:
+        """Detect language with a confidence score, memoized by content hash.
+        
+        langdetect_sample lowers the number of characters langdetect reads, for
+        callers short of time (0 decides from the script alone); detections made
+        from a smaller sample are not memoized.
+        """
+        key = SecurityUtils.hash_text(text)
+        cached = self.detection_cache.get(key)
+        if cached is not None:
+            metrics_registry.inc('summarizer_language_detections_total', (('tier', cached.tier), ('cached', 'true')))
+            return cached
+        
+        with metrics_registry.stage('detect_language', size=len(text)) as timer:
+            result = self._detect_language_uncached(text, langdetect_sample)
+            timer.set_language(result.detected_language)
+        metrics_registry.inc('summarizer_language_detections_total', (('tier', result.tier), ('cached', 'false')))
+        if langdetect_sample is None or langdetect_sample >= self.langdetect_sample_size:
+            self.detection_cache.set(key, result)
+        return result
+
+    def _detect_language_uncached(self, text: str, langdetect_sample: Optional[int] = None) -> LanguageDetectionResult:
+        """Tiered detection: script histogram first, langdetect only when the script is shared"""
+        sampled = langdetect_sample is not None and langdetect_sample < min(len(text), self.langdetect_sample_size)
+        script_counts = self.script_detector.histogram(text, sample=True)
+        script_total = sum(script_counts.values())
+        
+        if script_total == 0:
+            # No Indian script at all, so the text can only be English
+            probabilities = self._langdetect_probabilities(text, langdetect_sample)
+            confidence = probabilities.get('en', 0.0) if probabilities else 0.5
+            return self._detection_result('en', confidence, 'default')
+        
+        script = max(self.script_candidates, key=lambda name: script_counts.get(name, 0))
+        script_share = script_counts[script] / script_total
+        candidates = self.script_candidates[script]
+        
+        if len(candidates) == 1:
+            return self._detection_result(candidates[0], script_share, 'script')
+        
+        # Shared script (e.g. Devanagari for hi/mr/ne): let langdetect choose among its languages
+        probabilities = self._langdetect_probabilities(text, langdetect_sample)
+        best = max(candidates, key=lambda code: probabilities.get(code, 0.0))
+        if probabilities.get(best, 0.0) == 0.0:
+            tier = 'script_only' if langdetect_sample == 0 else 'script'
+            return self._detection_result(candidates[0], script_share / len(candidates), tier)
+        
+        alternatives = [
+            {'language': code, 'confidence': round(script_share * probabilities[code], 4)}
+            for code in candidates
+            if code != best and probabilities.get(code, 0.0) > 0.0
+        ]
+        return self._detection_result(best, script_share * probabilities[best],
+                                      'langdetect_sampled' if sampled else 'langdetect', alternatives)
+
+    def load_langdetect(self):
+        """Import langdetect and load its language profiles, once per process"""
+        if self._detect_langs is None:
+            with self._langdetect_lock:
+                if self._detect_langs is None:
+                    from langdetect import DetectorFactory, detect_langs
+                    from langdetect.detector_factory import init_factory
+                    
+                    # Set seed for consistent language detection
+                    DetectorFactory.seed = 0
+                    init_factory()
+                    self._detect_langs = detect_langs
+        return self._detect_langs
+    
+    def _langdetect_probabilities(self, text: str, sample_size: Optional[int] = None) -> Dict[str, float]:
+        """Run langdetect on a bounded sample of the text"""
+        if sample_size is None or sample_size > self.langdetect_sample_size:
+            sample_size = self.langdetect_sample_size
+        if sample_size <= 0:
+            return {}
+        sample = text[:sample_size]
+        if len(text) > sample_size:
+            # Do not hand langdetect a cut-off word
+            sample = sample.rsplit(None, 1)[0]
         try:
-            # First try automatic detection
-            detected = detect(text)
-            if detected in self.language_scripts:
-                return detected
-        except:
-            pass
-        
-        # Fallback to script-based detection
-        char_counts = defaultdict(int)
-        for char in text:
-            code_point = ord(char)
-            for lang_code, lang_info in self.language_scripts.items():
-                start, end = lang_info['range']
-                if start <= code_point <= end:
-                    char_counts[lang_code] += 1
-        
-        if char_counts:
-            return max(char_counts, key=char_counts.get)
-        
-        return 'en'  # Default to English
-
-    def get_stopwords(self, language: str) -> set:
+            detect_langs = self.load_langdetect()
+            with metrics_registry.stage('langdetect', size=len(sample)), stage_costs.timed('langdetect', len(sample)):
+                return {result.lang: result.prob for result in detect_langs(sample)}
+        except Exception:
+            return {}
+
+    def _detection_result(self, language: str, confidence: float, tier: str,
+                          alternatives: Optional[List[Dict[str, Any]]] = None) -> LanguageDetectionResult:
+        language_info = self.language_scripts.get(language, {})
+        return LanguageDetectionResult(
+            detected_language=language,
+            language_name=language_info.get('name', 'Unknown'),
+            script=language_info.get('script', 'Unknown'),
+            confidence=round(confidence, 4),
+            alternatives=alternatives or [],
+            tier=tier
+        )
+
+    def get_stopwords(self, language: str) -> FrozenSet[str]:
         """Get stopwords for the specified language"""
-        return self.indian_stopwords.get(language, self.indian_stopwords['en'])
+        return self.tokenizer.get_stopwords(language)
 
     def tokenize_text(self, text: str, language: str) -> List[str]:
         """Tokenize text based on language-specific rules"""
-        # Remove punctuation and normalize
-        text = re.sub(r'[^\w\s\u0900-\u097F\u0980-\u09FF\u0C00-\u0C7F\u0B80-\u0BFF\u0600-\u06FF\u0A80-\u0AFF\u0C80-\u0CFF\u0D00-\u0D7F\u0B00-\u0B7F\u0A00-\u0A7F]', ' ', text)
+        with metrics_registry.stage('tokenize', language, len(text)):
+            return self.tokenizer.tokenize(text, language)
+
+    def tokenize_sentences(self, sentences: List[str], language: str) -> List[List[str]]:
+        """Tokenize many sentences of the same language in one call"""
+        return self.tokenizer.tokenize_batch(sentences, language)
+
+    def split_sentences(self, text: str, language: str) -> List[str]:
+        """Split text into sentences based on language-specific delimiters"""
+        return [text[start:end] for start, end in self.sentence_spans(text, language)]
+
+    def sentence_spans(self, text: str, language: str) -> List[Tuple[int, int]]:
+        """Return (start, end) offsets of the stripped, non-empty sentences in text"""
+        return list(self.iter_sentence_spans(text, language))
+    
+    def iter_sentence_spans(self, text: str, language: str) -> Iterator[Tuple[int, int]]:
+        """Lazily yield the (start, end) offsets of sentences, for texts too long to split at once"""
+        pattern = self.sentence_patterns.get(language, self.sentence_patterns['default'])
+        return (match.span() for match in pattern.finditer(text))
+
+    def analyze(self, text: str, language: str, max_chars: Optional[int] = None) -> AnalyzedDocument:
+        """Split and tokenize text once, interning tokens into a per-document vocabulary.
+        
+        With max_chars, a text whose sentences are longer in total is analyzed
+        from an evenly spaced subset of them (see AnalyzedDocument.skipped_sentences).
+        """
+        with metrics_registry.stage('analyze', language, len(text)), \
+                stage_costs.timed('analyze', len(text)) as cost:
+            document = self._analyze(text, language, max_chars)
+            if document.skipped_sentences:
+                cost.units = 0  # Splitting still read the whole text: only full runs refine the estimate
+            return document
+    
+    def _analyze(self, text: str, language: str, max_chars: Optional[int] = None) -> AnalyzedDocument:
+        spans = self.sentence_spans(text, language)
+        skipped = 0
+        if max_chars is not None and len(spans) > Config.DEADLINE_MIN_SENTENCES:
+            total = sum(end - start for start, end in spans)
+            keep = max(Config.DEADLINE_MIN_SENTENCES, int(len(spans) * max_chars / total))
+            if keep < len(spans):
+                # Evenly spaced, from the first sentence to the last
+                skipped = len(spans) - keep
+                spans = [spans[i * (len(spans) - 1) // (keep - 1)] for i in range(keep)]
+        sentences = [text[start:end] for start, end in spans]
+        
+        # Intern tokens: setdefault hands out the next id the first time a word is seen
+        term_ids: Dict[str, int] = {}
+        intern = term_ids.setdefault
+        sentence_tokens = [
+            [intern(word, len(term_ids)) for word in words]
+            for words in self.tokenize_sentences(sentences, language)
+        ]
+        
+        return AnalyzedDocument(
+            text=text,
+            language=language,
+            sentence_spans=spans,
+            sentence_tokens=sentence_tokens,
+            sentence_word_counts=[len(sentence.split()) for sentence in sentences],
+            vocabulary=list(term_ids),
+            word_freq=Counter(chain.from_iterable(sentence_tokens)),
+            word_count=len(text.split()),
+            paragraph_count=len([p for p in text.split('\n\n') if p.strip()]),
+            char_count=len(text),
+            skipped_sentences=skipped
+        )
+    
+    def sentence_splitter(self, language: str) -> StreamingSentenceSplitter:
+        """Incremental splitter with the sentence delimiters of a language"""
+        return StreamingSentenceSplitter(self.sentence_delimiter_chars.get(language, self.sentence_delimiter_chars['default']))
+    
+    def analyze_stream(self, chunks: Iterable[Union[str, bytes]], language: Optional[str] = None) -> AnalyzedDocument:
+        """Split and tokenize a stream of text or UTF-8 chunks as they arrive.
         
-        # Split into words
-        words = text.lower().split()
+        Word frequencies and per-sentence token ids grow with every chunk, and the
+        stream is never joined: the document keeps only its sentences, one per
+        line, as its text. Without a language, it is detected on the first
+        LANGDETECT_SAMPLE_SIZE characters.
+        """
+        chunks = decode_chunks(chunks)
+        if language is None:
+            head: List[str] = []
+            size = 0
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= self.langdetect_sample_size:
+                    break
+            language = self.detect_language(''.join(head))
+            chunks = chain(head, chunks)
         
-        # Remove stopwords
-        stopwords_set = self.get_stopwords(language)
-        filtered_words = [word for word in words if word not in stopwords_set and len(word) > 1]
+        splitter = self.sentence_splitter(language)
+        tokenizer = self.tokenizer.get(language)
+        term_ids: Dict[str, int] = {}
+        intern = term_ids.setdefault
+        sentences: List[str] = []
+        sentence_tokens: List[List[int]] = []
+        word_freq: Counter = Counter()
         
-        return filtered_words
+        def add(batch: List[str]) -> None:
+            tokens = [[intern(word, len(term_ids)) for word in words] for words in tokenizer.tokenize_batch(batch)]
+            sentences.extend(batch)
+            sentence_tokens.extend(tokens)
+            word_freq.update(chain.from_iterable(tokens))
+        
+        with metrics_registry.stage('analyze_stream', language) as timer:
+            for chunk in chunks:
+                add(splitter.feed(chunk))
+            add(splitter.close())
+            timer.set_size(splitter.char_count)
+        
+        # Offsets of the sentences in their newline-joined text
+        spans = []
+        position = 0
+        for sentence in sentences:
+            spans.append((position, position + len(sentence)))
+            position += len(sentence) + 1
+        
+        return AnalyzedDocument(
+            text='\n'.join(sentences),
+            language=language,
+            sentence_spans=spans,
+            sentence_tokens=sentence_tokens,
+            sentence_word_counts=[len(sentence.split()) for sentence in sentences],
+            vocabulary=list(term_ids),
+            word_freq=word_freq,
+            word_count=splitter.word_count,
+            paragraph_count=splitter.paragraph_count,
+            char_count=splitter.char_count
+        )
 
-    def split_sentences(self, text: str, language: str) -> List[str]:
-        """Split text into sentences based on language-specific delimiters"""
-        delimiter_pattern = self.sentence_delimiters.get(language, self.sentence_delimiters['default'])
-        sentences = re.split(delimiter_pattern, text)
-        return [s.strip() for s in sentences if s.strip()]
+PARAGRAPH_BREAK = re.compile('\n\n')
 
 class AdvancedSummarizer:
     """Advanced multilingual text summarizer with AI-powered features"""
     
+    # Sentences mentioning these words get a score boost
+    IMPORTANT_KEYWORDS = ('महत्वपूर्ण', 'important', 'significant', 'मुख्य', 'main', 'key', 'प्रमुख')
+    IMPORTANT_KEYWORD_PATTERN = re.compile('|'.join(map(re.escape, IMPORTANT_KEYWORDS)), re.IGNORECASE)
+    NUMBER_PATTERN = re.compile(r'\d+')
+    
+    # Share of sentences kept for each summary length
+    LENGTH_RATIOS = {'short': 0.25, 'medium': 0.4, 'long': 0.6}
+    
+    # Sentence selection: by score alone, by maximal marginal relevance, or by centrality in the sentence graph
+    SELECTION_MODES = ('score', 'mmr', 'textrank')
+    
     def __init__(self):
         self.language_processor = IndianLanguageProcessor()
-        self.stemmer = PorterStemmer()
+        self._stemmer = None
+        self.scoring_engine = SparseScoringEngine()
+        # Every process maps the same table; its pages are shared, not copied
+        self.corpus_idf = IdfTable(Config.CORPUS_IDF_PATH, Config.CORPUS_IDF_MIN_DOCUMENTS,
+                                   Config.CORPUS_IDF_RELOAD_INTERVAL) if Config.CORPUS_IDF_ENABLED else None
+        
+        # Repeated articles (the same wire story from many users) skip the pipeline
+        if Config.SUMMARY_CACHE_ENABLED:
+            self.summary_cache = LRUCache(Config.SUMMARY_CACHE_SIZE, Config.SUMMARY_CACHE_TTL)
+            self.keyword_cache = LRUCache(Config.SUMMARY_CACHE_SIZE, Config.SUMMARY_CACHE_TTL)
+        else:
+            self.summary_cache = None
+            self.keyword_cache = None
         
+        # Edited copies of an article reuse the summary of an earlier copy. Pool workers
+        # only see their share of a batch, so the request process keeps the index.
+        if Config.NEAR_DUPLICATE_ENABLED and not IN_POOL_WORKER:
+            self.min_hasher = MinHasher(Config.NEAR_DUPLICATE_PERMUTATIONS, Config.NEAR_DUPLICATE_SHINGLE_SIZE)
+            self.duplicate_index = self.new_duplicate_index(Config.NEAR_DUPLICATE_INDEX_SIZE)
+            self.signature_cache = LRUCache(Config.SUMMARY_CACHE_SIZE)
+        else:
+            self.min_hasher = None
+            self.duplicate_index = None
+            self.signature_cache = None
+        
+    @property
+    def stemmer(self):
+        """NLTK Porter stemmer, imported on first use (importing nltk takes about a second)"""
+        if self._stemmer is None:
+            from nltk.stem import PorterStemmer
+            self._stemmer = PorterStemmer()
+        return self._stemmer
+    
     def calculate_text_stats(self, text: str) -> TextStats:
         """Calculate comprehensive text statistics"""
         characters = len(text)
@@ -171,64 +446,355 @@ class AdvancedSummarizer:
         
         return TextStats(characters, words, sentences, paragraphs, reading_time)
     
-    def extract_keywords(self, text: str, language: str, num_keywords: int = 10) -> List[str]:
-        """Extract keywords using TF-IDF and frequency analysis"""
-        words = self.language_processor.tokenize_text(text, language)
-        
-        if not words:
-            return []
+    @staticmethod
+    def count_paragraphs(text: str) -> int:
+        """Number of non-blank paragraphs, without splitting the whole text into a list"""
+        count = 0
+        start = 0
+        for match in PARAGRAPH_BREAK.finditer(text):
+            if match.start() > start and not text[start:match.start()].isspace():
+                count += 1
+            start = match.end()
+        if start < len(text) and not text[start:].isspace():
+            count += 1
+        return count
+    
+    def calculate_document_stats(self, document: AnalyzedDocument) -> TextStats:
+        """Calculate text statistics from an already analyzed document"""
+        with metrics_registry.stage('stats', document.language, len(document.text)):
+            words = document.word_count
+            reading_time = max(1, math.ceil(words / 200))  # 200 words per minute
+            return TextStats(document.char_count, words, len(document.sentence_spans) + document.skipped_sentences,
+                             document.paragraph_count, reading_time)
+    
+    def extract_keywords(self, text: str, language: str, num_keywords: int = 10,
+                         document: Optional[AnalyzedDocument] = None) -> List[str]:
+        """Extract keywords ranked by TF-IDF weight across the sentences of the text (times corpus IDF)"""
+        if document is not None:
+            return self.score_document(document).top_terms(document.vocabulary, num_keywords)
         
-        # Calculate word frequency
-        word_freq = Counter(words)
+        cache_key = None
+        if self.keyword_cache is not None:
+            cache_key = (SecurityUtils.hash_text(text), language, num_keywords)
+            cached = self.keyword_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
         
-        # Get top keywords by frequency
-        keywords = [word for word, freq in word_freq.most_common(num_keywords)]
+        with metrics_registry.stage('keywords', language, len(text)):
+            document = self.language_processor.analyze(text, language)
+            keywords = self.score_document(document).top_terms(document.vocabulary, num_keywords)
         
+        if cache_key is not None:
+            self.keyword_cache.set(cache_key, tuple(keywords))
         return keywords
     
-    def calculate_sentence_scores(self, sentences: List[str], word_freq: Dict[str, int], language: str) -> List[Tuple[str, float, int]]:
+    def score_document(self, document: AnalyzedDocument) -> DocumentScores:
+        """Sparse-matrix scores of a document, computed once and kept on it"""
+        if document.scores is None:
+            with metrics_registry.stage('score', document.language, len(document.text)), \
+                    stage_costs.timed('score', 0 if document.skipped_sentences else len(document.text)):
+                document.scores = self.scoring_engine.score_document(document, self.corpus_weights(document))
+        return document.scores
+    
+    def corpus_weights(self, document: AnalyzedDocument) -> Optional[np.ndarray]:
+        """Corpus IDF of each vocabulary term, or None until the language has enough documents"""
+        if self.corpus_idf is None:
+            return None
+        return self.corpus_idf.idf(document.language, document.vocabulary)
+    
+    def score_documents(self, documents: List[AnalyzedDocument]) -> None:
+        """Score all documents of a batch with a single sparse matrix"""
+        unscored = [document for document in documents if document.scores is None]
+        with metrics_registry.stage('score_batch', size=sum(len(document.text) for document in unscored)):
+            term_idf = [self.corpus_weights(document) for document in unscored]
+            for document, scores in zip(unscored, self.scoring_engine.score_documents(unscored, term_idf)):
+                document.scores = scores
+    
+    def calculate_sentence_scores(self, document: AnalyzedDocument, mode: Optional[str] = None) -> np.ndarray:
         """Calculate importance scores for sentences"""
-        scored_sentences = []
+        scores = self.score_document(document)
+        num_sentences = len(document.sentence_spans)
         
-        for idx, sentence in enumerate(sentences):
-            words = self.language_processor.tokenize_text(sentence, language)
-            
-            if not words:
-                scored_sentences.append((sentence, 0.0, idx))
+        # Boost factors
+        boost = np.ones(num_sentences)
+        
+        # Position boost (first and last sentences are often important)
+        if num_sentences:
+            boost[0] += 0.2
+        if num_sentences > 1:
+            boost[-1] += 0.2
+        
+        # Length boost (moderate length sentences are preferred)
+        boost += 0.1 * ((scores.token_counts >= 10) & (scores.token_counts <= 30))
+        
+        # Number boost (sentences with numbers often contain facts)
+        boost += 0.15 * self._sentences_matching(document, self.NUMBER_PATTERN)
+        
+        # Keyword boost (sentences with important keywords)
+        boost += 0.25 * self._sentences_matching(document, self.IMPORTANT_KEYWORD_PATTERN)
+        
+        # Base score from word frequency, or from TextRank centrality
+        if mode == 'textrank':
+            return self.textrank_scores(document) * boost
+        return scores.base_scores * boost
+    
+    def textrank_scores(self, document: AnalyzedDocument) -> np.ndarray:
+        """TextRank centrality of each sentence (mean 1) over the shared-term similarity graph"""
+        tfidf = self.score_document(document).tfidf
+        with metrics_registry.stage('textrank', document.language, len(document.text)), \
+                stage_costs.timed('textrank', len(document.sentence_spans)):
+            ranks, _ = textrank(tfidf, Config.TEXTRANK_DAMPING, Config.TEXTRANK_TOLERANCE,
+                                Config.TEXTRANK_MAX_ITERATIONS, Config.TEXTRANK_MAX_POSTINGS)
+        return ranks
+    
+    def _sentences_matching(self, document: AnalyzedDocument, pattern: re.Pattern) -> np.ndarray:
+        """Boolean mask of sentences containing a match, searching the text in place"""
+        cached = document.pattern_masks.get(pattern.pattern)
+        if cached is not None:
+            return cached
+        
+        matched = np.zeros(len(document.sentence_spans), dtype=bool)
+        starts = [start for start, _ in document.sentence_spans]
+        search = pattern.search
+        text = document.text
+        
+        if document.skipped_sentences:
+            # Sampled sentences: searching between them would only find matches to throw away
+            for idx, (start, end) in enumerate(document.sentence_spans):
+                matched[idx] = search(text, start, end) is not None
+            document.pattern_masks[pattern.pattern] = matched
+            return matched
+        
+        # After a hit, resume at the end of that sentence: at most one search per sentence
+        match = search(text)
+        while match is not None:
+            position = match.start()
+            idx = bisect_right(starts, position) - 1
+            if idx >= 0 and position < document.sentence_spans[idx][1]:
+                matched[idx] = True
+                resume = document.sentence_spans[idx][1]
+            else:
+                resume = position + 1
+            match = search(text, resume)
+        document.pattern_masks[pattern.pattern] = matched
+        return matched
+    
+    def summarize_text(self, text: str, options: Dict[str, Any],
+                       deadline: Optional[Deadline] = None) -> SummaryResult:
+        """Generate comprehensive text summary, served from the result cache when possible.
+        
+        Under a deadline, stages take cheaper paths when the remaining budget is
+        short and record them on it; such results are not cached.
+        """
+        cached = self.cached_summary(text, options, deadline)
+        if cached is not None:
+            return cached
+        
+        with metrics_registry.stage('summarize', size=len(text)) as timer:
+            result = self._summarize_text_uncached(text, options, deadline)
+            timer.set_language(result.language)
+        if deadline is None or not deadline.shortcuts:
+            self.store_summary(text, options, result)
+        return result
+    
+    def cached_summary(self, text: str, options: Dict[str, Any],
+                       deadline: Optional[Deadline] = None) -> Optional[SummaryResult]:
+        """Return a cached summary of text (or of a near-duplicate of it) with a fresh id, or None"""
+        if self.summary_cache is not None:
+            cached = self.summary_cache.get(self._summary_cache_key(text, options))
+            if cached is not None:
+                return replace(cached, id=self._generate_id(), original_text=text,
+                               created_at=datetime.now().isoformat(), reused=True)
+        if deadline is not None and self.min_hasher is not None and \
+                self._pipeline_cost_ms(text, 'signature') > deadline.remaining_ms():
+            # A signature tokenizes the whole text: too slow for a budget the pipeline itself barely fits
+            deadline.take_shortcut('near_duplicate_lookup_skipped')
+            return None
+        return self.near_duplicate_summary(text, options)
+    
+    def _pipeline_cost_ms(self, text: str, *extra_stages: str) -> float:
+        """Estimated cost of detecting the language of text, analyzing and scoring it, and extra_stages"""
+        langdetect = stage_costs.estimate('langdetect', min(len(text), self.language_processor.langdetect_sample_size))
+        return langdetect + stage_costs.estimate('analyze', len(text)) + stage_costs.estimate('score', len(text)) + \
+            sum(stage_costs.estimate(stage, len(text)) for stage in extra_stages)
+    
+    def store_summary(self, text: str, options: Dict[str, Any], result: SummaryResult) -> None:
+        """Remember a summary computed here or in a batch worker process"""
+        if self.summary_cache is None and self.duplicate_index is None:
+            return
+        
+        # The caller always has the original text, so neither index keeps a copy
+        stored = replace(result, original_text='')
+        if self.summary_cache is not None:
+            self.summary_cache.set(self._summary_cache_key(text, options), stored)
+        signature = self.duplicate_signature(text, options)
+        if signature is not None:
+            self.duplicate_index.add(SecurityUtils.hash_text(text), signature, stored, self._options_key(options))
+    
+    def _summary_cache_key(self, text: str, options: Dict[str, Any]) -> Tuple:
+        """Content hash plus the normalized options that influence the result"""
+        return (SecurityUtils.hash_text(text),) + self._options_key(options)
+    
+    def _options_key(self, options: Dict[str, Any]) -> Tuple:
+        """The normalized options that influence the result"""
+        normalized = create_summary_options(options).to_dict()
+        if normalized['length'] not in self.LENGTH_RATIOS:
+            normalized['length'] = Config.DEFAULT_SUMMARY_LENGTH
+        if normalized['mode'] not in self.SELECTION_MODES:
+            normalized['mode'] = 'score'
+        if normalized['mode'] == 'mmr':
+            normalized['mmr_lambda'] = self._mmr_lambda(options)
+        else:
+            del normalized['mmr_lambda']
+        # Results computed under a deadline are not cached, so it does not split the cache
+        del normalized['deadline_ms']
+        return (
+            tuple(sorted(normalized.items())),
+            bool(options.get('is_public', False))
+        )
+    
+    @staticmethod
+    def new_duplicate_index(maxsize: int) -> NearDuplicateIndex:
+        """Near-duplicate index with the configured signature layout and threshold"""
+        return NearDuplicateIndex(Config.NEAR_DUPLICATE_PERMUTATIONS, Config.NEAR_DUPLICATE_BANDS,
+                                  Config.NEAR_DUPLICATE_THRESHOLD, maxsize)
+    
+    def duplicate_signature(self, text: str, options: Dict[str, Any]) -> Optional[np.ndarray]:
+        """MinHash signature of the tokens of text, memoized by content; None when detection is off"""
+        if self.min_hasher is None or not text.strip():
+            return None
+        
+        language = options.get('language') or self.language_processor.detect_language(text)
+        key = (SecurityUtils.hash_text(text), language)
+        signature = self.signature_cache.get(key)
+        if signature is None:
+            with metrics_registry.stage('signature', language, len(text)), stage_costs.timed('signature', len(text)):
+                signature = self.min_hasher.signature(self.language_processor.tokenize_text(text, language))
+            if signature is not None:
+                self.signature_cache.set(key, signature)
+        return signature
+    
+    def near_duplicate_summary(self, text: str, options: Dict[str, Any]) -> Optional[SummaryResult]:
+        """Summary of a recently summarized near-duplicate of text, or None"""
+        signature = self.duplicate_signature(text, options)
+        if signature is None:
+            return None
+        
+        match = self.duplicate_index.query(signature, self._options_key(options))
+        if match is None:
+            return None
+        metrics_registry.inc('summarizer_near_duplicates_total', (('scope', 'recent'),))
+        return self.reuse_summary(match[1], text)
+    
+    def reuse_summary(self, source: SummaryResult, text: str) -> SummaryResult:
+        """The summary of a near-duplicate, with the statistics, id and timestamp of text"""
+        words = len(text.split())
+        sentences = sum(1 for _ in self.language_processor.iter_sentence_spans(text, source.language))
+        original_stats = TextStats(len(text), words, sentences, self.count_paragraphs(text),
+                                   max(1, math.ceil(words / 200)))
+        return replace(source, id=self._generate_id(), original_text=text, original_stats=original_stats,
+                       compression_ratio=source.summary_stats.words / words if words else 0,
+                       created_at=datetime.now().isoformat(), reused=True)
+    
+    def summarize_many(self, texts: List[str], options: Dict[str, Any]) -> List[Tuple[Optional[SummaryResult], Optional[str], float]]:
+        """Summarize a batch of texts, scoring all of their sentences in one sparse matrix.
+        
+        Returns (result, error, processing_time_ms) per text, in input order. The
+        time of the shared scoring step is split by each text's sentence count.
+        """
+        outcomes: List[Tuple[Optional[SummaryResult], Optional[str], float]] = [None] * len(texts)
+        elapsed = [0.0] * len(texts)
+        documents: Dict[int, AnalyzedDocument] = {}
+        
+        for i, text in enumerate(texts):
+            start = time.perf_counter()
+            cached = self.cached_summary(text, options)
+            if cached is not None:
+                outcomes[i] = (cached, None, 0.0)
+            elif text.strip():
+                try:
+                    documents[i] = self._analyze_text(text, options)
+                except Exception as e:
+                    outcomes[i] = (None, str(e), 0.0)
+            elapsed[i] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        try:
+            self.score_documents(list(documents.values()))
+        except Exception:
+            pass  # Fall back to scoring each document on its own below
+        scoring_time = time.perf_counter() - start
+        total_sentences = sum(len(document.sentence_spans) for document in documents.values()) or 1
+        
+        for i, text in enumerate(texts):
+            if outcomes[i] is not None:
                 continue
-            
-            # Base score from word frequency
-            score = sum(word_freq.get(word, 0) for word in words) / len(words)
-            
-            # Boost factors
-            boost = 1.0
-            
-            # Position boost (first and last sentences are often important)
-            if idx == 0 or idx == len(sentences) - 1:
-                boost += 0.2
-            
-            # Length boost (moderate length sentences are preferred)
-            word_count = len(words)
-            if 10 <= word_count <= 30:
-                boost += 0.1
-            
-            # Number boost (sentences with numbers often contain facts)
-            if re.search(r'\d+', sentence):
-                boost += 0.15
-            
-            # Keyword boost (sentences with important keywords)
-            important_keywords = {'महत्वपूर्ण', 'important', 'significant', 'मुख्य', 'main', 'key', 'प्रमुख'}
-            if any(keyword in sentence.lower() for keyword in important_keywords):
-                boost += 0.25
-            
-            final_score = score * boost
-            scored_sentences.append((sentence, final_score, idx))
+            start = time.perf_counter()
+            try:
+                result = self._build_summary(text, options, documents.get(i))
+                self.store_summary(text, options, result)
+                outcomes[i] = (result, None, 0.0)
+            except Exception as e:
+                outcomes[i] = (None, str(e), 0.0)
+            elapsed[i] += time.perf_counter() - start
+            if i in documents:
+                elapsed[i] += scoring_time * len(documents[i].sentence_spans) / total_sentences
+        
+        if metrics_registry.enabled:
+            for i, seconds in enumerate(elapsed):
+                if i in documents and outcomes[i][0] is not None:
+                    metrics_registry.observe(STAGE_METRIC, (('stage', 'summarize'), ('language', language_label(documents[i].language)),
+                                                            ('size', size_bucket(len(texts[i])))), seconds)
+        
+        return [(result, error, round(seconds * 1000, 2))
+                for (result, error, _), seconds in zip(outcomes, elapsed)]
+    
+    def _analyze_text(self, text: str, options: Dict[str, Any],
+                      deadline: Optional[Deadline] = None) -> AnalyzedDocument:
+        """Detect the language and analyze the text"""
+        # Detect language
+        language = options.get('language') or self._detect_language(text, deadline)
+        
+        # Split and tokenize once; every later stage reads from this
+        if deadline is None:
+            return self.language_processor.analyze(text, language)
+        
+        # Analyze (and later score) only as many characters as the budget allows
+        budget = deadline.remaining_ms() * Config.DEADLINE_ANALYZE_SHARE
+        affordable = stage_costs.affordable(budget, 'analyze', 'score')
+        document = self.language_processor.analyze(text, language, int(affordable) if affordable < len(text) else None)
+        if document.skipped_sentences:
+            deadline.take_shortcut('sentences_sampled')
+        return document
+    
+    def _detect_language(self, text: str, deadline: Optional[Deadline] = None) -> str:
+        """Detect the language of text, from a smaller langdetect sample when the deadline is near"""
+        processor = self.language_processor
+        if deadline is None:
+            return processor.detect_language(text)
         
-        return scored_sentences
+        sample = processor.langdetect_sample_size
+        affordable = int(stage_costs.affordable(deadline.remaining_ms() * Config.DEADLINE_DETECT_SHARE, 'langdetect'))
+        if affordable < min(sample, len(text)):
+            sample = affordable if affordable >= Config.DEADLINE_MIN_LANGDETECT_SAMPLE else 0
+        result = processor.detect_language_details(text, sample)
+        if result.tier == 'langdetect_sampled':
+            deadline.take_shortcut('language_detection_sampled')
+        elif result.tier == 'script_only':
+            deadline.take_shortcut('language_detection_script_only')
+        return result.detected_language
     
-    def summarize_text(self, text: str, options: Dict[str, Any]) -> SummaryResult:
+    def _summarize_text_uncached(self, text: str, options: Dict[str, Any],
+                                 deadline: Optional[Deadline] = None) -> SummaryResult:
         """Generate comprehensive text summary"""
-        if not text.strip():
+        document = self._analyze_text(text, options, deadline) if text.strip() else None
+        return self._build_summary(text, options, document, deadline)
+    
+    def _build_summary(self, text: str, options: Dict[str, Any],
+                       document: Optional[AnalyzedDocument],
+                       deadline: Optional[Deadline] = None) -> SummaryResult:
+        """Select sentences and assemble the result from an analyzed document"""
+        if document is None:
             empty_stats = TextStats(0, 0, 0, 0, 0)
             return SummaryResult(
                 id=self._generate_id(),
@@ -247,26 +813,28 @@ class AdvancedSummarizer:
                 shares=0
             )
         
-        # Detect language
-        language = options.get('language') or self.language_processor.detect_language(text)
+        language = document.language
         
         # Calculate original text statistics
-        original_stats = self.calculate_text_stats(text)
+        original_stats = self.calculate_document_stats(document)
         
-        # Split into sentences
-        sentences = self.language_processor.split_sentences(text, language)
+        # Extract keywords, time permitting
+        if deadline is not None and deadline.remaining_ms() <= 0:
+            deadline.take_shortcut('keywords_skipped')
+            keywords = []
+        else:
+            keywords = self.extract_keywords(text, language, document=document)
         
-        if len(sentences) <= 1:
-            summary_stats = self.calculate_text_stats(text)
+        if len(document.sentence_spans) <= 1:
             return SummaryResult(
                 id=self._generate_id(),
                 summary=text,
                 original_text=text,
                 language=language,
                 original_stats=original_stats,
-                summary_stats=summary_stats,
+                summary_stats=original_stats,
                 compression_ratio=1.0,
-                keywords=self.extract_keywords(text, language),
+                keywords=keywords,
                 confidence=0.5,
                 created_at=datetime.now().isoformat(),
                 is_public=False,
@@ -275,36 +843,33 @@ class AdvancedSummarizer:
                 shares=0
             )
         
-        # Calculate word frequency
-        words = self.language_processor.tokenize_text(text, language)
-        word_freq = Counter(words)
-        
-        # Extract keywords
-        keywords = self.extract_keywords(text, language)
+        mode = self._selection_mode(document, options, deadline)
+        if mode != options.get('mode'):
+            options = dict(options, mode=mode)
         
-        # Score sentences
-        scored_sentences = self.calculate_sentence_scores(sentences, word_freq, language)
-        
-        # Determine target number of sentences
-        length_ratios = {'short': 0.25, 'medium': 0.4, 'long': 0.6}
-        target_ratio = length_ratios.get(options.get('length', 'medium'), 0.4)
-        target_sentences = max(1, int(len(sentences) * target_ratio))
-        
-        # Select top sentences and maintain original order
-        top_sentences = sorted(scored_sentences, key=lambda x: x[1], reverse=True)[:target_sentences]
-        selected_sentences = sorted(top_sentences, key=lambda x: x[2])  # Sort by original index
+        with metrics_registry.stage('select', language, len(text)):
+            # Score sentences
+            sentence_scores = self.calculate_sentence_scores(document, mode)
+            selected_sentences = self.select_sentences(document, sentence_scores, options)
         
         # Generate summary
-        summary = '. '.join([sent[0] for sent in selected_sentences])
+        summary = '. '.join([document.sentence(idx) for idx in selected_sentences])
         if summary and not summary.endswith('.'):
             summary += '.'
         
-        # Calculate summary statistics
-        summary_stats = self.calculate_text_stats(summary)
+        # Summary statistics come from the selected sentences, no re-splitting needed
+        summary_words = sum(document.sentence_word_counts[idx] for idx in selected_sentences)
+        summary_stats = TextStats(
+            len(summary),
+            summary_words,
+            len(selected_sentences),
+            len([p for p in summary.split('\n\n') if p.strip()]),
+            max(1, math.ceil(summary_words / 200))
+        )
         compression_ratio = summary_stats.words / original_stats.words if original_stats.words > 0 else 0
         
         # Calculate confidence score
-        avg_score = sum(sent[1] for sent in selected_sentences) / len(selected_sentences) if selected_sentences else 0
+        avg_score = float(sentence_scores[selected_sentences].mean()) if selected_sentences else 0
         confidence = min(0.95, max(0.3, 
             avg_score * 0.1 + 
             (0.3 if original_stats.words > 100 else 0.1) +
@@ -329,12 +894,204 @@ class AdvancedSummarizer:
             shares=0
         )
     
+    def _selection_mode(self, document: AnalyzedDocument, options: Dict[str, Any],
+                        deadline: Optional[Deadline] = None) -> Optional[str]:
+        """The mode option, or score mode when mmr or textrank would not finish before the deadline"""
+        mode = options.get('mode')
+        if deadline is None or mode not in ('mmr', 'textrank'):
+            return mode
+        
+        num_sentences = len(document.sentence_spans)
+        units = num_sentences if mode == 'textrank' else num_sentences * self._target_sentences(num_sentences, options)
+        if stage_costs.estimate(mode, units) > deadline.remaining_ms():
+            deadline.take_shortcut('selection_fallback_score')
+            return 'score'
+        return mode
+    
+    def _target_sentences(self, num_sentences: int, options: Dict[str, Any]) -> int:
+        """Number of summary sentences for the length option"""
+        target_ratio = self.LENGTH_RATIOS.get(options.get('length', 'medium'), 0.4)
+        return max(1, int(num_sentences * target_ratio))
+    
+    def select_sentences(self, document: AnalyzedDocument, sentence_scores: np.ndarray,
+                         options: Dict[str, Any]) -> List[int]:
+        """Indices of the summary sentences, in text order"""
+        # Determine target number of sentences
+        target_sentences = self._target_sentences(len(sentence_scores), options)
+        
+        if options.get('mode') == 'mmr':
+            # Skip sentences that repeat ones already picked
+            with stage_costs.timed('mmr', len(sentence_scores) * target_sentences):
+                picked = mmr_select(self.score_document(document).tfidf, sentence_scores, target_sentences,
+                                    self._mmr_lambda(options))
+            return sorted(picked)
+        
+        # Select top sentences (stable, so ties keep text order) and maintain original order
+        top_sentences = np.argsort(-sentence_scores, kind='stable')[:target_sentences]
+        return np.sort(top_sentences).tolist()
+    
+    @staticmethod
+    def _mmr_lambda(options: Dict[str, Any]) -> float:
+        """The mmr_lambda option as a number in [0, 1] (the default when missing or malformed)"""
+        try:
+            value = float(options.get('mmr_lambda', 0.7))
+        except (TypeError, ValueError):
+            return 0.7
+        return min(1.0, max(0.0, value)) if math.isfinite(value) else 0.7
+    
+    def summarize_stream(self, chunks: Iterable[Union[str, bytes]], options: Dict[str, Any]) -> SummaryResult:
+        """Summarize text arriving in chunks; the streamed text is not echoed back as original_text"""
+        with metrics_registry.stage('summarize_stream') as timer:
+            document = self.language_processor.analyze_stream(chunks, options.get('language'))
+            timer.set_language(document.language)
+            timer.set_size(document.char_count)
+            result = self._build_summary(document.text, options, document if document.sentence_spans else None)
+        return replace(result, original_text='')
+    
+    def create_session(self, options: Dict[str, Any]) -> 'SummarySession':
+        """Start an incremental summarization session"""
+        return SummarySession(SecurityUtils.generate_secure_id(16), options, self.language_processor,
+                              (self.NUMBER_PATTERN, self.IMPORTANT_KEYWORD_PATTERN))
+    
+    def summarize_session(self, session: 'SummarySession') -> SummaryResult:
+        """Summary of everything appended to a session so far (original_text is left empty)"""
+        with metrics_registry.stage('summarize_session', session.language or '', session.char_count):
+            document, indices, indptr = session.snapshot()
+            if document is None:
+                return self._build_summary('', session.options, None)
+            document.scores = self.scoring_engine.score_token_arrays(indices, indptr, len(document.vocabulary),
+                                                                     self.corpus_weights(document))
+            result = self._build_summary(document.text, session.options, document)
+        return replace(result, original_text='')
+    
     def _generate_id(self) -> str:
         """Generate unique ID for summary"""
         import random
         import string
         return ''.join(random.choices(string.ascii_lowercase + string.digits, k=9))
 
+class SummarySession:
+    """A growing document (live blog, running transcript) kept between appends.
+    
+    Appended text goes through a streaming sentence splitter, so only the new
+    sentences are tokenized; their token ids, word counts and boost flags are
+    appended to flat arrays that scoring reads directly. The unfinished sentence
+    after the last delimiter is analyzed again at each summary until it ends.
+    The caller holds `lock` while appending or summarizing.
+    """
+    
+    def __init__(self, session_id: str, options: Dict[str, Any], processor: IndianLanguageProcessor,
+                 boost_patterns: Tuple[re.Pattern, ...]):
+        self.session_id = session_id
+        self.options = options
+        self.processor = processor
+        self.boost_patterns = boost_patterns
+        self.lock = threading.Lock()
+        self.language: Optional[str] = options.get('language')
+        self.splitter: Optional[StreamingSentenceSplitter] = None
+        self.tokenizer = None
+        
+        self.term_ids: Dict[str, int] = {}
+        self.word_freq: Counter = Counter()
+        self.sentences: List[str] = []
+        self.sentence_spans: List[Tuple[int, int]] = []  # offsets in the newline-joined sentences
+        self.sentence_word_counts: List[int] = []
+        self.token_ids = array('q')
+        self.token_offsets = array('q', [0])
+        self.flags = [bytearray() for _ in boost_patterns]
+    
+    @property
+    def char_count(self) -> int:
+        return self.splitter.char_count if self.splitter is not None else 0
+    
+    def append(self, text: str) -> None:
+        """Add text to the end of the document; work is proportional to len(text)"""
+        if self.splitter is None:
+            if self.language is None:
+                self.language = self.processor.detect_language(text)
+            self.splitter = self.processor.sentence_splitter(self.language)
+            self.tokenizer = self.processor.tokenizer.get(self.language)
+        
+        sentences = self.splitter.feed(text)
+        if not sentences:
+            return
+        tokens = self._token_ids(sentences, self.term_ids.setdefault)
+        position = self.sentence_spans[-1][1] + 1 if self.sentence_spans else 0
+        for sentence in sentences:
+            self.sentence_spans.append((position, position + len(sentence)))
+            position += len(sentence) + 1
+        self.sentences.extend(sentences)
+        self.sentence_word_counts.extend(len(sentence.split()) for sentence in sentences)
+        self.word_freq.update(chain.from_iterable(tokens))
+        for row in tokens:
+            self.token_ids.extend(row)
+            self.token_offsets.append(len(self.token_ids))
+        for pattern, flags in zip(self.boost_patterns, self.flags):
+            flags.extend(pattern.search(sentence) is not None for sentence in sentences)
+    
+    def _token_ids(self, sentences: List[str], intern: Callable[[str, int], int]) -> List[List[int]]:
+        term_ids = self.term_ids
+        return [[intern(word, len(term_ids)) for word in words] for words in self.tokenizer.tokenize_batch(sentences)]
+    
+    def snapshot(self) -> Tuple[Optional[AnalyzedDocument], np.ndarray, np.ndarray]:
+        """The document so far plus its CSR token arrays, including the unfinished last sentence"""
+        if self.splitter is None:
+            return None, np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64)
+        
+        # Close a copy of the splitter, so the pending text stays pending
+        pending = copy.copy(self.splitter)
+        tail = pending.close()
+        sentences, spans, word_counts, word_freq = self.sentences, self.sentence_spans, self.sentence_word_counts, self.word_freq
+        vocabulary = list(self.term_ids)
+        indices = np.array(self.token_ids, dtype=np.int64)
+        indptr = np.array(self.token_offsets, dtype=np.int64)
+        masks = [np.array(flags, dtype=bool) for flags in self.flags]
+        
+        if tail:
+            # Words first seen in the tail get ids past the vocabulary without joining it
+            known = self.term_ids
+            new_terms: Dict[str, int] = {}
+            
+            def lookup(word: str, _: int) -> int:
+                token_id = known.get(word)
+                if token_id is None:
+                    token_id = new_terms.setdefault(word, len(known) + len(new_terms))
+                return token_id
+            
+            tokens = self._token_ids(tail, lookup)
+            vocabulary.extend(new_terms)
+            position = spans[-1][1] + 1 if spans else 0
+            tail_spans = []
+            for sentence in tail:
+                tail_spans.append((position, position + len(sentence)))
+                position += len(sentence) + 1
+            sentences = sentences + tail
+            spans = spans + tail_spans
+            word_counts = word_counts + [len(sentence.split()) for sentence in tail]
+            word_freq = word_freq + Counter(chain.from_iterable(tokens))
+            indices = np.concatenate([indices, np.fromiter(chain.from_iterable(tokens), dtype=np.int64)])
+            indptr = np.concatenate([indptr, indptr[-1] + np.cumsum([len(row) for row in tokens], dtype=np.int64)])
+            masks = [np.concatenate([mask, np.array([pattern.search(sentence) is not None for sentence in tail])])
+                     for pattern, mask in zip(self.boost_patterns, masks)]
+        
+        if not sentences:
+            return None, indices, indptr
+        
+        document = AnalyzedDocument(
+            text='\n'.join(sentences),
+            language=self.language,
+            sentence_spans=spans,
+            sentence_tokens=[],  # scored from the CSR arrays instead
+            sentence_word_counts=word_counts,
+            vocabulary=vocabulary,
+            word_freq=word_freq,
+            word_count=pending.word_count,
+            paragraph_count=pending.paragraph_count,
+            char_count=pending.char_count,
+            pattern_masks={pattern.pattern: mask for pattern, mask in zip(self.boost_patterns, masks)}
+        )
+        return document, indices, indptr
+
 # Flask API Application
 app = Flask(__name__)
 CORS(app)
@@ -342,19 +1099,180 @@ CORS(app)
 # Initialize summarizer
 summarizer = AdvancedSummarizer()
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
+# Open incremental sessions; idle ones expire, the least recently used go first when full
+summary_sessions = LRUCache(Config.SESSION_MAX_COUNT, Config.SESSION_TTL)
+
+metrics_registry.describe('summarizer_http_requests_total', 'HTTP requests by route, method and status')
+metrics_registry.describe('summarizer_http_request_duration_seconds', 'HTTP request latency by route')
+metrics_registry.describe('summarizer_language_detections_total', 'Language detections by tier and memo hit')
+metrics_registry.describe('summarizer_boot_import_seconds', 'Time to import app.py')
+metrics_registry.describe('summarizer_boot_warmup_seconds', 'Time spent in warmup() before serving')
+
+# Process pool for batch requests, started on first use
+batch_executor = BatchExecutor(Config.BATCH_WORKERS, Config.BATCH_START_METHOD, max_retries=Config.BATCH_MAX_RETRIES)
+
+# Token buckets per client and endpoint, and a cap on the cost of the requests in progress
+request_gate = RequestGate(
+    TokenBucketLimiter(Config.RATE_LIMIT / 60, Config.RATE_LIMIT_BURST, Config.RATE_LIMIT_MAX_CLIENTS),
+    AdmissionController(Config.ADMISSION_MAX_COST),
+    Config.ADMISSION_RETRY_AFTER
+) if Config.RATE_LIMIT_ENABLED else None
+metrics_registry.describe('summarizer_rejected_requests_total',
+                          'Requests answered with 429, by route and reason (rate_limit or overload)')
+
+# Summary history, written behind the request path; batch workers never open it
+summary_store = SummaryStore(
+    Config.SUMMARY_STORE_PATH,
+    Config.SUMMARY_STORE_BATCH_SIZE,
+    Config.SUMMARY_STORE_FLUSH_INTERVAL,
+    Config.SUMMARY_STORE_MAX_PENDING
+) if Config.SUMMARY_STORE_ENABLED and not IN_POOL_WORKER else None
+if summary_store is not None:
+    atexit.register(summary_store.close)
+
+def _open_search_index(store: SummaryStore) -> SearchIndex:
+    """The saved search index when it matches the store, or an empty one to rebuild from it"""
+    parameters = (Config.SEARCH_BM25_K1, Config.SEARCH_BM25_B, Config.SEARCH_SEGMENT_POSTINGS,
+                  Config.SEARCH_MERGE_FACTOR)
+    if os.path.exists(Config.SEARCH_INDEX_PATH):
+        try:
+            index = SearchIndex.load(Config.SEARCH_INDEX_PATH, *parameters)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rebuilding the search index: {e}")
+        else:
+            if index.last_seq <= store.max_seq():
+                return index
+            print("Rebuilding the search index: it is ahead of the summary store")
+    return SearchIndex(*parameters)
+
+# Full-text index of the summary history, following the store from a background thread
+search_index = _open_search_index(summary_store) if summary_store is not None and Config.SEARCH_ENABLED else None
+if search_index is not None:
+    search_index.follow(summary_store, summarizer.language_processor.tokenize_text, Config.SEARCH_INDEX_PATH,
+                        Config.SEARCH_SYNC_INTERVAL, Config.SEARCH_SAVE_INTERVAL)
+    summary_store.listeners.append(search_index.notify)
+    search_index.notify()  # index what was stored since the last save
+    # Registered after the store's close, so it runs first: the store flushes its queue for the final catch-up
+    atexit.register(search_index.close, summary_store, summarizer.language_processor.tokenize_text,
+                    Config.SEARCH_INDEX_PATH)
+
+# Corpus IDF counted from the summary history into the table the workers map
+corpus_frequencies = (DocumentFrequencies(summarizer.corpus_idf, languages=Config.SUPPORTED_LANGUAGES)
+                      if summary_store is not None and summarizer.corpus_idf is not None else None)
+if corpus_frequencies is not None:
+    corpus_frequencies.follow(summary_store, summarizer.language_processor.tokenize_text,
+                              Config.CORPUS_IDF_SAVE_INTERVAL)
+    atexit.register(corpus_frequencies.close, summary_store, summarizer.language_processor.tokenize_text)
+
+def _summarize_batch_chunk(chunk: Tuple[List[Tuple[int, str]], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Summarize a share of a batch with one scoring matrix; runs inside a batch worker process"""
+    items, options = chunk
+    outcomes = []
+    texts = [text for _, text in items]
+    for (index, _), (result, error, elapsed_ms) in zip(items, summarizer.summarize_many(texts, options)):
+        outcome: Dict[str, Any] = {'index': index, 'processing_time_ms': elapsed_ms, 'pid': os.getpid()}
+        if error is None:
+            outcome['result'] = result
+        else:
+            outcome['error'] = f'Failed to summarize text {index+1}: {error}'
+        outcomes.append(outcome)
+    return outcomes
+
+def _failed_batch_chunk(chunk: Tuple[List[Tuple[int, str]], Dict[str, Any]], error: BaseException) -> List[Dict[str, Any]]:
+    """Outcomes of a chunk whose batch worker kept dying"""
+    return [{'index': index, 'processing_time_ms': 0.0,
+             'error': f'Failed to summarize text {index+1}: the batch worker stopped ({error})'}
+            for index, _ in chunk[0]]
+
+def _observe_batch_outcome(outcome: Dict[str, Any], text: str) -> None:
+    """Record a summary computed in a pool worker, whose own metrics stay in that process"""
+    if outcome.get('pid') == os.getpid():
+        return  # ran inline and was recorded already
+    metrics_registry.observe(STAGE_METRIC,
+                             (('stage', 'summarize'), ('language', language_label(outcome['result'].language)),
+                              ('size', size_bucket(len(text)))),
+                             outcome['processing_time_ms'] / 1000)
+
+def _summarize_batch_item(item: Tuple[int, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize one batch text; runs inside a batch worker process"""
+    index, text, options = item
+    start = time.perf_counter()
+    outcome: Dict[str, Any] = {'index': index, 'pid': os.getpid()}
+    try:
+        outcome['result'] = summarizer.summarize_text(text, options)
+    except Exception as e:
+        outcome['error'] = f'Failed to summarize text {index+1}: {str(e)}'
+    outcome['processing_time_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return outcome
+
+# Request handlers shared by the Flask routes below and the ASGI app (asgi.py).
+# Each takes the parsed JSON body and returns (payload, status).
+
+def handle_health() -> Tuple[Dict[str, Any], int]:
+    """Health check payload"""
+    return {
         'status': 'healthy',
         'message': 'Summarizer API is running',
         'timestamp': datetime.now().isoformat(),
-        'supported_languages': list(summarizer.language_processor.language_scripts.keys())
-    })
+        'supported_languages': list(summarizer.language_processor.language_scripts.keys()),
+        'cache': summarizer.summary_cache.stats() if summarizer.summary_cache is not None else None,
+        'near_duplicates': summarizer.duplicate_index.stats() if summarizer.duplicate_index is not None else None,
+        'rate_limit': request_gate.stats() if request_gate is not None else None,
+        'summary_store': summary_store.stats() if summary_store is not None else None,
+        'search_index': search_index.stats() if search_index is not None else None,
+        'corpus_idf': summarizer.corpus_idf.stats() if summarizer.corpus_idf is not None else None,
+        'boot': boot_stats
+    }, 200
 
-@app.route('/api/languages', methods=['GET'])
-def get_supported_languages():
-    """Get list of supported languages"""
+def render_metrics() -> str:
+    """Prometheus text exposition of the stage timings, request and cache counters"""
+    caches = {'language_detection': summarizer.language_processor.detection_cache,
+              'summary': summarizer.summary_cache,
+              'keywords': summarizer.keyword_cache,
+              'near_duplicate': summarizer.duplicate_index}
+    for name, cache in caches.items():
+        if cache is None:
+            continue
+        stats = cache.stats()
+        for counter in ('hits', 'misses', 'evictions'):
+            metrics_registry.set_counter(f'summarizer_cache_{counter}_total', (('cache', name),), stats[counter])
+    for phase in ('import', 'warmup'):
+        if boot_stats[f'{phase}_seconds'] is not None:
+            metrics_registry.set_gauge(f'summarizer_boot_{phase}_seconds', (), boot_stats[f'{phase}_seconds'])
+    return metrics_registry.render()
+
+def request_cost(endpoint: str, body_bytes: Optional[int]) -> int:
+    """Rate limit cost of a request: its endpoint's base cost plus one unit per RATE_LIMIT_COST_BYTES of body"""
+    return Config.RATE_LIMIT_ENDPOINT_COSTS.get(endpoint, 1) + (body_bytes or 0) // Config.RATE_LIMIT_COST_BYTES
+
+def admit_request(client: str, endpoint: str, body_bytes: Optional[int]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Charge a request before its body is read: (cost to release when it ends, None), or (0, a 429 payload)"""
+    if request_gate is None or endpoint in Config.RATE_LIMIT_EXEMPT:
+        return 0, None
+    cost = request_cost(endpoint, body_bytes)
+    rejection = request_gate.admit(SecurityUtils.rate_limit_key(client, endpoint), cost)
+    if rejection is None:
+        return cost, None
+    
+    reason, wait = rejection
+    metrics_registry.inc('summarizer_rejected_requests_total', (('endpoint', endpoint), ('reason', reason)))
+    retry_after = max(1, math.ceil(wait))
+    error = 'Rate limit exceeded' if reason == 'rate_limit' else 'Server is busy'
+    return 0, {'error': f'{error}; retry in {retry_after} s', 'reason': reason, 'retry_after': retry_after}
+
+def release_request(cost: int) -> None:
+    """Return the admission budget taken by admit_request"""
+    if cost and request_gate is not None:
+        request_gate.release(cost)
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float) -> None:
+    """Count an HTTP request and record its latency; called by both servers"""
+    metrics_registry.inc('summarizer_http_requests_total',
+                         (('endpoint', endpoint), ('method', method), ('status', str(status))))
+    metrics_registry.observe('summarizer_http_request_duration_seconds', (('endpoint', endpoint),), seconds)
+
+def handle_languages() -> Tuple[Dict[str, Any], int]:
+    """Supported languages payload"""
     languages = []
     for code, info in summarizer.language_processor.language_scripts.items():
         languages.append({
@@ -362,127 +1280,808 @@ def get_supported_languages():
             'name': info['name'],
             'script': info['script']
         })
-    return jsonify({'languages': languages})
+    return {'languages': languages}, 200
 
-@app.route('/api/detect-language', methods=['POST'])
-def detect_language():
+def handle_detect_language(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """Detect language of input text"""
-    data = request.get_json()
     text = data.get('text', '')
     
     if not text.strip():
-        return jsonify({'error': 'Text is required'}), 400
+        return {'error': 'Text is required'}, 400
     
-    detected_language = summarizer.language_processor.detect_language(text)
-    language_info = summarizer.language_processor.language_scripts.get(detected_language, {})
+    result = summarizer.language_processor.detect_language_details(text)
     
-    return jsonify({
-        'detected_language': detected_language,
-        'language_name': language_info.get('name', 'Unknown'),
-        'script': language_info.get('script', 'Unknown'),
-        'confidence': 0.85  # Placeholder confidence score
-    })
+    return result.to_dict(), 200
 
-@app.route('/api/text-stats', methods=['POST'])
-def get_text_stats():
+def handle_text_stats(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """Get detailed text statistics"""
-    data = request.get_json()
     text = data.get('text', '')
     
     if not text.strip():
-        return jsonify({'error': 'Text is required'}), 400
+        return {'error': 'Text is required'}, 400
     
-    stats = summarizer.calculate_text_stats(text)
     language = summarizer.language_processor.detect_language(text)
-    keywords = summarizer.extract_keywords(text, language, 10)
+    document = summarizer.language_processor.analyze(text, language)
+    stats = summarizer.calculate_document_stats(document)
+    keywords = summarizer.extract_keywords(text, language, 10, document=document)
     
-    return jsonify({
-        'stats': asdict(stats),
+    return {
+        'stats': stats.to_dict(),
         'language': language,
         'keywords': keywords
-    })
+    }, 200
 
-@app.route('/api/summarize', methods=['POST'])
-def summarize_text():
-    """Generate text summary"""
-    data = request.get_json()
+def handle_summarize(data: Dict[str, Any], viewer: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Generate text summary, filed under the signed-in viewer when there is one"""
     text = data.get('text', '')
     options = data.get('options', {})
     
     if not text.strip():
-        return jsonify({'error': 'Text is required'}), 400
+        return {'error': 'Text is required'}, 400
     
-    if len(text.split()) < 10:
-        return jsonify({'error': 'Text must contain at least 10 words for meaningful summarization'}), 400
+    try:
+        fields = parse_summary_fields(data.get('fields', options.get('fields')))
+        deadline = Deadline.from_value(data.get('deadline_ms', options.get('deadline_ms')))
+        owner = summary_owner(data, viewer)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except PermissionError as e:
+        return {'error': str(e)}, 403
+    
+    if len(text) > Config.MAX_DOCUMENT_LENGTH:
+        return {'error': f'Text exceeds the maximum of {Config.MAX_DOCUMENT_LENGTH} characters'}, 400
+    
+    if len(text.split(None, 10)) < 10:
+        return {'error': 'Text must contain at least 10 words for meaningful summarization'}, 400
     
     try:
-        result = summarizer.summarize_text(text, options)
-        return jsonify(asdict(result))
+        hierarchy = None
+        if len(text) > Config.HIERARCHICAL_THRESHOLD:
+            # Long documents are summarized chunk by chunk on the batch pool. The deadline is not
+            # enforced there, so no deadline report is returned either
+            deadline = None
+            result = summarizer.cached_summary(text, options)
+            if result is None:
+                with metrics_registry.stage('summarize_hierarchical', size=len(text)) as timer:
+                    result, hierarchy = summarize_hierarchical(text, options)
+                    timer.set_language(result.language)
+                summarizer.store_summary(text, options, result)
+        else:
+            result = summarizer.summarize_text(text, options, deadline)
+        result = save_summary(result, owner)
+        
+        with metrics_registry.stage('serialize', result.language, len(text)):
+            payload = result.to_dict(fields)
+        if hierarchy is not None:
+            payload['hierarchy'] = hierarchy
+        if deadline is not None:
+            payload['deadline'] = deadline.report()
+        return payload, 200
     except Exception as e:
-        return jsonify({'error': f'Summarization failed: {str(e)}'}), 500
+        return {'error': f'Summarization failed: {str(e)}'}, 500
 
-@app.route('/api/keywords', methods=['POST'])
-def extract_keywords():
+def summary_owner(data: Dict[str, Any], viewer: Optional[str]) -> Optional[str]:
+    """User to file new summaries under.
+    
+    Behind an authenticating proxy (AUTH_USER_HEADER) that is the signed-in
+    viewer, and a body user_id naming anybody else raises PermissionError;
+    otherwise it is the body's user_id, if any.
+    """
+    user_id = data.get('user_id')
+    if not Config.AUTH_USER_HEADER:
+        return None if user_id is None else str(user_id)
+    if user_id is not None and str(user_id) != viewer:
+        raise PermissionError('user_id must be the signed-in user')
+    return viewer
+
+def save_summary(result: SummaryResult, user_id: Optional[str] = None) -> SummaryResult:
+    """Queue a result for the summary history (when enabled), under the requesting user.
+    
+    Reused results (cache and near-duplicate hits) are not saved: the history
+    already has the summary they copy.
+    """
+    if user_id is not None:
+        result = replace(result, user_id=user_id)
+    if summary_store is not None and not result.reused:
+        summary_store.save(result)
+    return result
+
+def _visible_to(summary: Dict[str, Any], viewer: Optional[str]) -> bool:
+    """Whether a stored summary may be shown to the signed-in user (None: nobody signed in)"""
+    return bool(summary.get('is_public')) or (viewer is not None and summary.get('user_id') == viewer)
+
+def handle_list_summaries(args: Mapping[str, str], viewer: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """A page of the summary history, newest first: a user's summaries, or the public ones.
+    
+    A user's private summaries are listed only when viewer (the signed-in
+    user) is that user. original_text is left out unless `fields` names it; pass `next_cursor` back
+    as `cursor` for the following page.
+    """
+    if summary_store is None:
+        return {'error': 'Summary history is disabled'}, 503
+    
+    try:
+        fields = parse_summary_fields(args.get('fields'))
+        try:
+            limit = int(args.get('limit') or Config.SUMMARY_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= Config.SUMMARY_MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be a number from 1 to {Config.SUMMARY_MAX_PAGE_SIZE}')
+        user_id = args.get('user_id') or None
+        summaries, next_cursor = summary_store.page(user_id, args.get('language') or None,
+                                                    limit, args.get('cursor') or None,
+                                                    include_text=fields is not None and 'original_text' in fields,
+                                                    public_only=viewer is None or user_id != viewer)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    if fields is not None:
+        summaries = [{key: value for key, value in summary.items() if key in fields} for summary in summaries]
+    return {'summaries': summaries, 'next_cursor': next_cursor}, 200
+
+def handle_get_summary(summary_id: str, fields: Optional[str] = None,
+                       viewer: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """A stored summary by id; a private one only for its owner"""
+    if summary_store is None:
+        return {'error': 'Summary history is disabled'}, 503
+    
+    try:
+        selected = parse_summary_fields(fields)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    summary = summary_store.get(summary_id, include_text=selected is None or 'original_text' in selected)
+    if summary is None or not _visible_to(summary, viewer):
+        # Someone else's private summary is not found either, so its id reveals nothing
+        return {'error': 'Summary not found'}, 404
+    if selected is not None:
+        summary = {key: value for key, value in summary.items() if key in selected}
+    return summary, 200
+
+def handle_search(args: Mapping[str, str], viewer: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Stored summaries best matching the words of `q` (BM25), best first.
+    
+    Searches a user's summaries with user_id (the private ones too only when
+    viewer, the signed-in user, is that user), the public ones otherwise;
+    `language` narrows to one language. Results are stored summaries, without
+    original_text unless `fields` names it, with their score.
+    """
+    if search_index is None:
+        return {'error': 'Search is disabled'}, 503
+    
+    start = time.perf_counter()
+    try:
+        query = (args.get('q') or '').strip()
+        if not query:
+            raise ValueError('q is required')
+        fields = parse_summary_fields(args.get('fields'))
+        try:
+            limit = int(args.get('limit') or Config.SEARCH_RESULTS)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= Config.SEARCH_MAX_RESULTS:
+            raise ValueError(f'limit must be a number from 1 to {Config.SEARCH_MAX_RESULTS}')
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    language = args.get('language') or None
+    processor = summarizer.language_processor
+    # Without a language, the script is enough to pick a tokenizer; langdetect would cost more than the search
+    tokens = processor.tokenize_text(
+        query, language or processor.detect_language_details(query, langdetect_sample=0).detected_language)
+    user_id = args.get('user_id') or None
+    hits = search_index.search(tokens, language, user_id, limit, public_only=viewer is None or user_id != viewer)
+    
+    include_text = fields is not None and 'original_text' in fields
+    results = []
+    for summary_id, score in hits:
+        summary = summary_store.get(summary_id, include_text=include_text)
+        if summary is None or not _visible_to(summary, viewer):
+            continue
+        if fields is not None:
+            summary = {key: value for key, value in summary.items() if key in fields}
+        summary['score'] = round(score, 4)
+        results.append(summary)
+    return {'results': results, 'took_ms': round((time.perf_counter() - start) * 1000, 2)}, 200
+
+def query_options(args: Mapping[str, str]) -> Dict[str, Any]:
+    """Summary options given as query parameters, for request bodies that are not JSON"""
+    options: Dict[str, Any] = {key: args[key] for key in ('length', 'language', 'mode', 'mmr_lambda', 'fields')
+                               if args.get(key)}
+    if 'is_public' in args:
+        options['is_public'] = args['is_public'].lower() in ('1', 'true', 'yes')
+    return options
+
+def handle_summarize_stream(chunks: Iterable[Union[str, bytes]], options: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Summarize a plain-text body read chunk by chunk; original_text is left empty"""
+    try:
+        fields = parse_summary_fields(options.get('fields'))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    try:
+        result = summarizer.summarize_stream(limit_chunks(decode_chunks(chunks), Config.MAX_DOCUMENT_LENGTH), options)
+    except StreamLimitExceeded as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        return {'error': f'Summarization failed: {str(e)}'}, 500
+    
+    if result.original_stats.words < 10:
+        return {'error': 'Text must contain at least 10 words for meaningful summarization'}, 400
+    
+    with metrics_registry.stage('serialize', result.language, result.original_stats.characters):
+        return result.to_dict(fields), 200
+
+def _summarize_session(session: SummarySession, data: Dict[str, Any], status: int) -> Tuple[Dict[str, Any], int]:
+    """Append the text of a request to a session (holding its lock) and return the refreshed summary"""
+    text = data.get('text', '')
+    if not isinstance(text, str):
+        return {'error': 'text must be a string'}, 400
+    try:
+        fields = parse_summary_fields(data.get('fields', session.options.get('fields')))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    
+    with session.lock:
+        if session.char_count + len(text) > Config.SESSION_MAX_CHARS:
+            return {'error': f'Session text would exceed {Config.SESSION_MAX_CHARS} characters'}, 413
+        try:
+            if text:
+                session.append(text)
+            result = summarizer.summarize_session(session)
+        except Exception as e:
+            return {'error': f'Summarization failed: {str(e)}'}, 500
+        characters = session.char_count
+    
+    # Storing again restarts the idle timeout
+    summary_sessions.set(session.session_id, session)
+    payload = result.to_dict(fields)
+    payload['session'] = {'id': session.session_id, 'characters': characters, 'ttl': Config.SESSION_TTL}
+    return payload, status
+
+def handle_create_session(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Start an incremental summarization session, optionally with its first text"""
+    options = data.get('options', {})
+    if not isinstance(options, dict):
+        return {'error': 'options must be an object'}, 400
+    session = summarizer.create_session(options)
+    return _summarize_session(session, data, 201)
+
+def handle_session_append(session_id: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Append text to a session and re-select its summary"""
+    session = summary_sessions.get(session_id)
+    if session is None:
+        return {'error': 'Session not found or expired'}, 404
+    return _summarize_session(session, data, 200)
+
+def handle_get_session(session_id: str, fields: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Current summary of a session"""
+    session = summary_sessions.get(session_id)
+    if session is None:
+        return {'error': 'Session not found or expired'}, 404
+    return _summarize_session(session, {'fields': fields} if fields else {}, 200)
+
+def handle_delete_session(session_id: str) -> Tuple[Dict[str, Any], int]:
+    """Close a session and free its state"""
+    if summary_sessions.pop(session_id) is None:
+        return {'error': 'Session not found or expired'}, 404
+    return {'deleted': session_id}, 200
+
+def handle_keywords(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """Extract keywords from text"""
-    data = request.get_json()
     text = data.get('text', '')
     language = data.get('language', '')
     num_keywords = data.get('num_keywords', 10)
     
     if not text.strip():
-        return jsonify({'error': 'Text is required'}), 400
+        return {'error': 'Text is required'}, 400
     
     if not language:
         language = summarizer.language_processor.detect_language(text)
     
     keywords = summarizer.extract_keywords(text, language, num_keywords)
     
-    return jsonify({
+    return {
         'keywords': keywords,
         'language': language,
         'count': len(keywords)
-    })
+    }, 200
 
-@app.route('/api/batch-summarize', methods=['POST'])
-def batch_summarize():
-    """Summarize multiple texts in batch"""
-    data = request.get_json()
+def handle_batch_summarize(data: Dict[str, Any], viewer: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Summarize multiple texts in batch, filed under the signed-in viewer when there is one"""
     texts = data.get('texts', [])
     options = data.get('options', {})
     
     if not texts or not isinstance(texts, list):
-        return jsonify({'error': 'Texts array is required'}), 400
+        return {'error': 'Texts array is required'}, 400
     
-    if len(texts) > 10:
-        return jsonify({'error': 'Maximum 10 texts allowed per batch'}), 400
+    if len(texts) > Config.MAX_BATCH_SIZE:
+        return {'error': f'Maximum {Config.MAX_BATCH_SIZE} texts allowed per batch'}, 400
     
-    results = []
+    try:
+        fields = parse_summary_fields(data.get('fields', options.get('fields')))
+        owner = summary_owner(data, viewer)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except PermissionError as e:
+        return {'error': str(e)}, 403
+    
+    batch_start = time.perf_counter()
+    
+    # Serve repeated articles from the cache, and near-duplicates within the batch from
+    # the first copy's summary; send only the rest to the workers
+    outcomes: Dict[int, Dict[str, Any]] = {}
+    pending = []
+    duplicates: Dict[int, int] = {}
+    batch_index = summarizer.new_duplicate_index(len(texts)) if summarizer.duplicate_index is not None else None
     for i, text in enumerate(texts):
         if not text.strip():
             continue
         
-        try:
-            result = summarizer.summarize_text(text, options)
-            results.append(asdict(result))
-        except Exception as e:
-            results.append({
-                'error': f'Failed to summarize text {i+1}: {str(e)}',
-                'index': i
-            })
+        start = time.perf_counter()
+        cached = summarizer.cached_summary(text, options)
+        if cached is not None:
+            outcomes[i] = {'index': i, 'result': cached,
+                           'processing_time_ms': round((time.perf_counter() - start) * 1000, 2)}
+            continue
+        
+        signature = summarizer.duplicate_signature(text, options) if batch_index is not None else None
+        match = batch_index.query(signature) if signature is not None else None
+        if match is not None:
+            duplicates[i] = match[0]
+            continue
+        if signature is not None:
+            batch_index.add(i, signature, None)
+        pending.append((i, text))
+    
+    # One chunk per worker, each scored as a single sparse matrix
+    num_chunks = batch_executor.workers_for(len(pending))
+    chunks = [(pending[offset::num_chunks], options) for offset in range(num_chunks)] if pending else []
+    for chunk_outcomes in batch_executor.map(_summarize_batch_chunk, chunks, _failed_batch_chunk):
+        for outcome in chunk_outcomes:
+            outcomes[outcome['index']] = outcome
+            if 'result' in outcome:
+                summarizer.store_summary(texts[outcome['index']], options, outcome['result'])
+                _observe_batch_outcome(outcome, texts[outcome['index']])
+    
+    for i, source in duplicates.items():
+        start = time.perf_counter()
+        if 'result' in outcomes[source]:
+            result = summarizer.reuse_summary(outcomes[source]['result'], texts[i])
+            summarizer.store_summary(texts[i], options, result)
+            metrics_registry.inc('summarizer_near_duplicates_total', (('scope', 'batch'),))
+            outcomes[i] = {'index': i, 'result': result}
+        else:
+            outcomes[i] = {'index': i, 'error': f'Failed to summarize text {i+1}: near-duplicate text {source+1} failed'}
+        outcomes[i]['processing_time_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    
+    # Keep the results columnar until the response is encoded
+    batch = SummaryBatch()
+    rows = {i: batch.append(save_summary(outcome.pop('result'), owner))
+            for i, outcome in outcomes.items() if 'result' in outcome}
+    results = []
+    for i in sorted(outcomes):
+        if i in rows:
+            entry = batch.to_dict(rows[i], fields)
+        else:
+            entry = {'error': outcomes[i]['error'], 'index': i}
+        entry['processing_time_ms'] = outcomes[i]['processing_time_ms']
+        results.append(entry)
     
-    return jsonify({
+    return {
         'results': results,
         'total_processed': len(results),
+        'workers': batch_executor.workers_for(len(pending)),
+        'total_time_ms': round((time.perf_counter() - batch_start) * 1000, 2),
         'timestamp': datetime.now().isoformat()
-    })
+    }, 200
+
+def _summarize_text_chunk(item: Tuple[int, str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize one chunk of a long document; runs inside a batch worker process"""
+    index, chunk, language, options = item
+    document = summarizer.language_processor.analyze(chunk, language)
+    result = summarizer._build_summary(chunk, options, document)
+    return {
+        'index': index,
+        'summary': result.summary,
+        'words': document.word_count,
+        'sentences': len(document.sentence_spans),
+        'keywords': summarizer.score_document(document).top_weighted_terms(document.vocabulary, Config.MAX_KEYWORDS)
+    }
+
+def _map_bounded(fn: Callable[[Any], Any], items: Iterable[Any], window: int) -> Iterator[Any]:
+    """Apply fn to items on the batch pool with at most `window` submitted at once.
+    
+    Results are yielded in completion order. Items are drawn from the iterable
+    only as slots free up, so a generator of chunks is never materialized.
+    """
+    in_flight: Dict[Any, Tuple[Any, int]] = {}  # future -> (item, attempt)
+    
+    def collect(futures) -> Iterator[Any]:
+        for future in futures:
+            item, attempt = in_flight.pop(future)
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                # Its worker died: retry in a fresh pool, never in this process
+                if attempt >= batch_executor.max_retries:
+                    raise
+                in_flight[batch_executor.submit(fn, item)] = (item, attempt + 1)
+    
+    for item in items:
+        in_flight[batch_executor.submit(fn, item)] = (item, 0)
+        if len(in_flight) >= window:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from collect(done)
+    
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        yield from collect(done)
+
+def summarize_hierarchical(text: str, options: Dict[str, Any]) -> Tuple[SummaryResult, Dict[str, Any]]:
+    """Map-reduce summary of a document longer than a single pass handles well.
+    
+    The text is cut at sentence boundaries into chunks of HIERARCHICAL_CHUNK_CHARS,
+    which are summarized in parallel on the batch pool; the joined chunk summaries
+    are chunked and summarized again until they fit in one chunk, and a final pass
+    applies the requested length. Each worker analyzes one chunk at a time, so the
+    token and matrix memory depends on the chunk size, not the document size.
+    """
+    chunk_chars = Config.HIERARCHICAL_CHUNK_CHARS
+    window = 2 * batch_executor.max_workers
+    processor = summarizer.language_processor
+    language = options.get('language') or processor.detect_language(text)
+    chunk_options = {'length': Config.HIERARCHICAL_CHUNK_LENGTH}
+    
+    levels: List[Dict[str, Any]] = []
+    keyword_weights: Counter = Counter()
+    words = sentences = 0
+    current = text
+    while len(current) > chunk_chars:
+        spans = PerformanceUtils.chunk_spans(processor.iter_sentence_spans(current, language), chunk_chars)
+        items = ((index, current[start:end], language, chunk_options) for index, (start, end) in enumerate(spans))
+        
+        summaries: Dict[int, str] = {}
+        for outcome in _map_bounded(_summarize_text_chunk, items, window):
+            summaries[outcome['index']] = outcome['summary']
+            if not levels:
+                # Only the first level sees the original text
+                words += outcome['words']
+                sentences += outcome['sentences']
+                for term, weight in outcome['keywords']:
+                    keyword_weights[term] += weight
+        
+        reduced = ' '.join(summaries[index] for index in range(len(summaries)))
+        levels.append({'chunks': len(summaries), 'input_chars': len(current), 'output_chars': len(reduced)})
+        shrinking = len(reduced) < 0.9 * len(current)
+        current = reduced
+        if not shrinking:
+            break  # e.g. chunks of one long sentence each; let the final pass cut it down
+    
+    final = summarizer._summarize_text_uncached(current, {**options, 'language': language})
+    hierarchy = {'levels': levels, 'chunk_chars': chunk_chars}
+    if not levels:
+        return replace(final, original_text=text), hierarchy
+    
+    original_stats = TextStats(len(text), words, sentences, summarizer.count_paragraphs(text),
+                               max(1, math.ceil(words / 200)))
+    return replace(
+        final,
+        original_text=text,
+        original_stats=original_stats,
+        compression_ratio=final.summary_stats.words / words if words else 0,
+        keywords=[term for term, _ in keyword_weights.most_common(options.get('max_keywords', 10))]
+    ), hierarchy
+
+def _parse_ndjson_article(index: int, line: bytes) -> Tuple[Optional[str], Dict[str, Any], Optional[str]]:
+    """Parse one NDJSON line into (text, options, error)"""
+    try:
+        article = json.loads(line)
+    except ValueError as e:
+        return None, {}, f'Invalid JSON on line for text {index+1}: {str(e)}'
+    
+    if isinstance(article, str):
+        return article, {}, None
+    if isinstance(article, dict) and isinstance(article.get('text'), str):
+        return article['text'], article.get('options') or {}, None
+    return None, {}, f'Text {index+1} must be a JSON string or an object with a "text" field'
+
+def _oversized_line_error(index: int, max_line_bytes: int) -> str:
+    return f'Text {index+1} exceeds the maximum line size of {max_line_bytes} bytes'
+
+def _iter_ndjson_articles(stream, max_line_bytes: int) -> Iterator[Tuple[int, Optional[str], Dict[str, Any], Optional[str]]]:
+    """Yield (index, text, options, error) for each line of an NDJSON request body.
+    
+    A line is either a JSON string or an object with "text" and optional "options".
+    Lines are read one at a time, so the body is never held in memory as a whole.
+    """
+    index = -1
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Skip the rest of an oversized line without buffering it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            index += 1
+            yield index, None, {}, _oversized_line_error(index, max_line_bytes)
+            continue
+        
+        if not line.strip():
+            continue
+        index += 1
+        yield (index, *_parse_ndjson_article(index, line))
+
+def _stream_entry(outcome: Dict[str, Any], fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """NDJSON entry for a finished batch item"""
+    if 'result' in outcome:
+        entry = outcome['result'].to_dict(fields)
+        entry['index'] = outcome['index']
+    else:
+        entry = {'error': outcome['error'], 'index': outcome['index']}
+    entry['processing_time_ms'] = outcome['processing_time_ms']
+    return entry
+
+def encode_json(body: Any) -> bytes:
+    """UTF-8 JSON of a response body, with orjson when it is installed"""
+    if orjson is not None and Config.JSON_ORJSON:
+        try:
+            return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the json module copes
+    return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+def _ndjson(entry: Dict[str, Any]) -> bytes:
+    return encode_json(entry) + b'\n'
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.before_request
+def enforce_rate_limit():
+    """Turn a request away with 429 before its body is read when its client or the server is over budget"""
+    if request.method == 'OPTIONS':
+        return None
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    header = Config.RATE_LIMIT_CLIENT_HEADER
+    client = (header and request.headers.get(header, '').split(',')[0].strip()) or request.remote_addr or ''
+    g.admitted_cost, rejection = admit_request(client, endpoint, request.content_length)
+    if rejection is None:
+        return None
+    response = _json_response(rejection, 429)
+    response.headers['Retry-After'] = str(rejection['retry_after'])
+    return response
+
+@app.teardown_request
+def release_admission(_error=None):
+    # Runs once a streamed response has been sent in full
+    release_request(g.pop('admitted_cost', 0))
+
+@app.after_request
+def record_request_metrics(response):
+    if metrics_registry.enabled and 'request_start' in g:
+        # The route pattern, not the raw path, keeps the label set bounded
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        observe_request(endpoint, request.method, response.status_code, time.perf_counter() - g.request_start)
+    return response
+
+def _json_response(body: Dict[str, Any], status: int):
+    with metrics_registry.stage('encode_json'):
+        return Response(encode_json(body), status=status, mimetype='application/json')
+
+def _request_json() -> Any:
+    """JSON body of the request, with a `fields` projection from the query string and a
+    deadline from the X-Deadline-Ms header as fallbacks"""
+    data = request.get_json()
+    if isinstance(data, dict):
+        if request.args.get('fields') and 'fields' not in data:
+            data['fields'] = request.args['fields']
+        if request.headers.get(Config.DEADLINE_HEADER) and 'deadline_ms' not in data:
+            data['deadline_ms'] = request.headers[Config.DEADLINE_HEADER]
+    return data
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics endpoint"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    body, status = handle_health()
+    return _json_response(body, status)
+
+@app.route('/api/languages', methods=['GET'])
+def get_supported_languages():
+    """Get list of supported languages"""
+    body, status = handle_languages()
+    return _json_response(body, status)
+
+@app.route('/api/detect-language', methods=['POST'])
+def detect_language():
+    """Detect language of input text"""
+    body, status = handle_detect_language(request.get_json())
+    return _json_response(body, status)
+
+@app.route('/api/text-stats', methods=['POST'])
+def get_text_stats():
+    """Get detailed text statistics"""
+    body, status = handle_text_stats(request.get_json())
+    return _json_response(body, status)
+
+@app.route('/api/summarize', methods=['POST'])
+def summarize_text():
+    """Generate text summary"""
+    body, status = handle_summarize(_request_json(), _signed_in_user())
+    return _json_response(body, status)
+
+@app.route('/api/summarize/raw', methods=['POST'])
+def summarize_raw_text():
+    """Summarize a plain-text request body without buffering it; options come from the query string"""
+    stream = request.stream
+    chunks = iter(lambda: stream.read(Config.STREAM_READ_BYTES), b'')
+    body, status = handle_summarize_stream(chunks, query_options(request.args))
+    return _json_response(body, status)
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Start an incremental summarization session"""
+    body, status = handle_create_session(_request_json())
+    return _json_response(body, status)
+
+@app.route('/api/sessions/<session_id>', methods=['GET', 'POST', 'DELETE'])
+def session_summary(session_id: str):
+    """Read, append to or close a summarization session"""
+    if request.method == 'POST':
+        body, status = handle_session_append(session_id, _request_json())
+    elif request.method == 'DELETE':
+        body, status = handle_delete_session(session_id)
+    else:
+        body, status = handle_get_session(session_id, request.args.get('fields'))
+    return _json_response(body, status)
+
+def _signed_in_user() -> Optional[str]:
+    """User id from the authenticating proxy's header, if configured and present"""
+    header = Config.AUTH_USER_HEADER
+    return (header and request.headers.get(header, '').strip()) or None
+
+@app.route('/api/summaries', methods=['GET'])
+def list_summaries():
+    """Page through the summary history"""
+    body, status = handle_list_summaries(request.args, _signed_in_user())
+    return _json_response(body, status)
+
+@app.route('/api/search', methods=['GET'])
+def search_summaries():
+    """Full-text search over the summary history"""
+    body, status = handle_search(request.args, _signed_in_user())
+    return _json_response(body, status)
+
+@app.route('/api/summaries/<summary_id>', methods=['GET'])
+def get_summary(summary_id: str):
+    """A stored summary"""
+    body, status = handle_get_summary(summary_id, request.args.get('fields'), _signed_in_user())
+    return _json_response(body, status)
+
+@app.route('/api/keywords', methods=['POST'])
+def extract_keywords():
+    """Extract keywords from text"""
+    body, status = handle_keywords(request.get_json())
+    return _json_response(body, status)
+
+@app.route('/api/batch-summarize', methods=['POST'])
+def batch_summarize():
+    """Summarize multiple texts in batch"""
+    body, status = handle_batch_summarize(_request_json(), _signed_in_user())
+    return _json_response(body, status)
+
+@app.route('/api/batch-summarize/stream', methods=['POST'])
+def batch_summarize_stream():
+    """Summarize an NDJSON stream of articles, streaming one result per line as each finishes"""
+    stream = request.stream
+    max_in_flight = Config.STREAM_MAX_IN_FLIGHT
+    try:
+        fields = parse_summary_fields(request.args.get('fields'))
+    except ValueError as e:
+        return _json_response({'error': str(e)}, 400)
+    
+    def finish(future, index: int, text: str, options: Dict[str, Any]) -> bytes:
+        try:
+            outcome = future.result()
+        except BrokenProcessPool as e:
+            # Not retried: the article may be what killed the worker; the next submit starts a fresh pool
+            outcome = {'index': index, 'error': f'Failed to summarize text {index+1}: the batch worker stopped ({e})'}
+        if 'result' in outcome:
+            summarizer.store_summary(text, options, outcome['result'])
+            _observe_batch_outcome(outcome, text)
+        return _ndjson(_stream_entry(outcome, fields))
+    
+    def generate() -> Iterator[bytes]:
+        # At most max_in_flight articles are read ahead of the results sent back
+        in_flight: Dict[Any, Tuple[int, str, Dict[str, Any]]] = {}
+        try:
+            for index, text, options, error in _iter_ndjson_articles(stream, Config.STREAM_MAX_LINE_BYTES):
+                if error is not None:
+                    yield _ndjson({'error': error, 'index': index})
+                    continue
+                if not text.strip():
+                    continue
+                
+                start = time.perf_counter()
+                cached = summarizer.cached_summary(text, options)
+                if cached is not None:
+                    yield _ndjson(_stream_entry({'index': index, 'result': cached,
+                                                 'processing_time_ms': round((time.perf_counter() - start) * 1000, 2)},
+                                                fields))
+                    continue
+                
+                future = batch_executor.submit(_summarize_batch_item, (index, text, options))
+                in_flight[future] = (index, text, options)
+                
+                # Send whatever is ready; block only when the window is full
+                timeout = None if len(in_flight) >= max_in_flight else 0
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield finish(future, *in_flight.pop(future))
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield finish(future, *in_flight.pop(future))
+        except BrokenProcessPool:
+            # A fresh pool could not be started either
+            yield _ndjson({'error': 'Batch worker pool failed; remaining texts were not processed'})
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return _json_response({'error': 'Endpoint not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return _json_response({'error': 'Internal server error'}, 500)
+
+# Cold start cost, reported on /api/health and /api/metrics
+boot_stats: Dict[str, Any] = {
+    'import_seconds': round(time.perf_counter() - _import_started, 4),
+    'warmup_seconds': None
+}
+
+# Short texts covering the script-only and the langdetect detection tiers
+WARMUP_TEXTS = (
+    'The summarizer is warming up. It loads language profiles and tables. Then it serves requests quickly.',
+    'यह एक हिंदी वाक्य है। भारत एक महत्वपूर्ण देश है। यहाँ कई भाषाएँ बोली जाती हैं।',
+    'இது ஒரு தமிழ் வாக்கியம். இது இரண்டாவது வாக்கியம்.'
+)
+
+_warmup_lock = threading.Lock()
+
+def _warm_pipeline(_: Any = None) -> int:
+    """Run every pipeline stage once so lazy imports and language profiles are loaded"""
+    summarizer.language_processor.load_langdetect()
+    for text in WARMUP_TEXTS:
+        summarizer.language_processor._detect_language_uncached(text)
+        summarizer._summarize_text_uncached(text, {})
+    return os.getpid()
+
+def warmup(batch_pool: bool = Config.WARMUP_BATCH_POOL) -> Dict[str, Any]:
+    """Preload everything the first request would otherwise pay for; call before taking traffic"""
+    with _warmup_lock:
+        if boot_stats['warmup_seconds'] is None:
+            start = time.perf_counter()
+            _warm_pipeline()
+            if batch_pool:
+                batch_executor.warmup(_warm_pipeline)
+            boot_stats['warmup_seconds'] = round(time.perf_counter() - start, 4)
+    return boot_stats
 
 if __name__ == '__main__':
     print("🚀 Starting Advanced Multilingual Text Summarizer API...")
@@ -493,9 +2092,21 @@ if __name__ == '__main__':
     print("   POST /api/detect-language - Detect text language")
     print("   POST /api/text-stats - Get text statistics")
     print("   POST /api/summarize - Generate summary")
+    print("   POST /api/summarize/raw - Summarize a streamed plain-text body")
+    print("   POST /api/sessions - Start an incremental summarization session")
+    print("   GET/POST/DELETE /api/sessions/<id> - Read, append to or close a session")
+    print("   GET  /api/summaries - Page through the summary history")
+    print("   GET  /api/summaries/<id> - Get a stored summary")
+    print("   GET  /api/search - Search the summary history")
     print("   POST /api/keywords - Extract keywords")
     print("   POST /api/batch-summarize - Batch summarization")
+    print("   POST /api/batch-summarize/stream - Streaming NDJSON batch summarization")
+    print("   GET  /api/metrics - Prometheus metrics")
     print("\n🔧 To install required packages:")
-    print("   pip install flask flask-cors nltk textstat langdetect numpy scikit-learn")
+    print("   pip install flask flask-cors langdetect numpy scipy")
+    
+    if Config.WARMUP_ON_START:
+        warmup()
+    print(f"\n⏱️  Import: {boot_stats['import_seconds']}s, warmup: {boot_stats['warmup_seconds']}s")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the summarizer API
+
+Serves the same routes and JSON contracts as the Flask app in app.py, but
+request bodies and responses are handled on an event loop, so slow clients
+only hold a coroutine. Summarization and the other CPU-bound handlers run on
+a bounded thread pool (batch items on the process pool from app.py).
+
+Run with:  uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from metrics import metrics_registry
+from models import parse_summary_fields
+from app import (
+    summarizer, batch_executor, _summarize_batch_item,
+    handle_health, handle_languages, handle_detect_language, handle_text_stats,
+    handle_summarize, handle_summarize_stream, handle_keywords, handle_batch_summarize, query_options,
+    handle_create_session, handle_session_append, handle_get_session, handle_delete_session,
+    handle_list_summaries, handle_get_summary, handle_search,
+    render_metrics, observe_request, admit_request, release_request, warmup,
+    _parse_ndjson_article, _oversized_line_error, _stream_entry, _ndjson, _observe_batch_outcome, encode_json
+)
+
+Handler = Callable[..., Tuple[Dict[str, Any], int]]
+
+SESSION_PREFIX = '/api/sessions/'
+SUMMARY_PREFIX = '/api/summaries/'
+
+class BodyTooLarge(Exception):
+    pass
+
+class AsyncSummarizerApp:
+    """Minimal ASGI application routing to the shared request handlers"""
+
+    def __init__(self, cpu_threads: int = Config.ASGI_CPU_THREADS,
+                 max_body_bytes: int = Config.ASGI_MAX_BODY_BYTES):
+        self.cpu_executor = ThreadPoolExecutor(max_workers=cpu_threads, thread_name_prefix='summarizer-cpu')
+        self.max_body_bytes = max_body_bytes
+
+        # path -> (method, handler, takes a JSON body)
+        self.routes: Dict[str, Tuple[str, Handler, bool]] = {
+            '/api/health': ('GET', handle_health, False),
+            '/api/languages': ('GET', handle_languages, False),
+            '/api/detect-language': ('POST', handle_detect_language, True),
+            '/api/text-stats': ('POST', handle_text_stats, True),
+            '/api/summarize': ('POST', handle_summarize, True),
+            '/api/keywords': ('POST', handle_keywords, True),
+            '/api/batch-summarize': ('POST', handle_batch_summarize, True),
+            '/api/sessions': ('POST', handle_create_session, True)
+        }
+        # /api/sessions/<session_id>: method -> (handler, takes a JSON body)
+        self.session_routes: Dict[str, Tuple[Handler, bool]] = {
+            'GET': (handle_get_session, False),
+            'POST': (handle_session_append, True),
+            'DELETE': (handle_delete_session, False)
+        }
+        # Routes answered outside the JSON handler table
+        self.special_routes = ('/api/batch-summarize/stream', '/api/summarize/raw', '/api/metrics', '/api/summaries',
+                               '/api/search')
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[[], Awaitable[Dict[str, Any]]],
+                       send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if not metrics_registry.enabled:
+            await self._handle(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        statuses: List[int] = []
+
+        async def send_and_record_status(message: Dict[str, Any]) -> None:
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            await send(message)
+
+        try:
+            await self._handle(scope, receive, send_and_record_status)
+        finally:
+            observe_request(self._endpoint(scope['path']), scope['method'], statuses[0] if statuses else 500,
+                            time.perf_counter() - start)
+
+    def _endpoint(self, path: str) -> str:
+        """Route pattern of a path, named as in the Flask app"""
+        if path in self.routes or path in self.special_routes:
+            return path
+        if path.startswith(SESSION_PREFIX):
+            return SESSION_PREFIX + '<session_id>'
+        if path.startswith(SUMMARY_PREFIX):
+            return SUMMARY_PREFIX + '<summary_id>'
+        return 'unmatched'
+
+    async def _handle(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope['method'] == 'OPTIONS':
+            # CORS preflight, as answered by flask_cors
+            await self._send(send, 200, b'', [
+                (b'access-control-allow-methods', b'GET, POST, DELETE, OPTIONS'),
+                (b'access-control-allow-headers', b'Content-Type, ' + Config.DEADLINE_HEADER.encode('latin-1'))
+            ])
+            return
+
+        # Rate limit and admission control, before the body is read
+        headers = dict(scope.get('headers') or ())
+        header = Config.RATE_LIMIT_CLIENT_HEADER.lower().encode('latin-1')
+        client = header and headers.get(header, b'').decode('latin-1').split(',')[0].strip()
+        if not client:
+            client = (scope.get('client') or ('',))[0]
+        content_length = headers.get(b'content-length', b'')
+        cost, rejection = admit_request(client, self._endpoint(scope['path']),
+                                        int(content_length) if content_length.isdigit() else None)
+        if rejection is not None:
+            await self._send_json(send, rejection, 429,
+                                  [(b'retry-after', str(rejection['retry_after']).encode('ascii'))])
+            return
+        try:
+            await self._route(scope, receive, send)
+        finally:
+            release_request(cost)
+
+    async def _route(self, scope: Dict[str, Any], receive, send) -> None:
+        method = scope['method']
+        path = scope['path']
+
+        if path == '/api/metrics':
+            if method != 'GET':
+                await self._send_json(send, {'error': 'Method not allowed'}, 405)
+                return
+            body = await asyncio.get_running_loop().run_in_executor(self.cpu_executor, render_metrics)
+            await self._send(send, 200, body.encode('utf-8'), [(b'content-type', b'text/plain; version=0.0.4')])
+            return
+
+        if path == '/api/batch-summarize/stream':
+            if method != 'POST':
+                await self._send_json(send, {'error': 'Method not allowed'}, 405)
+                return
+            await self._batch_summarize_stream(scope, receive, send)
+            return
+
+        if path == '/api/summarize/raw':
+            if method != 'POST':
+                await self._send_json(send, {'error': 'Method not allowed'}, 405)
+                return
+            await self._summarize_raw(scope, receive, send)
+            return
+
+        if (path in ('/api/summaries', '/api/search')
+                or path.startswith(SUMMARY_PREFIX) and len(path) > len(SUMMARY_PREFIX)):
+            # Summary history and search: GET only, parameters in the query string
+            if method != 'GET':
+                await self._send_json(send, {'error': 'Method not allowed'}, 405)
+                return
+            query = self._query(scope)
+            viewer = self._viewer(scope)
+            if path == '/api/summaries':
+                handler, args = handle_list_summaries, [query, viewer]
+            elif path == '/api/search':
+                handler, args = handle_search, [query, viewer]
+            else:
+                handler, args = handle_get_summary, [path[len(SUMMARY_PREFIX):], query.get('fields'), viewer]
+            try:
+                body, status = await asyncio.get_running_loop().run_in_executor(self.cpu_executor, handler, *args)
+            except Exception:
+                body, status = {'error': 'Internal server error'}, 500
+            await self._send_json(send, body, status)
+            return
+
+        args: List[Any] = []
+        route = self.routes.get(path)
+        if route is None and path.startswith(SESSION_PREFIX) and len(path) > len(SESSION_PREFIX):
+            args.append(path[len(SESSION_PREFIX):])
+            handler_entry = self.session_routes.get(method)
+            if handler_entry is None:
+                await self._send_json(send, {'error': 'Method not allowed'}, 405)
+                return
+            route = (method,) + handler_entry
+        if route is None:
+            await self._send_json(send, {'error': 'Endpoint not found'}, 404)
+            return
+
+        route_method, handler, takes_body = route
+        if method != route_method:
+            await self._send_json(send, {'error': 'Method not allowed'}, 405)
+            return
+
+        fields = self._query(scope).get('fields')
+        if takes_body:
+            try:
+                data = json.loads(await self._read_body(receive))
+            except BodyTooLarge:
+                await self._send_json(send, {'error': f'Request body exceeds {self.max_body_bytes} bytes'}, 413)
+                return
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await self._send_json(send, {'error': 'Request body must be a JSON object'}, 400)
+                return
+            # A `fields` projection may also come in the query string, and a deadline in a header, as with Flask
+            if fields and 'fields' not in data:
+                data['fields'] = fields
+            deadline = dict(scope.get('headers') or ()).get(Config.DEADLINE_HEADER.lower().encode('latin-1'))
+            if deadline and 'deadline_ms' not in data:
+                data['deadline_ms'] = deadline.decode('latin-1')
+            args.append(data)
+            if handler in (handle_summarize, handle_batch_summarize):
+                args.append(self._viewer(scope))
+        elif fields and handler is handle_get_session:
+            args.append(fields)
+
+        try:
+            body, status = await asyncio.get_running_loop().run_in_executor(self.cpu_executor, handler, *args)
+        except Exception:
+            body, status = {'error': 'Internal server error'}, 500
+        await self._send_json(send, body, status)
+
+    @staticmethod
+    def _query(scope: Dict[str, Any]) -> Dict[str, str]:
+        return dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+
+    @staticmethod
+    def _viewer(scope: Dict[str, Any]) -> Optional[str]:
+        """User id from the authenticating proxy's header, if configured and present"""
+        header = Config.AUTH_USER_HEADER.lower().encode('latin-1')
+        return (header and dict(scope.get('headers') or ()).get(header, b'').decode('latin-1').strip()) or None
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # The server accepts connections only once startup completes
+                if Config.WARMUP_ON_START:
+                    await asyncio.get_running_loop().run_in_executor(self.cpu_executor, warmup)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if sys.version_info >= (3, 9):
+                    self.cpu_executor.shutdown(wait=False, cancel_futures=True)
+                else:
+                    self.cpu_executor.shutdown(wait=False)
+                batch_executor.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive) -> bytes:
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            body += message.get('body', b'')
+            if len(body) > self.max_body_bytes:
+                raise BodyTooLarge()
+            more_body = message.get('more_body', False)
+        return bytes(body)
+
+    async def _iter_body_lines(self, receive, max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+        """Yield the lines of a request body as they arrive; None stands for an oversized line"""
+        buffer = bytearray()
+        skipping = False
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            buffer += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            start = 0
+            while True:
+                end = buffer.find(b'\n', start)
+                if end < 0:
+                    break
+                if skipping:
+                    skipping = False
+                elif end - start > max_line_bytes:
+                    yield None
+                else:
+                    yield bytes(buffer[start:end + 1])
+                start = end + 1
+            del buffer[:start]
+
+            if len(buffer) > max_line_bytes:
+                # Drop the rest of an oversized line without buffering it
+                if not skipping:
+                    skipping = True
+                    yield None
+                buffer.clear()
+
+        if buffer and not skipping:
+            yield bytes(buffer)
+
+    async def _summarize_raw(self, scope: Dict[str, Any], receive, send) -> None:
+        """Summarize a plain-text body on a CPU thread that pulls the body from the loop as it analyzes"""
+        loop = asyncio.get_running_loop()
+        options = query_options(self._query(scope))
+
+        def body_chunks():
+            more_body = True
+            while more_body:
+                message = asyncio.run_coroutine_threadsafe(receive(), loop).result()
+                if message['type'] == 'http.disconnect':
+                    return
+                yield message.get('body', b'')
+                more_body = message.get('more_body', False)
+
+        try:
+            body, status = await loop.run_in_executor(self.cpu_executor, handle_summarize_stream, body_chunks(), options)
+        except Exception:
+            body, status = {'error': 'Internal server error'}, 500
+        await self._send_json(send, body, status)
+
+    def _submit_item(self, item: Tuple[int, str, Dict[str, Any]]) -> asyncio.Future:
+        """Summarize one streamed article off the event loop"""
+        if batch_executor.max_workers > 1:
+            return asyncio.wrap_future(batch_executor.submit(_summarize_batch_item, item))
+        # Without a process pool BatchExecutor.submit runs inline, which would block the loop
+        return asyncio.get_running_loop().run_in_executor(self.cpu_executor, _summarize_batch_item, item)
+
+    async def _batch_summarize_stream(self, scope: Dict[str, Any], receive, send) -> None:
+        """Async counterpart of the Flask NDJSON streaming endpoint"""
+        try:
+            fields = parse_summary_fields(self._query(scope).get('fields'))
+        except ValueError as e:
+            await self._send_json(send, {'error': str(e)}, 400)
+            return
+        max_line_bytes = Config.STREAM_MAX_LINE_BYTES
+        max_in_flight = Config.STREAM_MAX_IN_FLIGHT
+        in_flight: Dict[asyncio.Future, Tuple[int, str, Dict[str, Any]]] = {}
+        loop = asyncio.get_running_loop()
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/x-ndjson'),
+                        (b'access-control-allow-origin', b'*')]
+        })
+
+        async def write(entry: Dict[str, Any]) -> None:
+            await send({'type': 'http.response.body', 'body': _ndjson(entry), 'more_body': True})
+
+        async def finish(future: asyncio.Future) -> None:
+            index, text, options = in_flight.pop(future)
+            try:
+                outcome = future.result()
+            except BrokenProcessPool as e:
+                # Not retried: the article may be what killed the worker; the next submit starts a fresh pool
+                outcome = {'index': index, 'error': f'Failed to summarize text {index+1}: the batch worker stopped ({e})'}
+            if 'result' in outcome:
+                # Hashing the article (and indexing its signature) is CPU work: keep it off the loop
+                await loop.run_in_executor(self.cpu_executor, summarizer.store_summary, text, options, outcome['result'])
+                _observe_batch_outcome(outcome, text)
+            await write(_stream_entry(outcome, fields))
+
+        try:
+            index = -1
+            async for line in self._iter_body_lines(receive, max_line_bytes):
+                if line is not None and not line.strip():
+                    continue
+                index += 1
+                if line is None:
+                    await write({'error': _oversized_line_error(index, max_line_bytes), 'index': index})
+                    continue
+
+                text, options, error = _parse_ndjson_article(index, line)
+                if error is not None:
+                    await write({'error': error, 'index': index})
+                    continue
+                if not text.strip():
+                    continue
+
+                start = time.perf_counter()
+                cached = await loop.run_in_executor(self.cpu_executor, summarizer.cached_summary, text, options)
+                if cached is not None:
+                    await write(_stream_entry({'index': index, 'result': cached,
+                                               'processing_time_ms': round((time.perf_counter() - start) * 1000, 2)},
+                                              fields))
+                    continue
+
+                in_flight[self._submit_item((index, text, options))] = (index, text, options)
+
+                # Send whatever is ready; wait only when the window is full
+                if len(in_flight) >= max_in_flight:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in [future for future in in_flight if future.done()]:
+                    await finish(future)
+
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    await finish(future)
+        except BrokenProcessPool:
+            # A fresh pool could not be started either
+            await write({'error': 'Batch worker pool failed; remaining texts were not processed'})
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def _send_json(self, send, body: Dict[str, Any], status: int,
+                         headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        with metrics_registry.stage('encode_json'):
+            encoded = encode_json(body)
+        await self._send(send, status, encoded, [(b'content-type', b'application/json')] + (headers or []))
+
+    async def _send(self, send, status: int, body: bytes, headers: List[Tuple[bytes, bytes]]) -> None:
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers + [
+                (b'content-length', str(len(body)).encode('ascii')),
+                (b'access-control-allow-origin', b'*')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+app = AsyncSummarizerApp()
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting Advanced Multilingual Text Summarizer API (ASGI)...")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,67 @@
+"""
+Files that several server processes write: an exclusive lock across
+processes, and replacement through a temporary file of the writer's own
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, BinaryIO, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # not on Windows: run a single API process there
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path (created if missing) against other processes"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        yield  # closing the file releases the lock
+
+def try_lock(path: str) -> Optional[IO[str]]:
+    """Open file of path holding an exclusive lock, or None while another process holds it.
+
+    The lock lasts until the file is closed, or until the process exits.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    file = open(path, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return None
+    return file
+
+@contextmanager
+def replace_file(path: str) -> Iterator[BinaryIO]:
+    """File to write that atomically replaces path once the block completes.
+
+    It is a uniquely named temporary file in the same directory, so writers
+    never share one; it is synced before the rename and removed on error.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(prefix=f'{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+__all__ = [
+    'file_lock',
+    'replace_file',
+    'try_lock'
+]
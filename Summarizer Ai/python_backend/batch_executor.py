@@ -0,0 +1,137 @@
+"""
+Process pool for CPU-bound batch work such as /api/batch-summarize
+"""
+
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+# Prefix of the pool workers' process names, so that modules can tell them from server
+# processes at import time. A spawned worker takes its name before it re-imports the server's
+# __main__ module, when a pool initializer (or anything set in the worker) would come too late;
+# unlike an environment variable, the name is not passed on to processes the server starts.
+WORKER_NAME_PREFIX = 'SummarizerBatchWorker-'
+IN_POOL_WORKER = multiprocessing.current_process().name.startswith(WORKER_NAME_PREFIX)
+
+def _worker_context(start_method: str) -> multiprocessing.context.BaseContext:
+    """Multiprocessing context whose processes carry the worker name prefix"""
+    context = multiprocessing.get_context(start_method)
+
+    class WorkerContext(type(context)):
+        def Process(self, *args, **kwargs):
+            # A plain process of the start method, so it pickles as usual for spawn
+            process = context.Process(*args, **kwargs)
+            process.name = WORKER_NAME_PREFIX + process.name
+            return process
+
+    return WorkerContext()
+
+class BatchExecutor:
+    """Runs batch items on a lazily created, reused process pool.
+
+    Summarization is pure Python and holds the GIL, so threads do not help;
+    separate processes do. Small batches run inline to avoid the pool round trip.
+    When a worker dies (e.g. killed for memory), the pool is replaced and the
+    unfinished items are retried in it, max_retries times at most: an item
+    that kills its worker never runs in the server process.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: str = 'spawn',
+                 min_parallel_items: int = 2, max_retries: int = 1):
+        self.max_workers = max(1, max_workers or multiprocessing.cpu_count())
+        self.start_method = start_method
+        self.min_parallel_items = min_parallel_items
+        self.max_retries = max_retries
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()  # requests may arrive on several server threads
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=_worker_context(self.start_method)
+                )
+            return self._pool
+
+    def workers_for(self, num_items: int) -> int:
+        """Number of processes a batch of num_items will run on"""
+        if self.max_workers <= 1 or num_items < self.min_parallel_items:
+            return 1
+        return min(self.max_workers, num_items)
+
+    def submit(self, fn: Callable[[Any], Any], item: Any) -> Future:
+        """Schedule fn(item); without a pool it runs right away and returns a finished future"""
+        if self.max_workers <= 1:
+            future: Future = Future()
+            try:
+                future.set_result(fn(item))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        pool = self._get_pool()
+        try:
+            return pool.submit(fn, item)
+        except BrokenProcessPool:
+            # A worker died since the last submit: the pool takes no more work
+            self._discard(pool)
+            return self._get_pool().submit(fn, item)
+
+    def map(self, fn: Callable[[Any], Any], items: Sequence[Any],
+            on_failure: Optional[Callable[[Any, BaseException], Any]] = None) -> List[Any]:
+        """Apply fn to every item, preserving order; fn must be a picklable top-level function.
+
+        Items whose worker died max_retries + 1 times get on_failure(item, error)
+        as their result; without on_failure, the BrokenProcessPool is raised.
+        """
+        if self.workers_for(len(items)) == 1:
+            return [fn(item) for item in items]
+
+        results: List[Any] = [None] * len(items)
+        unfinished = list(range(len(items)))
+        for _ in range(self.max_retries + 1):
+            futures = [(position, self.submit(fn, items[position])) for position in unfinished]
+            unfinished = []
+            for position, future in futures:
+                try:
+                    results[position] = future.result()
+                except BrokenProcessPool as e:
+                    error = e
+                    unfinished.append(position)
+            if not unfinished:
+                return results
+
+        if on_failure is None:
+            raise error
+        for position in unfinished:
+            results[position] = on_failure(items[position], error)
+        return results
+
+    def warmup(self, fn: Callable[[Any], Any]) -> None:
+        """Start the worker processes and run fn in them (e.g. to preload models); no-op without a pool"""
+        if self.max_workers <= 1:
+            return
+        # Workers are spawned on demand, one per task submitted while the others are busy
+        list(self._get_pool().map(fn, range(self.max_workers)))
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool, unless another request has already replaced it"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            if sys.version_info >= (3, 9):
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                pool.shutdown(wait=False)
+
+__all__ = ['BatchExecutor', 'IN_POOL_WORKER']
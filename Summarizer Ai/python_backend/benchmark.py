@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Advanced Multilingual Summarizer
+Micro-benchmarks per pipeline stage and an end-to-end load generator,
+both on a deterministic synthetic corpus, with results saved as JSON
+
+    python benchmark.py micro --languages hi en --sizes 1024 16384
+    python benchmark.py load --server asgi --endpoint summarize --requests 200 --concurrency 8
+    python benchmark.py store --rows 1000000
+    python benchmark.py search --docs 1000000
+    python benchmark.py compare old.json new.json
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import Config
+from synthetic_corpus import SyntheticCorpus, DEFAULT_SIZES
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """q-th percentile (0-100) of sorted values, linearly interpolated"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Count, mean and percentiles of latency samples in milliseconds"""
+    values = sorted(samples_ms)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'min': round(values[0], 3),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'p99': round(percentile(values, 99), 3),
+        'max': round(values[-1], 3)
+    }
+
+def run_metadata(corpus: SyntheticCorpus) -> Dict[str, Any]:
+    """Environment details stored with every result file"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus_seed': corpus.seed,
+        'batch_workers': Config.BATCH_WORKERS,
+        'summary_cache_enabled': Config.SUMMARY_CACHE_ENABLED
+    }
+
+class MicroBenchmark:
+    """Times individual pipeline stages in-process, with result caches disabled"""
+
+    STAGES = ('detect_language', 'split_sentences', 'tokenize_text', 'analyze', 'score',
+              'text_stats', 'extract_keywords', 'select', 'select_mmr', 'select_textrank',
+              'summarize_text', 'serialize', 'serialize_slim')
+
+    # Response projection timed by the serialize_slim stage
+    SLIM_FIELDS = 'summary,keywords,stats'
+
+    def __init__(self, min_time: float = 0.2, min_runs: int = 5, max_runs: int = 200):
+        from app import AdvancedSummarizer
+
+        self.summarizer = AdvancedSummarizer()
+        self.summarizer.summary_cache = None
+        self.summarizer.keyword_cache = None
+        self.summarizer.min_hasher = None
+        self.summarizer.duplicate_index = None
+        self.processor = self.summarizer.language_processor
+        self.min_time = min_time
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+
+    def _stage(self, stage: str, text: str, language: str) -> Callable[[], Any]:
+        processor = self.processor
+        summarizer = self.summarizer
+        document = processor.analyze(text, language)
+
+        def summarize() -> Any:
+            processor.detection_cache.clear()
+            return summarizer.summarize_text(text, {})
+
+        def select(mode: str) -> Callable[[], List[int]]:
+            options = {'mode': mode}
+            if mode == 'textrank':
+                # Ranking is the costly part of this mode; the frequency scores are computed once
+                summarizer.score_document(document)
+                return lambda: summarizer.select_sentences(
+                    document, summarizer.calculate_sentence_scores(document, mode), options)
+            sentence_scores = summarizer.calculate_sentence_scores(document, mode)
+            return lambda: summarizer.select_sentences(document, sentence_scores, options)
+
+        def serialize(fields: Optional[str]) -> Callable[[], bytes]:
+            from app import encode_json
+            from models import parse_summary_fields
+
+            result = summarizer.summarize_text(text, {'language': language})
+            projection = parse_summary_fields(fields)
+            return lambda: encode_json(result.to_dict(projection))
+
+        stages: Dict[str, Callable[[], Any]] = {
+            'detect_language': lambda: processor._detect_language_uncached(text),
+            'split_sentences': lambda: processor.split_sentences(text, language),
+            'tokenize_text': lambda: processor.tokenize_text(text, language),
+            'analyze': lambda: processor.analyze(text, language),
+            'score': lambda: summarizer.scoring_engine.score_document(document),
+            'text_stats': lambda: summarizer.calculate_document_stats(document),
+            'extract_keywords': lambda: summarizer.extract_keywords(text, language, 10),
+            'select': lambda: select('score'),
+            'select_mmr': lambda: select('mmr'),
+            'select_textrank': lambda: select('textrank'),
+            'summarize_text': summarize,
+            'serialize': lambda: serialize(None),
+            'serialize_slim': lambda: serialize(self.SLIM_FIELDS)
+        }
+        if stage.startswith(('select', 'serialize')):
+            return stages[stage]()
+        return stages[stage]
+
+    def time_call(self, fn: Callable[[], Any]) -> List[float]:
+        """Run fn until min_time has passed (within min_runs..max_runs) and return the timings in ms"""
+        fn()  # warmup
+        samples: List[float] = []
+        deadline = time.perf_counter() + self.min_time
+        while len(samples) < self.max_runs and (len(samples) < self.min_runs or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def run(self, corpus: SyntheticCorpus, languages: Sequence[str], sizes: Sequence[int],
+            stages: Sequence[str] = STAGES) -> List[Dict[str, Any]]:
+        results = []
+        for language, size, _, text in corpus.documents(languages, sizes):
+            for stage in stages:
+                fn = self._stage(stage, text, language)
+                samples = self.time_call(fn)
+                summary = latency_summary(samples)
+                mean_seconds = summary['mean'] / 1000
+                entry = {'stage': stage, 'language': language, 'size': size, 'chars': len(text), **summary,
+                         'chars_per_sec': round(len(text) / mean_seconds) if mean_seconds else None}
+                if stage.startswith('serialize'):
+                    entry['response_bytes'] = len(fn())
+                results.append(entry)
+                print(f"   {stage:<17} {language:<4} {size:>6}  p50 {summary['p50']:>9.3f} ms"
+                      f"  p95 {summary['p95']:>9.3f} ms  ({summary['count']} runs)")
+        return results
+
+class StoreBenchmark:
+    """Bulk inserts and history pagination on a SummaryStore of synthetic rows.
+
+    Rows are copies of a few real summaries (one per language) with new ids,
+    users and timestamps, so the table has the row sizes of real traffic.
+    """
+
+    def __init__(self, path: str, users: int = 10_000, public_share: float = 0.1, seed: int = 42):
+        from store import SummaryStore
+
+        self.store = SummaryStore(path, Config.SUMMARY_STORE_BATCH_SIZE, Config.SUMMARY_STORE_FLUSH_INTERVAL,
+                                  Config.SUMMARY_STORE_MAX_PENDING)
+        self.users = users
+        self.public_share = public_share
+        self.random = random.Random(seed)
+
+    def templates(self, corpus: SyntheticCorpus, languages: Sequence[str], size: int) -> List[Any]:
+        from app import AdvancedSummarizer
+
+        summarizer = AdvancedSummarizer()
+        return [summarizer.summarize_text(corpus.document(language, size), {'language': language})
+                for language in languages]
+
+    def insert(self, templates: Sequence[Any], rows: int) -> Dict[str, Any]:
+        """save() every row as requests would, then wait for the writer; returns throughput and save() latency"""
+        start_time = datetime(2024, 1, 1)
+        pick = self.random.random
+        save_ms: List[float] = []
+        start = time.perf_counter()
+        for row in range(rows):
+            result = replace(templates[row % len(templates)], id=f'{row:012x}',
+                             user_id=f'user{int(pick() * self.users)}', is_public=pick() < self.public_share,
+                             created_at=(start_time + timedelta(seconds=row)).isoformat())
+            if row % 100 == 0:
+                saved = time.perf_counter()
+                self.store.save(result)
+                save_ms.append((time.perf_counter() - saved) * 1000)
+            else:
+                self.store.save(result)
+        self.store.flush()
+        seconds = time.perf_counter() - start
+        return {'rows': rows, 'seconds': round(seconds, 2), 'rows_per_sec': round(rows / seconds),
+                'save_ms': latency_summary(save_ms), 'batches': self.store.batches}
+
+    def read(self, languages: Sequence[str], pages: int, page_size: int) -> Dict[str, Any]:
+        """Latency of first pages, of walking deep into histories, and of lookups by id"""
+        store = self.store
+        rows = len(store)
+        timings: Dict[str, List[float]] = {'user_first_page': [], 'user_next_page': [], 'user_language_page': [],
+                                           'public_language_page': [], 'get_by_id': []}
+
+        def timed(name: str, fn: Callable[[], Any]) -> Any:
+            start = time.perf_counter()
+            value = fn()
+            timings[name].append((time.perf_counter() - start) * 1000)
+            return value
+
+        for _ in range(pages):
+            user = f'user{self.random.randrange(self.users)}'
+            _, cursor = timed('user_first_page', lambda: store.page(user, limit=page_size))
+            if cursor is not None:
+                timed('user_next_page', lambda: store.page(user, limit=page_size, cursor=cursor))
+            timed('user_language_page', lambda: store.page(user, self.random.choice(languages), page_size))
+            timed('get_by_id', lambda: store.get(f'{self.random.randrange(rows):012x}', include_text=False))
+
+        # The public feed of one language, page after page
+        cursor = None
+        for _ in range(pages):
+            _, cursor = timed('public_language_page',
+                              lambda: store.page(None, languages[0], page_size, cursor))
+            if cursor is None:
+                break
+        return {name: latency_summary(samples) for name, samples in timings.items()}
+
+    def close(self) -> None:
+        self.store.close()
+
+class SearchBenchmark:
+    """Indexing, queries and save/load of a SearchIndex over synthetic token streams.
+
+    Documents are drawn straight from each language's Zipf-weighted corpus
+    vocabulary, stopwords left out as the tokenizer would, so a million
+    documents index in minutes; the frequent words then have postings in most
+    documents, the worst case for a query.
+    """
+
+    QUERIES = ('rare', 'common', 'two_terms', 'three_terms', 'language_filter', 'user_filter')
+
+    def __init__(self, corpus: SyntheticCorpus, languages: Sequence[str], users: int = 10_000,
+                 public_share: float = 0.5, seed: int = 42):
+        import numpy as np
+        from search import SearchIndex
+        from tokenizer import STOPWORDS
+
+        self.np_random = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+        self.languages = list(languages)
+        self.users = users
+        self.public_share = public_share
+        self.vocabularies = {}
+        for language in self.languages:
+            stopwords = set(STOPWORDS.get(language, ()))
+            self.vocabularies[language] = [word for word in corpus.vocabulary(language) if word not in stopwords]
+        size = len(next(iter(self.vocabularies.values())))
+        self.cumulative = np.cumsum(1.0 / np.arange(1, size + 1))
+        self.cumulative /= self.cumulative[-1]
+        self.index = SearchIndex(Config.SEARCH_BM25_K1, Config.SEARCH_BM25_B, Config.SEARCH_SEGMENT_POSTINGS,
+                                 Config.SEARCH_MERGE_FACTOR)
+
+    def _ranks(self, count: int):
+        return self.cumulative.searchsorted(self.np_random.random(count))
+
+    def build(self, docs: int, tokens_per_doc: int, chunk: int = 10_000) -> Dict[str, Any]:
+        """Add docs documents of about tokens_per_doc tokens, compressing as the API does"""
+        index = self.index
+        pick = self.random.random
+        start = time.perf_counter()
+        for first in range(0, docs, chunk):
+            count = min(chunk, docs - first)
+            lengths = self.np_random.integers(tokens_per_doc // 2, tokens_per_doc * 3 // 2 + 1, count)
+            ranks = self._ranks(int(lengths.sum())).tolist()
+            position = 0
+            for offset, length in enumerate(lengths.tolist()):
+                doc = first + offset
+                language = self.languages[doc % len(self.languages)]
+                vocabulary = self.vocabularies[language]
+                index.add(f'{doc:012x}', [vocabulary[rank] for rank in ranks[position:position + length]], language,
+                          f'user{int(pick() * self.users)}', pick() < self.public_share, doc + 1)
+                position += length
+                if doc % 1000 == 999:
+                    index.maintain()
+        index.maintain()
+        seconds = time.perf_counter() - start
+        return {'docs': docs, 'seconds': round(seconds, 2), 'docs_per_sec': round(docs / seconds), **index.stats()}
+
+    def query(self, kind: str) -> Tuple[List[str], Optional[str], Optional[str]]:
+        """(tokens, language, user_id) of a random query of a kind"""
+        language = self.random.choice(self.languages)
+        vocabulary = self.vocabularies[language]
+        size = len(vocabulary)
+        rare = lambda: vocabulary[self.random.randrange(size // 10, size)]
+        common = lambda: vocabulary[self.random.randrange(min(100, size))]
+        if kind == 'rare':
+            return [rare()], None, None
+        if kind == 'common':
+            return [common()], None, None
+        if kind == 'two_terms':
+            return [common(), rare()], None, None
+        if kind == 'language_filter':
+            return [common(), rare()], language, None
+        if kind == 'user_filter':
+            return [common(), rare()], None, f'user{self.random.randrange(self.users)}'
+        # Words as frequent as in the documents
+        return [vocabulary[rank] for rank in self._ranks(3).tolist()], None, None
+
+    def search(self, queries: int, limit: int) -> Dict[str, Any]:
+        timings = {}
+        for kind in self.QUERIES:
+            samples = []
+            for _ in range(queries):
+                tokens, language, user_id = self.query(kind)
+                start = time.perf_counter()
+                self.index.search(tokens, language, user_id, limit)
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[kind] = latency_summary(samples)
+        return timings
+
+    def save_and_load(self, path: str) -> Dict[str, Any]:
+        from search import SearchIndex
+
+        start = time.perf_counter()
+        file_bytes = self.index.save(path)
+        saved = time.perf_counter()
+        loaded = SearchIndex.load(path)
+        load_seconds = time.perf_counter() - saved
+        tokens, _, _ = self.query('two_terms')
+        if loaded.search(tokens) != self.index.search(tokens):
+            raise AssertionError('Loaded index answers differently')
+        return {'file_bytes': file_bytes, 'save_seconds': round(saved - start, 2),
+                'load_seconds': round(load_seconds, 2)}
+
+class LocalServer:
+    """Starts the API in a subprocess for the duration of a load test"""
+
+    def __init__(self, kind: str = 'flask', port: int = 5050, startup_timeout: float = 60.0):
+        self.kind = kind
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.base_url = f'http://127.0.0.1:{port}'
+        self._process: Optional[subprocess.Popen] = None
+        self._directory: Optional[tempfile.TemporaryDirectory] = None
+
+    def _command(self) -> List[str]:
+        if self.kind == 'asgi':
+            return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1',
+                    '--port', str(self.port), '--log-level', 'warning']
+        return [sys.executable, '-c',
+                f"from app import app; app.run(host='127.0.0.1', port={self.port}, threaded=True)"]
+
+    def __enter__(self) -> str:
+        import requests
+
+        # One client sends every request, so the per-client rate limit would cap the load;
+        # the summary history (and the files that follow it) goes to a scratch directory
+        self._directory = tempfile.TemporaryDirectory()
+        env = {**os.environ, 'RATE_LIMIT_ENABLED': 'False', 'SUMMARY_STORE_ENABLED': 'True',
+               'DATA_DIR': self._directory.name}
+        for name in ('SUMMARY_STORE_PATH', 'SEARCH_INDEX_PATH', 'CORPUS_IDF_PATH'):
+            env.pop(name, None)
+        self._process = subprocess.Popen(self._command(), cwd=BACKEND_DIR, env=env,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f'{self.kind} server exited with code {self._process.returncode}')
+            try:
+                if requests.get(f'{self.base_url}/api/health', timeout=1).status_code == 200:
+                    return self.base_url
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f'{self.kind} server did not become healthy within {self.startup_timeout}s')
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+class LoadGenerator:
+    """Sends concurrent requests to a running server and records their latency"""
+
+    ENDPOINTS = ('summarize', 'detect-language', 'keywords', 'text-stats', 'batch-summarize')
+
+    def __init__(self, base_url: str, concurrency: int = 8, timeout: float = 120.0, batch_size: int = 10):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._local = threading.local()
+
+    def _session(self):
+        import requests
+
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _request(self, endpoint: str, texts: List[str]) -> Tuple[str, Dict[str, Any]]:
+        if endpoint == 'batch-summarize':
+            return '/api/batch-summarize', {'texts': texts, 'options': {'length': 'medium'}}
+        if endpoint == 'summarize':
+            return '/api/summarize', {'text': texts[0], 'options': {'length': 'medium'}}
+        return f'/api/{endpoint}', {'text': texts[0]}
+
+    def _send(self, endpoint: str, texts: List[str]) -> Tuple[float, Optional[int], Optional[str]]:
+        path, payload = self._request(endpoint, texts)
+        start = time.perf_counter()
+        try:
+            response = self._session().post(self.base_url + path, json=payload, timeout=self.timeout)
+            response.content
+            return (time.perf_counter() - start) * 1000, response.status_code, None
+        except Exception as e:
+            return (time.perf_counter() - start) * 1000, None, type(e).__name__
+
+    def run(self, endpoint: str, documents: Sequence[str], num_requests: int,
+            warmup_documents: Sequence[str] = ()) -> Dict[str, Any]:
+        """Issue num_requests requests, cycling through documents, and summarize the latencies.
+
+        Warmup requests use their own documents so that they do not fill the
+        server's summary cache with the measured ones.
+        """
+        per_request = self.batch_size if endpoint == 'batch-summarize' else 1
+
+        def batches(texts: Sequence[str], count: int) -> List[List[str]]:
+            return [[texts[(i * per_request + j) % len(texts)] for j in range(per_request)] for i in range(count)]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            if warmup_documents:
+                warmup_batches = batches(warmup_documents, math.ceil(len(warmup_documents) / per_request))
+                list(pool.map(lambda texts: self._send(endpoint, texts), warmup_batches))
+            start = time.perf_counter()
+            outcomes = list(pool.map(lambda texts: self._send(endpoint, texts), batches(documents, num_requests)))
+            duration = time.perf_counter() - start
+
+        status_codes: Dict[str, int] = {}
+        errors: Dict[str, int] = {}
+        for _, status, error in outcomes:
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+
+        return {
+            'endpoint': endpoint,
+            'requests': num_requests,
+            'concurrency': self.concurrency,
+            'texts_per_request': per_request,
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(num_requests / duration, 2) if duration else None,
+            'status_codes': status_codes,
+            'errors': errors,
+            'latency_ms': latency_summary([latency for latency, _, _ in outcomes])
+        }
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print p50/p95 changes between two result files"""
+    print(f"📊 {old['meta'].get('git_commit')} -> {new['meta'].get('git_commit')}")
+
+    old_micro = {(e['stage'], e['language'], e['size']): e for e in old.get('micro', [])}
+    for entry in new.get('micro', []):
+        before = old_micro.get((entry['stage'], entry['language'], entry['size']))
+        if before is None or not before.get('p50'):
+            continue
+        ratio = entry['p50'] / before['p50']
+        print(f"   {entry['stage']:<17} {entry['language']:<4} {entry['size']:>6}"
+              f"  p50 {before['p50']:>9.3f} -> {entry['p50']:>9.3f} ms  ({ratio - 1:+.1%})")
+
+    if 'load' in old and 'load' in new:
+        for key in ('p50', 'p95', 'p99'):
+            before, after = old['load']['latency_ms'].get(key), new['load']['latency_ms'].get(key)
+            if before:
+                print(f"   load {key:<4} {before:>9.3f} -> {after:>9.3f} ms  ({after / before - 1:+.1%})")
+        print(f"   load throughput {old['load']['throughput_rps']} -> {new['load']['throughput_rps']} req/s")
+
+def save_results(results: Dict[str, Any], output: Optional[str], mode: str) -> str:
+    path = output or f"benchmark-{mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+def main():
+    """Main function to run benchmarks"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Advanced Multilingual Summarizer")
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    def add_corpus_arguments(subparser):
+        subparser.add_argument("--languages", nargs='+', default=Config.SUPPORTED_LANGUAGES, help="Language codes")
+        subparser.add_argument("--sizes", nargs='+', type=int, default=list(DEFAULT_SIZES), help="Document sizes in characters")
+        subparser.add_argument("--seed", type=int, default=42, help="Corpus seed")
+        subparser.add_argument("--output", help="Result file (default: benchmark-<mode>-<timestamp>.json)")
+
+    micro = subparsers.add_parser('micro', help="Time each pipeline stage in-process")
+    add_corpus_arguments(micro)
+    micro.add_argument("--stages", nargs='+', default=list(MicroBenchmark.STAGES), choices=MicroBenchmark.STAGES)
+    micro.add_argument("--min-time", type=float, default=0.2, help="Seconds spent per stage and document")
+
+    load = subparsers.add_parser('load', help="Load test a running or locally started server")
+    add_corpus_arguments(load)
+    load.add_argument("--url", help="Base URL of a running server")
+    load.add_argument("--server", choices=('flask', 'asgi'), default='flask', help="Server to start when --url is not given")
+    load.add_argument("--port", type=int, default=5050)
+    load.add_argument("--endpoint", choices=LoadGenerator.ENDPOINTS, default='summarize')
+    load.add_argument("--requests", type=int, default=200)
+    load.add_argument("--warmup", type=int, default=10, help="Warmup requests, on documents not used afterwards")
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--distinct", type=int, default=50,
+                      help="Distinct documents per language and size; repeats beyond that hit the summary cache")
+
+    store = subparsers.add_parser('store', help="Bulk insert into and page through the summary store")
+    add_corpus_arguments(store)
+    store.add_argument("--rows", type=int, default=1_000_000)
+    store.add_argument("--users", type=int, default=10_000)
+    store.add_argument("--pages", type=int, default=1000, help="Pages read per query kind")
+    store.add_argument("--page-size", type=int, default=Config.SUMMARY_PAGE_SIZE)
+    store.add_argument("--path", help="Database file (default: a temporary file, removed afterwards)")
+
+    search = subparsers.add_parser('search', help="Index synthetic documents and time search queries")
+    add_corpus_arguments(search)
+    search.add_argument("--docs", type=int, default=1_000_000)
+    search.add_argument("--tokens", type=int, default=120, help="Average tokens per document")
+    search.add_argument("--vocabulary", type=int, default=50_000, help="Corpus words per language")
+    search.add_argument("--users", type=int, default=10_000)
+    search.add_argument("--queries", type=int, default=500, help="Queries timed per kind")
+    search.add_argument("--limit", type=int, default=Config.SEARCH_RESULTS)
+    search.add_argument("--path", help="Index file (default: a temporary file, removed afterwards)")
+
+    compare = subparsers.add_parser('compare', help="Compare two result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+
+    args = parser.parse_args()
+
+    if args.mode == 'compare':
+        with open(args.old, encoding='utf-8') as old_file, open(args.new, encoding='utf-8') as new_file:
+            compare_results(json.load(old_file), json.load(new_file))
+        return
+
+    corpus = SyntheticCorpus(seed=args.seed)
+    results: Dict[str, Any] = {'meta': run_metadata(corpus)}
+
+    if args.mode == 'micro':
+        print("🚀 Running pipeline micro-benchmarks")
+        results['micro'] = MicroBenchmark(min_time=args.min_time).run(corpus, args.languages, args.sizes, args.stages)
+    elif args.mode == 'store':
+        with tempfile.TemporaryDirectory() as directory:
+            path = args.path or os.path.join(directory, 'summaries.db')
+            bench = StoreBenchmark(path, args.users, seed=args.seed)
+            print(f"🚀 Inserting {args.rows} summaries into {path}")
+            insert = bench.insert(bench.templates(corpus, args.languages, args.sizes[0]), args.rows)
+            print(f"   {insert['rows_per_sec']} rows/s, save() p50 {insert['save_ms']['p50']} ms"
+                  f" p99 {insert['save_ms']['p99']} ms")
+            read = bench.read(args.languages, args.pages, args.page_size)
+            for name, summary in read.items():
+                print(f"   {name:<21} p50 {summary.get('p50')} ms  p99 {summary.get('p99')} ms")
+            bench.close()
+            results['store'] = {'insert': insert, 'read': read, 'file_bytes': os.path.getsize(path)}
+    elif args.mode == 'search':
+        corpus = SyntheticCorpus(seed=args.seed, vocabulary_size=args.vocabulary)
+        bench = SearchBenchmark(corpus, args.languages, args.users, seed=args.seed)
+        print(f"🚀 Indexing {args.docs} documents of ~{args.tokens} tokens")
+        build = bench.build(args.docs, args.tokens)
+        print(f"   {build['docs_per_sec']} docs/s, {build['postings']} postings in {build['segments']} segments,"
+              f" {build['compressed_bytes'] / build['postings']:.2f} bytes per posting")
+        queries = bench.search(args.queries, args.limit)
+        for name, summary in queries.items():
+            print(f"   {name:<16} p50 {summary.get('p50')} ms  p99 {summary.get('p99')} ms")
+        with tempfile.TemporaryDirectory() as directory:
+            persisted = bench.save_and_load(args.path or os.path.join(directory, 'search.idx'))
+        print(f"   Saved {persisted['file_bytes']} bytes in {persisted['save_seconds']}s,"
+              f" loaded in {persisted['load_seconds']}s")
+        results['search'] = {'build': build, 'queries': queries, 'persist': persisted}
+    else:
+        documents = [text for _, _, _, text in corpus.documents(args.languages, args.sizes, args.distinct)]
+        warmup_corpus = SyntheticCorpus(seed=args.seed + 1)
+        warmup_documents = [warmup_corpus.document(args.languages[i % len(args.languages)],
+                                                   args.sizes[i % len(args.sizes)], i)
+                            for i in range(args.warmup)]
+        generator = lambda url: LoadGenerator(url, args.concurrency)
+        print(f"🚀 Load testing /api/{args.endpoint}: {args.requests} requests, concurrency {args.concurrency}")
+        if args.url:
+            results['load'] = generator(args.url).run(args.endpoint, documents, args.requests, warmup_documents)
+        else:
+            with LocalServer(args.server, args.port) as url:
+                results['load'] = generator(url).run(args.endpoint, documents, args.requests, warmup_documents)
+            results['load']['server'] = args.server
+        load_results = results['load']
+        latency = load_results['latency_ms']
+        print(f"   Throughput: {load_results['throughput_rps']} req/s")
+        print(f"   Latency: p50 {latency.get('p50')} ms, p95 {latency.get('p95')} ms, p99 {latency.get('p99')} ms")
+        print(f"   Status codes: {load_results['status_codes']}  Errors: {load_results['errors']}")
+
+    print(f"📄 Results saved to {save_results(results, args.output, args.mode)}")
+
+if __name__ == "__main__":
+    main()
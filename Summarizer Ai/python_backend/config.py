@@ -15,7 +15,28 @@ class Config:
     # API settings
     API_VERSION = 'v1'
     MAX_TEXT_LENGTH = 50000  # Maximum characters per request
-    MAX_BATCH_SIZE = 10      # Maximum texts per batch request
+    MAX_DOCUMENT_LENGTH = int(os.environ.get('MAX_DOCUMENT_LENGTH', 0)) or 20_000_000  # Hierarchical /api/summarize
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 500))  # Maximum texts per batch request
+    
+    # Batch processing (CPU-bound, so items run in separate processes)
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or os.cpu_count() or 1
+    BATCH_START_METHOD = 'spawn'  # Safe to use from a multithreaded server
+    BATCH_MAX_RETRIES = 1         # Times the unfinished items of a dead worker are retried in a fresh pool
+    
+    # Streaming NDJSON batches: articles summarized at once per request (backpressure)
+    STREAM_MAX_IN_FLIGHT = int(os.environ.get('STREAM_MAX_IN_FLIGHT', 0)) or 2 * BATCH_WORKERS
+    STREAM_MAX_LINE_BYTES = MAX_TEXT_LENGTH * 4 + 4096  # UTF-8 text plus JSON overhead
+    STREAM_MAX_SENTENCE_CHARS = 10000  # Streamed text without a delimiter is cut after this many characters
+    STREAM_READ_BYTES = 64 * 1024      # Chunk size for reading raw text request bodies
+    
+    # Async (ASGI) serving: request I/O on the event loop, CPU work on these threads
+    ASGI_CPU_THREADS = int(os.environ.get('ASGI_CPU_THREADS', 0)) or BATCH_WORKERS
+    ASGI_MAX_BODY_BYTES = int(os.environ.get('ASGI_MAX_BODY_BYTES', 0)) or 64 * 1024 * 1024
+    
+    # Hierarchical (map-reduce) summarization of long documents on the batch pool
+    HIERARCHICAL_THRESHOLD = int(os.environ.get('HIERARCHICAL_THRESHOLD', 0)) or MAX_TEXT_LENGTH  # characters
+    HIERARCHICAL_CHUNK_CHARS = 20000    # Chunk size, cut at sentence boundaries
+    HIERARCHICAL_CHUNK_LENGTH = 'medium'  # Summary length of each chunk
     
     # Summarization settings
     DEFAULT_SUMMARY_LENGTH = 'medium'
@@ -29,8 +50,118 @@ class Config:
         'kn', 'ml', 'or', 'pa', 'as', 'mai', 'sa', 'ne'
     ]
     
-    # Rate limiting (requests per minute)
-    RATE_LIMIT = 100
+    # TextRank sentence ranking ("mode": "textrank")
+    TEXTRANK_DAMPING = 0.85
+    TEXTRANK_TOLERANCE = 1e-6       # L1 change in rank that ends the power iteration
+    TEXTRANK_MAX_ITERATIONS = 100
+    TEXTRANK_MAX_POSTINGS = 100     # Terms in more sentences than this add no edges
+    
+    # Per-request deadlines ("deadline_ms" option or X-Deadline-Ms header). Stages estimate their
+    # cost from these seeds (milliseconds per unit, refined from observed runs) and take cheaper
+    # paths when the remaining budget is short.
+    DEADLINE_HEADER = 'X-Deadline-Ms'
+    DEADLINE_COST_SEEDS = {
+        'langdetect': 0.005,    # per sampled character
+        'analyze': 0.00017,     # per character: split and tokenize
+        'score': 0.00002,       # per character: sparse TF-IDF
+        'signature': 0.00008,   # per character: tokenize and MinHash, for near-duplicate lookups
+        'textrank': 0.008,      # per sentence
+        'mmr': 0.000015         # per sentence per pick
+    }
+    DEADLINE_DETECT_SHARE = 0.25           # Of the remaining budget, at most this goes to language detection
+    DEADLINE_ANALYZE_SHARE = 0.6           # ... and this to analysis and scoring
+    DEADLINE_MIN_LANGDETECT_SAMPLE = 200   # Characters; below this, detect from the script alone
+    DEADLINE_MIN_SENTENCES = 20            # Sentences analyzed however short the budget
+    
+    # Result cache for repeated articles (keyed by text hash and options)
+    SUMMARY_CACHE_ENABLED = os.environ.get('SUMMARY_CACHE_ENABLED', 'True').lower() == 'true'
+    SUMMARY_CACHE_SIZE = 1024   # Entries per cache (summaries and keywords)
+    SUMMARY_CACHE_TTL = 3600    # Seconds; 0 disables expiry
+    
+    # Near-duplicate articles (edited copies of one wire story) reuse a summary of an earlier copy
+    NEAR_DUPLICATE_ENABLED = os.environ.get('NEAR_DUPLICATE_ENABLED', 'True').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0)) or 0.85  # Estimated Jaccard of shingles
+    NEAR_DUPLICATE_INDEX_SIZE = int(os.environ.get('NEAR_DUPLICATE_INDEX_SIZE', 0)) or 4096  # Recent articles indexed
+    NEAR_DUPLICATE_PERMUTATIONS = 128  # MinHash signature length
+    NEAR_DUPLICATE_BANDS = 16          # LSH bands; 8 rows each puts the candidate cut-off near 0.7
+    NEAR_DUPLICATE_SHINGLE_SIZE = 3    # Tokens per shingle
+    
+    # Directory of the files the server writes: summary history, search index, corpus IDF table
+    DATA_DIR = os.environ.get('DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    
+    # Summary history: results of /api/summarize and /api/batch-summarize, original text included,
+    # are kept in an SQLite file, inserted in batches by a background thread so saving adds no
+    # latency to the request. Off unless enabled; search and corpus IDF counting follow it.
+    SUMMARY_STORE_ENABLED = os.environ.get('SUMMARY_STORE_ENABLED', 'False').lower() == 'true'
+    SUMMARY_STORE_PATH = os.environ.get('SUMMARY_STORE_PATH') or os.path.join(DATA_DIR, 'summaries.db')
+    SUMMARY_STORE_BATCH_SIZE = 256       # Rows per insert transaction
+    SUMMARY_STORE_FLUSH_INTERVAL = 0.5   # Seconds a saved summary may wait for its batch
+    SUMMARY_STORE_MAX_PENDING = 10_000   # Beyond this, saving waits for a flush
+    SUMMARY_PAGE_SIZE = 20               # History listing page size, and its maximum
+    SUMMARY_MAX_PAGE_SIZE = 100
+    # Header carrying the id of the signed-in user, set by an authenticating proxy in front of the
+    # server (clients must not be able to set it). Private summaries are only listed, fetched and
+    # searched by their owner; without the header nobody is signed in and only public ones are shown.
+    AUTH_USER_HEADER = os.environ.get('AUTH_USER_HEADER', '')  # e.g. X-Authenticated-User
+    
+    # Full-text search over the summary history (/api/search): an in-memory inverted index
+    # that follows the store and is saved to disk, so a restart maps it instead of rebuilding
+    SEARCH_ENABLED = os.environ.get('SEARCH_ENABLED', 'True').lower() == 'true'
+    SEARCH_INDEX_PATH = os.environ.get('SEARCH_INDEX_PATH') or os.path.join(DATA_DIR, 'search.idx')
+    SEARCH_SYNC_INTERVAL = 1.0           # Seconds between checks for new summaries (saves wake it sooner)
+    SEARCH_SAVE_INTERVAL = 300           # Seconds between saves of a changed index
+    SEARCH_SEGMENT_POSTINGS = 1 << 18    # Postings buffered (and scanned by each query) before they are compressed
+    SEARCH_MERGE_FACTOR = 8              # Segments of similar size merged at a time
+    SEARCH_BM25_K1 = 1.2                 # Term frequency saturation
+    SEARCH_BM25_B = 0.75                 # Document length normalization
+    SEARCH_RESULTS = 10                  # Results per search, and their maximum
+    SEARCH_MAX_RESULTS = 100
+    
+    # Corpus IDF for keywords and sentence scores: document frequencies per language, counted
+    # from the summary history (or built with corpus_stats.py) into a table every process maps
+    CORPUS_IDF_ENABLED = os.environ.get('CORPUS_IDF_ENABLED', 'True').lower() == 'true'
+    CORPUS_IDF_PATH = os.environ.get('CORPUS_IDF_PATH') or os.path.join(DATA_DIR, 'corpus_idf.bin')
+    CORPUS_IDF_MIN_DOCUMENTS = 1000      # Documents a language needs before its weights are used
+    CORPUS_IDF_SAVE_INTERVAL = 60        # Seconds between counting new summaries into the table
+    CORPUS_IDF_RELOAD_INTERVAL = 30      # Seconds between checks for a newer table
+    
+    # Incremental summarization sessions (live blogs, running transcripts)
+    SESSION_MAX_COUNT = int(os.environ.get('SESSION_MAX_COUNT', 0)) or 1000  # Least recently used are dropped
+    SESSION_TTL = int(os.environ.get('SESSION_TTL', 0)) or 1800              # Seconds since the last append
+    SESSION_MAX_CHARS = int(os.environ.get('SESSION_MAX_CHARS', 0)) or 1_000_000  # Text per session
+    
+    # Language detection settings
+    LANGUAGE_DETECTION_CACHE_SIZE = 4096  # Memoized detections, keyed by text hash
+    LANGDETECT_SAMPLE_SIZE = 2000         # Characters passed to langdetect for shared scripts
+    
+    # Startup: preload langdetect profiles and lazy imports (and the batch pool) before serving
+    WARMUP_ON_START = os.environ.get('WARMUP_ON_START', 'True').lower() == 'true'
+    WARMUP_BATCH_POOL = os.environ.get('WARMUP_BATCH_POOL', 'True').lower() == 'true'
+    
+    # Encode responses with orjson when installed (JSON_ORJSON=False forces the json module)
+    JSON_ORJSON = os.environ.get('JSON_ORJSON', 'True').lower() == 'true'
+    
+    # Per-stage timings and counters served on /api/metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Rate limiting: token buckets per client and endpoint, refilled at RATE_LIMIT cost units per minute.
+    # A request costs its endpoint's base cost plus one unit per RATE_LIMIT_COST_BYTES of body.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT = int(os.environ.get('RATE_LIMIT', 0)) or 100
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 0)) or RATE_LIMIT  # Bucket capacity
+    RATE_LIMIT_COST_BYTES = 10_000
+    RATE_LIMIT_ENDPOINT_COSTS = {
+        '/api/batch-summarize': 5,
+        '/api/batch-summarize/stream': 20,  # The body is streamed, so its size is not known up front
+        '/api/summarize/raw': 5
+    }
+    RATE_LIMIT_EXEMPT = ('/api/health', '/api/metrics')
+    RATE_LIMIT_CLIENT_HEADER = os.environ.get('RATE_LIMIT_CLIENT_HEADER', '')  # e.g. X-Forwarded-For behind a proxy
+    RATE_LIMIT_MAX_CLIENTS = 100_000  # Buckets kept; idle ones are dropped once refilled
+    
+    # Admission control: total cost of the requests in progress before new ones get 429
+    ADMISSION_MAX_COST = int(os.environ.get('ADMISSION_MAX_COST', 0)) or 64 * BATCH_WORKERS
+    ADMISSION_RETRY_AFTER = 1  # Seconds suggested to clients turned away by a busy server
     
     # CORS settings
     CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:5173']
@@ -0,0 +1,387 @@
+"""
+Corpus document frequencies per language, for IDF weights: counted from the
+summary history or built offline from a corpus, and saved to one table that
+every process memory-maps read-only
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from atomic_file import file_lock, replace_file, try_lock
+
+_MAGIC = b'SUMIDF01'
+_ALIGNMENT = 64
+# Tokens up to this many bytes are hashed together; longer ones (URLs and the like) one at a time
+_HASHED_BYTES = 64
+# Odd multipliers of the 8-byte words of a token (and of its length), fixed so that hashes are stable
+_MULTIPLIERS = np.frombuffer(hashlib.blake2b(b'corpus-idf', digest_size=64).digest() +
+                             hashlib.blake2b(b'corpus-idf-length', digest_size=8).digest(), '<u8') | np.uint64(1)
+_BYTE_MASKS = np.array([(1 << (8 * count)) - 1 for count in range(9)], np.uint64)
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+def term_hashes(terms: Sequence[str]) -> np.ndarray:
+    """Stable 64-bit hashes of tokens (hash() differs between processes).
+
+    A token's hash is the sum of its little-endian 8-byte words and its length,
+    each times an odd multiplier, modulo 2**64: tokens differing in a single
+    word never collide. All tokens are encoded in one call and hashed together,
+    about 4x faster than a hashlib call per token (still used for tokens over
+    64 bytes). Tokens never contain spaces, which separate them here.
+    """
+    count = len(terms)
+    if not count:
+        return np.zeros(0, np.uint64)
+    encoded = ' '.join(terms).encode('utf-8')
+    data = np.frombuffer(encoded + bytes(_HASHED_BYTES), np.uint8)
+    starts = np.zeros(count, np.int64)
+    starts[1:] = np.flatnonzero(data[:len(encoded)] == 32) + 1
+    lengths = np.empty(count, np.int64)
+    lengths[:-1] = starts[1:] - starts[:-1] - 1
+    lengths[-1] = len(encoded) - starts[-1]
+
+    # The 8-byte word at every byte offset (unaligned reads), with the bytes past a token's end masked off
+    words = np.ndarray((len(data) - 7,), '<u8', data, strides=(1,))
+    offsets = np.arange(0, -(-min(int(lengths.max()), _HASHED_BYTES) // 8) * 8, 8)
+    blocks = words[starts[:, None] + offsets]
+    blocks &= _BYTE_MASKS[np.clip(lengths[:, None] - offsets, 0, 8)]
+    blocks *= _MULTIPLIERS[:len(offsets)]
+    hashes = blocks.sum(axis=1, dtype=np.uint64) + lengths.astype(np.uint64) * _MULTIPLIERS[-1]
+
+    for position in np.flatnonzero(lengths > _HASHED_BYTES).tolist():
+        digest = hashlib.blake2b(terms[position].encode('utf-8'), digest_size=8).digest()
+        hashes[position] = int.from_bytes(digest, 'little')
+    return hashes
+
+def _merge_counts(keys: List[np.ndarray], counts: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct keys and their summed counts"""
+    merged, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    return merged, np.bincount(inverse.ravel(), np.concatenate(counts), len(merged)).astype(np.uint32)
+
+class IdfTable:
+    """Document frequencies saved by DocumentFrequencies, memory-mapped read-only.
+
+    Each language holds a sorted array of term hashes and one of document
+    frequencies, so opening the table reads a small header only, a lookup is a
+    binary search over the mapping, and all processes share the same page
+    cache pages. Every reload_interval seconds at most, the file is checked
+    for a newer table. A language is only weighted (idf() returns an array)
+    once it counts min_documents.
+    """
+
+    def __init__(self, path: str, min_documents: int = 1000, reload_interval: float = 30.0):
+        self.path = path
+        self.min_documents = min_documents
+        self.reload_interval = reload_interval
+        self.last_seq = 0
+        # language -> (documents, term hashes, document frequencies)
+        self.languages: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._checked = float('-inf')
+
+    def refresh(self, force: bool = False) -> bool:
+        """Map the file again if it was replaced; returns whether the table changed"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return False
+        self._checked = now
+        try:
+            stat = os.stat(self.path)
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            identity = None
+        if identity == self._identity:
+            return False
+
+        languages, last_seq = {}, 0
+        if identity is not None:
+            try:
+                languages, last_seq = self._read(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring the corpus IDF table: {e}")
+        self.languages, self.last_seq = languages, last_seq
+        self._identity = identity
+        return True
+
+    @staticmethod
+    def _read(path: str) -> Tuple[Dict[str, Tuple[int, np.ndarray, np.ndarray]], int]:
+        with open(path, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f'{path} is not a corpus IDF table')
+            (length,) = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(length).decode('utf-8'))
+        data_start = _align(len(_MAGIC) + 8 + length)
+        # A plain array over the mapping: memmap slices run Python hooks on every access
+        mapped = np.asarray(np.memmap(path, np.uint8, 'r')) if header['languages'] else None
+
+        languages = {}
+        for language, (documents, offset, terms) in header['languages'].items():
+            start = data_start + offset
+            keys = mapped[start:start + terms * 8].view('<u8')
+            start = _align(start + terms * 8)
+            languages[language] = (documents, keys, mapped[start:start + terms * 4].view('<u4'))
+        return languages, header['last_seq']
+
+    def documents(self, language: str) -> int:
+        """Documents counted for a language"""
+        self.refresh()
+        entry = self.languages.get(language)
+        return entry[0] if entry is not None else 0
+
+    def frequencies(self, language: str, terms: Sequence[str]) -> np.ndarray:
+        """Number of counted documents of the language containing each term"""
+        self.refresh()
+        entry = self.languages.get(language)
+        if entry is None or not len(entry[1]) or not len(terms):
+            return np.zeros(len(terms), np.int64)
+        _, keys, frequencies = entry
+        hashes = term_hashes(terms)
+        # Sorted lookups walk the keys in order, a few times faster over a large table
+        order = np.argsort(hashes)
+        positions = np.empty(len(hashes), np.int64)
+        positions[order] = np.searchsorted(keys, hashes[order])
+        np.minimum(positions, len(keys) - 1, out=positions)
+        return np.where(keys[positions] == hashes, frequencies[positions], 0)
+
+    def idf(self, language: str, terms: Sequence[str]) -> Optional[np.ndarray]:
+        """Smoothed IDF of each term, ln((1 + N) / (1 + df)) + 1; None while the language counts
+        fewer than min_documents documents"""
+        documents = self.documents(language)
+        if documents < self.min_documents:
+            return None
+        return np.log((1.0 + documents) / (1.0 + self.frequencies(language, terms))) + 1.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes for monitoring"""
+        self.refresh()
+        return {
+            'languages': {language: {'documents': documents, 'terms': len(keys)}
+                          for language, (documents, keys, _) in sorted(self.languages.items())},
+            'last_seq': self.last_seq
+        }
+
+class DocumentFrequencies:
+    """Counts the documents containing each term, per language, and adds them to an IdfTable file.
+
+    add() counts each distinct term of a document once. New counts stay in
+    this process, compacted every compact_size terms, until save() merges them
+    with the table and atomically replaces its file; readers pick the new file
+    up on their next refresh. follow() counts what a SummaryStore inserts,
+    skipping rows in languages outside `languages` when given (clients name
+    the language of a summary, and each one would get a table). When several
+    API processes share the store, only the one holding the table's counter
+    lock counts it; the others take over if that process exits.
+    """
+
+    def __init__(self, table: IdfTable, compact_size: int = 1 << 20,
+                 languages: Optional[Iterable[str]] = None):
+        self.table = table
+        self.compact_size = compact_size
+        self.languages = frozenset(languages) if languages is not None else None
+        table.refresh(force=True)
+        self.last_seq = table.last_seq
+        self.documents: Dict[str, int] = {}
+        # language -> hash arrays of the documents added since the last compaction
+        self._pending: Dict[str, List[np.ndarray]] = {}
+        self._pending_size = 0
+        # language -> (sorted hashes, counts) since the last save
+        self._counts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counter = None  # the locked counter file, while this process counts the store
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.documents) or (self._counter is not None and self.last_seq != self.table.last_seq)
+
+    def _claim_store(self, store) -> bool:
+        """Whether this process counts store: the one holding the table's counter lock"""
+        if self._counter is None:
+            self._counter = try_lock(f'{self.table.path}.counter')
+            if self._counter is None:
+                return False
+            # Continue from the table's last writer, which may have been another process
+            self.table.refresh(force=True)
+            with self._lock:
+                self.last_seq = self.table.last_seq
+                if self.last_seq > store.max_seq():
+                    self.last_seq = 0  # a new store: its rows have not been counted
+        return True
+
+    def add(self, language: str, terms: Iterable[str], seq: int = 0) -> None:
+        """Count one document; seq is its position in the summary store, if it comes from there"""
+        hashes = np.unique(term_hashes(list(set(terms))))
+        with self._lock:
+            self._pending.setdefault(language, []).append(hashes)
+            self._pending_size += len(hashes)
+            self.documents[language] = self.documents.get(language, 0) + 1
+            self.last_seq = max(self.last_seq, seq)
+            if self._pending_size >= self.compact_size:
+                self._compact()
+
+    def _compact(self) -> None:
+        for language, pending in self._pending.items():
+            keys = list(pending)
+            counts = [np.ones(len(hashes), np.uint32) for hashes in pending]
+            if language in self._counts:
+                keys.append(self._counts[language][0])
+                counts.append(self._counts[language][1])
+            self._counts[language] = _merge_counts(keys, counts)
+        self._pending = {}
+        self._pending_size = 0
+
+    def catch_up(self, store, tokenize: Callable[[str, str], List[str]], batch_size: int = 500) -> int:
+        """Count the rows a SummaryStore inserted since the last call; returns how many"""
+        added = 0
+        while True:
+            rows = store.rows_after(self.last_seq, batch_size)
+            if not rows:
+                return added
+            for seq, _, _, language, _, text in rows:
+                if self.languages is None or language in self.languages:
+                    self.add(language, tokenize(text, language), seq)
+            with self._lock:
+                self.last_seq = max(self.last_seq, rows[-1][0])
+            added += len(rows)
+
+    def follow(self, store, tokenize: Callable[[str, str], List[str]], interval: float = 60.0) -> None:
+        """Every interval seconds, count what store inserted from a background thread and save"""
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    if not self._claim_store(store):
+                        continue
+                    self.catch_up(store, tokenize)
+                    if self.changed:
+                        self.save()
+                except Exception as e:
+                    # Keep following: a thread that died here would leave the weights silently stale
+                    print(f"Corpus IDF update failed: {e}")  # retried at the next interval
+
+        self._thread = threading.Thread(target=run, name='corpus-idf', daemon=True)
+        self._thread.start()
+
+    def close(self, store=None, tokenize: Optional[Callable[[str, str], List[str]]] = None) -> None:
+        """Stop the follow() thread, count what is left in store and save"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if store is not None and tokenize is not None and self._claim_store(store):
+            self.catch_up(store, tokenize)
+        if self.changed:
+            self.save()
+        if self._counter is not None:
+            self._counter.close()
+            self._counter = None
+
+    def save(self) -> int:
+        """Add the new counts to the table file (atomically replaced); returns its size in bytes"""
+        with self._lock:
+            self._compact()
+            counts, self._counts = self._counts, {}
+            documents, self.documents = self.documents, {}
+            last_seq = self.last_seq
+
+        # Other processes (an offline build, say) may add to the table too: each merges into the
+        # latest file under the lock, so that none overwrites another's counts
+        with file_lock(f'{self.table.path}.lock'):
+            return self._merge(counts, documents, last_seq)
+
+    def _merge(self, counts: Dict[str, Tuple[np.ndarray, np.ndarray]], documents: Dict[str, int],
+               last_seq: int) -> int:
+        table = self.table
+        table.refresh(force=True)
+        merged: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+        for language in sorted(set(table.languages) | set(documents)):
+            total, keys, frequencies = table.languages.get(language, (0, np.zeros(0, np.uint64),
+                                                                     np.zeros(0, np.uint32)))
+            if language in counts:
+                keys, frequencies = _merge_counts([keys, counts[language][0]], [frequencies, counts[language][1]])
+            merged[language] = (total + documents.get(language, 0), keys, frequencies)
+
+        header = {'version': 1, 'last_seq': last_seq, 'languages': {}}
+        offset = 0
+        for language, (total, keys, _) in merged.items():
+            header['languages'][language] = [total, offset, len(keys)]
+            offset = _align(_align(offset + len(keys) * 8) + len(keys) * 4)
+        encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        data_start = _align(len(_MAGIC) + 8 + len(encoded))
+
+        with replace_file(table.path) as file:
+            file.write(_MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+            for language, (_, keys, frequencies) in merged.items():
+                start = data_start + header['languages'][language][1]
+                file.seek(start)
+                file.write(np.ascontiguousarray(keys, '<u8').data)
+                file.seek(_align(start + len(keys) * 8))
+                file.write(np.ascontiguousarray(frequencies, '<u4').data)
+            file.truncate(data_start + offset)
+        table.refresh(force=True)
+        return data_start + offset
+
+def main() -> None:
+    """Offline build: count a corpus into the table (added to an existing one unless --replace)"""
+    from config import Config
+    from tokenizer import tokenizer_engine
+
+    parser = argparse.ArgumentParser(description='Build the corpus IDF table')
+    parser.add_argument('--store', help='summary store (SQLite file) to count')
+    parser.add_argument('--jsonl', nargs='*', default=[],
+                        help='files with one {"text": ..., "language": ...} object per line')
+    parser.add_argument('--language', help='language of --jsonl records that have none')
+    parser.add_argument('--output', default=Config.CORPUS_IDF_PATH)
+    parser.add_argument('--replace', action='store_true', help='start from an empty table')
+    args = parser.parse_args()
+    if not args.store and not args.jsonl:
+        parser.error('give --store or --jsonl')
+
+    if args.replace and os.path.exists(args.output):
+        os.remove(args.output)
+    frequencies = DocumentFrequencies(IdfTable(args.output), languages=Config.SUPPORTED_LANGUAGES if args.store else None)
+    started = time.perf_counter()
+    skipped = 0
+    for path in args.jsonl:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                language = record.get('language') or args.language
+                if not language or not record.get('text'):
+                    skipped += 1
+                    continue
+                frequencies.add(language, tokenizer_engine.tokenize(record['text'], language))
+    if args.store:
+        from store import SummaryStore
+        store = SummaryStore(args.store)
+        try:
+            frequencies.catch_up(store, tokenizer_engine.tokenize)
+        finally:
+            store.close()
+
+    counted = sum(frequencies.documents.values())
+    size = frequencies.save()
+    print(f"Counted {counted} documents in {time.perf_counter() - started:.1f}s"
+          f"{f' ({skipped} skipped)' if skipped else ''}; {args.output}: {size} bytes")
+    for language, info in frequencies.table.stats()['languages'].items():
+        print(f"   {language}: {info['documents']} documents, {info['terms']} terms")
+
+__all__ = [
+    'DocumentFrequencies',
+    'IdfTable',
+    'term_hashes'
+]
+
+if __name__ == '__main__':
+    main()
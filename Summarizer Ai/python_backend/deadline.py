@@ -0,0 +1,112 @@
+"""
+Per-request time budgets: stages check what is left and take cheaper paths when it runs short
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+
+class StageCostModel:
+    """Running estimate of each stage's cost in milliseconds per unit of work (characters, sentences).
+
+    Seeded from benchmark figures and updated from observed runs with an
+    exponential moving average, so estimates follow the machine they run on.
+    Runs shorter than min_elapsed_ms are mostly fixed overhead and are ignored,
+    and one run moves an estimate by at most a factor of max_step, so a cold
+    first call (lazy imports, warm-up) cannot throw it off.
+    """
+
+    def __init__(self, seeds: Dict[str, float], smoothing: float = 0.2,
+                 min_elapsed_ms: float = 1.0, max_step: float = 4.0):
+        self.smoothing = smoothing
+        self.min_elapsed_ms = min_elapsed_ms
+        self.max_step = max_step
+        self._ms_per_unit = dict(seeds)
+        self._lock = threading.Lock()
+
+    def estimate(self, stage: str, units: float) -> float:
+        return self._ms_per_unit.get(stage, 0.0) * units
+
+    def affordable(self, budget_ms: float, *stages: str) -> float:
+        """Units of work that fit in budget_ms when each unit goes through all of stages"""
+        per_unit = sum(self._ms_per_unit.get(stage, 0.0) for stage in stages)
+        return max(0.0, budget_ms) / per_unit if per_unit > 0 else float('inf')
+
+    def observe(self, stage: str, units: float, elapsed_ms: float) -> None:
+        if units <= 0 or elapsed_ms < self.min_elapsed_ms:
+            return
+        sample = elapsed_ms / units
+        with self._lock:
+            current = self._ms_per_unit.get(stage)
+            if current is None:
+                self._ms_per_unit[stage] = sample
+            else:
+                sample = min(max(sample, current / self.max_step), current * self.max_step)
+                self._ms_per_unit[stage] = current + self.smoothing * (sample - current)
+
+    def timed(self, stage: str, units: float) -> 'CostTimer':
+        """Context manager observing the run time of a stage; set `units` on it if they change"""
+        return CostTimer(self, stage, units)
+
+class CostTimer:
+    """Times one run of a stage for a StageCostModel"""
+
+    def __init__(self, model: StageCostModel, stage: str, units: float):
+        self.model = model
+        self.stage = stage
+        self.units = units
+
+    def __enter__(self) -> 'CostTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.model.observe(self.stage, self.units, (time.perf_counter() - self.start) * 1000)
+
+class Deadline:
+    """Time budget of one request, with the shortcuts taken to stay within it"""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000
+        self.shortcuts: List[str] = []
+
+    @classmethod
+    def from_value(cls, value) -> Optional['Deadline']:
+        """Deadline of a deadline_ms option or header; None when absent, ValueError when malformed"""
+        if value is None or value == '':
+            return None
+        try:
+            budget_ms = float(value)
+        except (TypeError, ValueError):
+            raise ValueError('deadline_ms must be a number of milliseconds')
+        if not budget_ms > 0 or budget_ms == float('inf'):
+            raise ValueError('deadline_ms must be a positive number of milliseconds')
+        return cls(budget_ms)
+
+    def remaining_ms(self) -> float:
+        return (self.expires_at - time.monotonic()) * 1000
+
+    def take_shortcut(self, name: str) -> None:
+        if name not in self.shortcuts:
+            self.shortcuts.append(name)
+
+    def report(self) -> Dict[str, object]:
+        """Budget, time left and shortcuts taken, for the response"""
+        return {
+            'budget_ms': self.budget_ms,
+            'remaining_ms': round(self.remaining_ms(), 2),
+            'shortcuts': list(self.shortcuts)
+        }
+
+stage_costs = StageCostModel(Config.DEADLINE_COST_SEEDS)
+
+__all__ = [
+    'CostTimer',
+    'Deadline',
+    'StageCostModel',
+    'stage_costs'
+]
@@ -0,0 +1,161 @@
+"""
+Near-duplicate detection with MinHash signatures and LSH banding, for articles
+syndicated in slightly edited copies
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_HASH_MASK = (1 << 32) - 1
+_SHIFT = np.uint64(32)
+_BLOCK_SIZE = 4096
+
+class MinHasher:
+    """MinHash signatures of the word shingles of a token list.
+
+    Each of num_perm multiply-shift hash functions, (a * x + b) mod 2**64 >> 32
+    with odd a, keeps the minimum over the shingles, so the
+    share of equal positions in two signatures estimates the Jaccard similarity
+    of their shingle sets. Shingles are hashed with hash(), which is salted per
+    process: signatures are only comparable within the process that made them.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def shingle_hashes(self, tokens: Sequence[str]) -> np.ndarray:
+        """32-bit hashes of the distinct runs of shingle_size consecutive tokens"""
+        size = self.shingle_size
+        if len(tokens) < size:
+            shingles = {tuple(tokens)} if tokens else set()
+        else:
+            shingles = set(zip(*(tokens[offset:] for offset in range(size))))
+        return np.fromiter((hash(shingle) & _HASH_MASK for shingle in shingles),
+                           dtype=np.uint64, count=len(shingles))
+
+    def signature(self, tokens: Sequence[str]) -> Optional[np.ndarray]:
+        """MinHash signature (uint32 per permutation), or None for an empty token list"""
+        hashes = self.shingle_hashes(tokens)
+        if not len(hashes):
+            return None
+        # Blocks of shingles bound the num_perm x block buffer on long texts; the
+        # arithmetic runs in place and wraps around modulo 2**64 as intended
+        minimum = np.full(self.num_perm, _HASH_MASK, dtype=np.uint64)
+        buffer = np.empty((self.num_perm, min(len(hashes), _BLOCK_SIZE)), dtype=np.uint64)
+        for start in range(0, len(hashes), _BLOCK_SIZE):
+            block = hashes[start:start + _BLOCK_SIZE]
+            permuted = buffer[:, :len(block)]
+            np.multiply(self._a, block, out=permuted)
+            np.add(permuted, self._b, out=permuted)
+            np.right_shift(permuted, _SHIFT, out=permuted)
+            np.minimum(minimum, permuted.min(axis=1), out=minimum)
+        return minimum.astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+        return float(np.count_nonzero(first == second)) / len(first)
+
+class NearDuplicateIndex:
+    """Bounded, thread-safe LSH index of MinHash signatures with a value per entry.
+
+    Signatures are cut into bands of rows; two entries become candidates when
+    any band matches exactly, and a candidate is a match when its estimated
+    similarity reaches the threshold. Entries carry a partition key (e.g. the
+    summary options) that candidates must share. The least recently matched or
+    added entries are dropped beyond maxsize.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.85,
+                 maxsize: int = 4096):
+        if num_perm % bands:
+            raise ValueError(f'num_perm ({num_perm}) must be a multiple of bands ({bands})')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()   # key -> (partition, signature, value)
+        self._buckets: Dict[Tuple, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _band_keys(self, partition: Hashable, signature: np.ndarray) -> List[Tuple]:
+        rows = self.rows
+        return [(partition, band, signature[band * rows:(band + 1) * rows].tobytes())
+                for band in range(self.bands)]
+
+    def query(self, signature: np.ndarray, partition: Hashable = None) -> Optional[Tuple[Hashable, Any, float]]:
+        """Most similar entry at or above the threshold, as (key, value, similarity), or None"""
+        best = None
+        with self._lock:
+            candidates: Set[Hashable] = set()
+            for band_key in self._band_keys(partition, signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            for key in candidates:
+                _, other, value = self._entries[key]
+                similarity = MinHasher.similarity(signature, other)
+                if similarity >= self.threshold and (best is None or similarity > best[2]):
+                    best = (key, value, similarity)
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best[0])
+            self.hits += 1
+        return best
+
+    def add(self, key: Hashable, signature: np.ndarray, value: Any, partition: Hashable = None) -> None:
+        """Index a signature under key (replacing an earlier entry), evicting the oldest if full"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (partition, signature, value)
+            for band_key in self._band_keys(partition, signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        partition, signature, _ = self._entries.pop(key)
+        for band_key in self._band_keys(partition, signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'threshold': self.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+__all__ = [
+    'MinHasher',
+    'NearDuplicateIndex'
+]
@@ -0,0 +1,206 @@
+"""
+In-process metrics: per-stage timers, counters and latency histograms in the Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import Config
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Input size classes (characters) used as the `size` label
+SIZE_BUCKETS = ((1024, '1k'), (4096, '4k'), (16384, '16k'), (65536, '64k'))
+
+STAGE_METRIC = 'summarizer_stage_duration_seconds'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_LANGUAGE_LABELS = frozenset(Config.SUPPORTED_LANGUAGES)
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def size_bucket(num_chars: Optional[int]) -> str:
+    """Size class label: the smallest bucket bound the input fits in"""
+    if num_chars is None:
+        return ''
+    for limit, label in SIZE_BUCKETS:
+        if num_chars <= limit:
+            return label
+    return 'larger'
+
+def language_label(language: Optional[str]) -> str:
+    """Language label: a supported language code, or 'other' (clients choose the language, so it is bounded)"""
+    if not language:
+        return ''
+    return language if language in _LANGUAGE_LABELS else 'other'
+
+class Histogram:
+    """Bucket counts, sum and count of observed values"""
+    __slots__ = ('bounds', 'counts', 'total')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+class StageTimer:
+    """Context manager timing one pipeline stage"""
+    __slots__ = ('registry', 'stage', 'language', 'size', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', stage: str, language: str, size: str):
+        self.registry = registry
+        self.stage = stage
+        self.language = language_label(language)
+        self.size = size
+
+    def set_language(self, language: str) -> None:
+        """Label the observation with a language only known once the stage ran"""
+        self.language = language_label(language)
+
+    def set_size(self, num_chars: int) -> None:
+        """Label the observation with an input size only known once the stage ran (streamed input)"""
+        self.size = size_bucket(num_chars)
+
+    def __enter__(self) -> 'StageTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(STAGE_METRIC, (('stage', self.stage), ('language', self.language), ('size', self.size)),
+                              time.perf_counter() - self.start)
+
+class NullTimer:
+    """Stand-in for StageTimer when metrics are disabled"""
+    __slots__ = ()
+
+    def set_language(self, language: str) -> None:
+        pass
+
+    def set_size(self, num_chars: int) -> None:
+        pass
+
+    def __enter__(self) -> 'NullTimer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+NULL_TIMER = NullTimer()
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and histograms.
+
+    When disabled, stage() hands out a shared no-op timer and inc()/observe()
+    return immediately, so instrumented code pays one attribute check.
+    """
+
+    def __init__(self, enabled: bool = True, latency_buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.latency_buckets = tuple(latency_buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {
+            STAGE_METRIC: 'Time spent per pipeline stage (stages nest: summarize includes analyze and score)'
+        }
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def stage(self, stage: str, language: str = '', size: Optional[int] = None):
+        """Timer for a pipeline stage, labelled by language and input size class"""
+        if not self.enabled:
+            return NULL_TIMER
+        return StageTimer(self, stage, language, size_bucket(size))
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        """Add a value (seconds) to a histogram"""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.latency_buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def set_counter(self, name: str, labels: Labels, value: float) -> None:
+        """Overwrite a counter maintained elsewhere (e.g. cache hit counts), at scrape time"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters.setdefault(name, {})[labels] = value
+
+    def set_gauge(self, name: str, labels: Labels, value: float) -> None:
+        """Set a value that can go up and down"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[labels] = value
+
+    @staticmethod
+    def _format_labels(labels: Labels) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name in sorted(metrics):
+                    if name in self._help:
+                        lines.append(f'# HELP {name} {self._help[name]}')
+                    lines.append(f'# TYPE {name} {kind}')
+                    for labels, value in sorted(metrics[name].items()):
+                        lines.append(f'{name}{self._format_labels(labels)} {value:g}')
+
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                        lines.append(f'{name}_bucket{self._format_labels(labels + (("le", le),))} {cumulative}')
+                    lines.append(f'{name}_sum{self._format_labels(labels)} {histogram.total:.6f}')
+                    lines.append(f'{name}_count{self._format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+# Shared registry; the pool worker processes have their own, unexported copies
+metrics_registry = MetricsRegistry(Config.METRICS_ENABLED)
+
+__all__ = [
+    'MetricsRegistry',
+    'metrics_registry',
+    'StageTimer',
+    'NULL_TIMER',
+    'size_bucket'
+]
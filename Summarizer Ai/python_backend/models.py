@@ -2,11 +2,26 @@
 Data models for the Advanced Multilingual Summarizer
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional
 from datetime import datetime
 import json
 
+from config import Config
+
+def with_slots(cls):
+    """Recreate a dataclass with __slots__ instead of a per-instance __dict__.
+    
+    Same as @dataclass(slots=True), which needs Python 3.10.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+@with_slots
 @dataclass
 class TextStats:
     """Text statistics model"""
@@ -54,6 +69,9 @@ class SummaryOptions:
     include_keywords: bool = True
     max_keywords: int = 10
     confidence_threshold: float = 0.3
+    mode: str = 'score'  # score (top sentences), mmr (top sentences, skipping near-repeats), textrank (sentence graph centrality)
+    mmr_lambda: float = 0.7  # mmr: weight of relevance against redundancy
+    deadline_ms: Optional[float] = None  # Time budget; stages take cheaper paths to stay within it
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -62,7 +80,10 @@ class SummaryOptions:
             'preserve_formatting': self.preserve_formatting,
             'include_keywords': self.include_keywords,
             'max_keywords': self.max_keywords,
-            'confidence_threshold': self.confidence_threshold
+            'confidence_threshold': self.confidence_threshold,
+            'mode': self.mode,
+            'mmr_lambda': self.mmr_lambda,
+            'deadline_ms': self.deadline_ms
         }
 
 @dataclass
@@ -87,6 +108,7 @@ class Comment:
             'likes': self.likes
         }
 
+@with_slots
 @dataclass
 class SummaryResult:
     """Complete summary result model"""
@@ -99,15 +121,17 @@ class SummaryResult:
     compression_ratio: float
     keywords: List[str]
     confidence: float
-    created_at: datetime
+    created_at: str  # ISO 8601
     is_public: bool = False
     likes: int = 0
     comments: List[Comment] = field(default_factory=list)
     shares: int = 0
     user_id: Optional[str] = None
+    reused: bool = False  # Served from the cache or a near-duplicate's summary (so not saved again); not serialized
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def to_dict(self, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """Response dict, optionally projected to some fields; unlike asdict() nothing is deep-copied"""
+        data = {
             'id': self.id,
             'summary': self.summary,
             'original_text': self.original_text,
@@ -117,13 +141,16 @@ class SummaryResult:
             'compression_ratio': self.compression_ratio,
             'keywords': self.keywords,
             'confidence': self.confidence,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'is_public': self.is_public,
             'likes': self.likes,
             'comments': [comment.to_dict() for comment in self.comments],
             'shares': self.shares,
             'user_id': self.user_id
         }
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
     
     def to_json(self) -> str:
         """Convert to JSON string"""
@@ -143,8 +170,8 @@ class BatchSummaryRequest:
         if not self.texts:
             errors.append("Texts array is required")
         
-        if len(self.texts) > 10:
-            errors.append("Maximum 10 texts allowed per batch")
+        if len(self.texts) > Config.MAX_BATCH_SIZE:
+            errors.append(f"Maximum {Config.MAX_BATCH_SIZE} texts allowed per batch")
         
         for i, text in enumerate(self.texts):
             if not text.strip():
@@ -192,6 +219,7 @@ class LanguageDetectionResult:
     script: str
     confidence: float
     alternatives: List[Dict[str, Any]] = field(default_factory=list)
+    tier: Optional[str] = None  # script, script_only, langdetect, langdetect_sampled or default
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -199,7 +227,8 @@ class LanguageDetectionResult:
             'language_name': self.language_name,
             'script': self.script,
             'confidence': self.confidence,
-            'alternatives': self.alternatives
+            'alternatives': self.alternatives,
+            'tier': self.tier
         }
 
 @dataclass
@@ -243,5 +272,170 @@ def create_summary_options(data: Dict[str, Any]) -> SummaryOptions:
         preserve_formatting=data.get('preserve_formatting', False),
         include_keywords=data.get('include_keywords', True),
         max_keywords=data.get('max_keywords', 10),
-        confidence_threshold=data.get('confidence_threshold', 0.3)
-    )
\ No newline at end of file
+        confidence_threshold=data.get('confidence_threshold', 0.3),
+        mode=data.get('mode', 'score'),
+        mmr_lambda=data.get('mmr_lambda', 0.7),
+        deadline_ms=data.get('deadline_ms')
+    )
+
+# Fields of a summary response, and shorthands accepted in a `fields` projection
+SUMMARY_RESPONSE_FIELDS = (
+    'id', 'summary', 'original_text', 'language', 'original_stats', 'summary_stats', 'compression_ratio',
+    'keywords', 'confidence', 'created_at', 'is_public', 'likes', 'comments', 'shares', 'user_id'
+)
+SUMMARY_FIELD_GROUPS = {
+    'stats': ('original_stats', 'summary_stats', 'compression_ratio'),
+    'social': ('is_public', 'likes', 'comments', 'shares')
+}
+
+def parse_summary_fields(value: Any) -> Optional[FrozenSet[str]]:
+    """Fields selected by a projection such as 'summary,keywords,stats' (or a list); None keeps every field"""
+    if value is None or value == '':
+        return None
+    names = value.split(',') if isinstance(value, str) else value
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError('fields must be a comma-separated string or a list of field names')
+    
+    selected = set()
+    for name in (name.strip() for name in names):
+        if name in SUMMARY_FIELD_GROUPS:
+            selected.update(SUMMARY_FIELD_GROUPS[name])
+        elif name in SUMMARY_RESPONSE_FIELDS:
+            selected.add(name)
+        elif name:
+            raise ValueError(f'Unknown field: {name}')
+    return frozenset(selected)
+
+STAT_FIELDS = ('characters', 'words', 'sentences', 'paragraphs', 'reading_time')
+
+class SummaryBatch:
+    """Columnar container for many summary results (bulk runs, batch responses).
+    
+    Stats, scores and social counters live in typed arrays, languages and
+    keywords as ids into tables of interned strings, so a row costs about
+    150 bytes besides its text fields instead of a dozen objects. Rows become
+    SummaryResult objects or response dicts only when read.
+    """
+    __slots__ = ('ids', 'summaries', 'original_texts', 'created_at', 'user_ids', 'comments',
+                 'languages', 'language_ids', 'terms', 'keyword_ids', 'keyword_offsets',
+                 'original_stats', 'summary_stats', 'compression_ratios', 'confidences',
+                 'is_public', 'likes', 'shares', '_language_index', '_term_index')
+    
+    def __init__(self, results: Iterable[SummaryResult] = ()):
+        self.ids: List[str] = []
+        self.summaries: List[str] = []
+        self.original_texts: List[str] = []
+        self.created_at: List[str] = []
+        self.user_ids: List[Optional[str]] = []
+        self.comments: Dict[int, List[Comment]] = {}  # only rows that have comments
+        self.languages: List[str] = []
+        self.language_ids = array('H')
+        self.terms: List[str] = []
+        self.keyword_ids = array('l')
+        self.keyword_offsets = array('q', [0])
+        self.original_stats = array('q')  # len(STAT_FIELDS) values per row
+        self.summary_stats = array('q')
+        self.compression_ratios = array('d')
+        self.confidences = array('d')
+        self.is_public = bytearray()
+        self.likes = array('q')
+        self.shares = array('q')
+        self._language_index: Dict[str, int] = {}
+        self._term_index: Dict[str, int] = {}
+        self.extend(results)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def append(self, result: SummaryResult) -> int:
+        """Add a result and return its row number"""
+        row = len(self.ids)
+        self.ids.append(result.id)
+        self.summaries.append(result.summary)
+        self.original_texts.append(result.original_text)
+        self.created_at.append(result.created_at)
+        self.user_ids.append(result.user_id)
+        if result.comments:
+            self.comments[row] = list(result.comments)
+        self.language_ids.append(self._intern(result.language, self.languages, self._language_index))
+        self.keyword_ids.extend(self._intern(term, self.terms, self._term_index) for term in result.keywords)
+        self.keyword_offsets.append(len(self.keyword_ids))
+        self.original_stats.extend(getattr(result.original_stats, name) for name in STAT_FIELDS)
+        self.summary_stats.extend(getattr(result.summary_stats, name) for name in STAT_FIELDS)
+        self.compression_ratios.append(result.compression_ratio)
+        self.confidences.append(result.confidence)
+        self.is_public.append(bool(result.is_public))
+        self.likes.append(result.likes)
+        self.shares.append(result.shares)
+        return row
+    
+    def extend(self, results: Iterable[SummaryResult]) -> None:
+        for result in results:
+            self.append(result)
+    
+    @staticmethod
+    def _intern(value: str, table: List[str], index: Dict[str, int]) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = index[value] = len(table)
+            table.append(value)
+        return value_id
+    
+    def _stats(self, values: array, row: int) -> TextStats:
+        width = len(STAT_FIELDS)
+        return TextStats(*values[row * width:(row + 1) * width])
+    
+    def _keywords(self, row: int) -> List[str]:
+        terms = self.terms
+        return [terms[term_id] for term_id in self.keyword_ids[self.keyword_offsets[row]:self.keyword_offsets[row + 1]]]
+    
+    def __getitem__(self, row: int) -> SummaryResult:
+        if row < 0:
+            row += len(self.ids)
+        return SummaryResult(
+            id=self.ids[row],
+            summary=self.summaries[row],
+            original_text=self.original_texts[row],
+            language=self.languages[self.language_ids[row]],
+            original_stats=self._stats(self.original_stats, row),
+            summary_stats=self._stats(self.summary_stats, row),
+            compression_ratio=self.compression_ratios[row],
+            keywords=self._keywords(row),
+            confidence=self.confidences[row],
+            created_at=self.created_at[row],
+            is_public=bool(self.is_public[row]),
+            likes=self.likes[row],
+            comments=list(self.comments.get(row, ())),
+            shares=self.shares[row],
+            user_id=self.user_ids[row]
+        )
+    
+    def __iter__(self) -> Iterator[SummaryResult]:
+        return (self[row] for row in range(len(self.ids)))
+    
+    def to_dict(self, row: int, fields: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """Response dict of one row, built straight from the columns"""
+        width = len(STAT_FIELDS)
+        data = {
+            'id': self.ids[row],
+            'summary': self.summaries[row],
+            'original_text': self.original_texts[row],
+            'language': self.languages[self.language_ids[row]],
+            'original_stats': dict(zip(STAT_FIELDS, self.original_stats[row * width:(row + 1) * width])),
+            'summary_stats': dict(zip(STAT_FIELDS, self.summary_stats[row * width:(row + 1) * width])),
+            'compression_ratio': self.compression_ratios[row],
+            'keywords': self._keywords(row),
+            'confidence': self.confidences[row],
+            'created_at': self.created_at[row],
+            'is_public': bool(self.is_public[row]),
+            'likes': self.likes[row],
+            'comments': [comment.to_dict() for comment in self.comments.get(row, ())],
+            'shares': self.shares[row],
+            'user_id': self.user_ids[row]
+        }
+        if fields is None:
+            return data
+        return {key: value for key, value in data.items() if key in fields}
+    
+    def to_dicts(self, fields: Optional[FrozenSet[str]] = None) -> List[Dict[str, Any]]:
+        return [self.to_dict(row, fields) for row in range(len(self.ids))]
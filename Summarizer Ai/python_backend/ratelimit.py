@@ -0,0 +1,129 @@
+"""
+Token-bucket rate limiting per client and endpoint, and admission control for the whole server
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets, one per key (client and endpoint).
+
+    A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+    second; a request is admitted when its cost can be paid in full. Each key
+    costs two floats, and keys idle long enough to have refilled completely
+    carry no state worth keeping, so they are dropped, as are the least
+    recently seen keys beyond max_keys.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.idle_seconds = capacity / rate if rate > 0 else float('inf')
+        self._buckets: OrderedDict = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + self.idle_seconds
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """Take cost tokens from key's bucket: 0.0 when admitted, else the seconds until it could be.
+
+        A cost above the capacity is charged as a full bucket, so a single large
+        request is slow to repeat but never impossible.
+        """
+        cost = min(cost, self.capacity)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                wait = 0.0
+            else:
+                wait = (cost - bucket[0]) / self.rate if self.rate > 0 else float('inf')
+
+            if now >= self._next_sweep:
+                self._evict_idle(now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def _evict_idle(self, now: float) -> None:
+        # Least recently seen first: stop at the first key that is still refilling
+        cutoff = now - self.idle_seconds
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if updated_at > cutoff:
+                break
+            del self._buckets[key]
+        self._next_sweep = now + self.idle_seconds
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class AdmissionController:
+    """Bounds the total cost of the requests in progress; rejects instead of queueing.
+
+    A request costing more than the whole budget is still admitted when
+    nothing else is running, so it cannot be starved.
+    """
+
+    def __init__(self, max_cost: float):
+        self.max_cost = max_cost
+        self.in_flight = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, cost: float) -> bool:
+        with self._lock:
+            if self.in_flight and self.in_flight + cost > self.max_cost:
+                return False
+            self.in_flight += cost
+            return True
+
+    def release(self, cost: float) -> None:
+        with self._lock:
+            self.in_flight = max(0.0, self.in_flight - cost)
+
+class RequestGate:
+    """Admission control, then the rate limit of the client and endpoint, for each incoming request"""
+
+    def __init__(self, limiter: Optional[TokenBucketLimiter], admission: Optional[AdmissionController],
+                 overload_retry_after: float = 1.0):
+        self.limiter = limiter
+        self.admission = admission
+        self.overload_retry_after = overload_retry_after
+
+    def admit(self, key: Hashable, cost: float) -> Optional[Tuple[str, float]]:
+        """None when the request may run (release(cost) afterwards), else (reason, seconds to wait)"""
+        # Admission first, so a request turned away by an overloaded server keeps its tokens
+        if self.admission is not None and not self.admission.try_acquire(cost):
+            return 'overload', self.overload_retry_after
+        if self.limiter is not None:
+            wait = self.limiter.acquire(key, cost)
+            if wait > 0:
+                self.release(cost)
+                return 'rate_limit', wait
+        return None
+
+    def release(self, cost: float) -> None:
+        if self.admission is not None:
+            self.admission.release(cost)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'clients': len(self.limiter) if self.limiter is not None else 0,
+            'in_flight_cost': self.admission.in_flight if self.admission is not None else 0
+        }
+
+__all__ = [
+    'AdmissionController',
+    'RequestGate',
+    'TokenBucketLimiter'
+]
@@ -0,0 +1,258 @@
+"""
+Sparse TF-IDF scoring engine for keywords and sentence scores
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+def _sparse():
+    """scipy.sparse, imported on first use since it takes longer to import than the rest of the app"""
+    from scipy import sparse
+    return sparse
+
+@dataclass
+class DocumentScores:
+    """Array scores of one analyzed document"""
+    base_scores: np.ndarray    # per sentence: mean whole-text frequency of its tokens (times corpus IDF)
+    token_counts: np.ndarray   # per sentence: number of tokens
+    term_weights: np.ndarray   # per vocabulary term: summed TF-IDF over sentences (times corpus IDF)
+    tfidf: 'sparse.csr_matrix'   # sentence-by-term TF-IDF, rows L2-normalized
+
+    def top_terms(self, vocabulary: Sequence[str], num_terms: int) -> List[str]:
+        """Highest weighted terms, ties broken by first occurrence"""
+        return [term for term, _ in self.top_weighted_terms(vocabulary, num_terms)]
+
+    def top_weighted_terms(self, vocabulary: Sequence[str], num_terms: int) -> List[Tuple[str, float]]:
+        """(term, weight) pairs of the highest weighted terms"""
+        if num_terms <= 0 or not len(self.term_weights):
+            return []
+        order = np.argsort(-self.term_weights, kind='stable')[:num_terms]
+        return [(vocabulary[token_id], float(self.term_weights[token_id])) for token_id in order.tolist()]
+
+def mmr_select(tfidf: 'sparse.csr_matrix', relevance: np.ndarray, count: int,
+               trade_off: float = 0.7) -> List[int]:
+    """Maximal marginal relevance: pick count rows greedily, in pick order.
+
+    Each pick maximizes trade_off * relevance - (1 - trade_off) * (highest cosine
+    similarity to a row picked so far), with relevance scaled to [0, 1]. Rows
+    are L2-normalized, so a dot product is a cosine. Only the similarities to
+    the newest pick are computed (one sparse matrix-vector product) and folded
+    into the running scores: O(k * n) sparse dot products, never an n x n matrix.
+    With trade_off=1 the picks equal the top rows by relevance.
+    """
+    num_rows = tfidf.shape[0]
+    count = min(count, num_rows)
+    if count <= 0:
+        return []
+
+    peak = float(relevance.max())
+    gain = trade_off * (relevance / peak if peak > 0 else np.zeros(num_rows))
+    penalty = 1.0 - trade_off
+    row_starts = tfidf.indptr.tolist()
+    picked_row = np.zeros(tfidf.shape[1])
+    # Marginal gain of each row; min() over picks equals subtracting the max similarity
+    marginal = gain.copy()
+    selected: List[int] = []
+
+    for _ in range(count):
+        pick = int(np.argmax(marginal))  # the first of equal scores, as the stable sort does
+        selected.append(pick)
+        marginal[pick] = -np.inf
+        if len(selected) == count or not penalty:
+            continue
+
+        terms = tfidf.indices[row_starts[pick]:row_starts[pick + 1]]
+        picked_row[terms] = tfidf.data[row_starts[pick]:row_starts[pick + 1]]
+        similarity = tfidf @ picked_row
+        picked_row[terms] = 0.0
+        np.minimum(marginal, gain - penalty * similarity, out=marginal)
+
+    return selected
+
+def textrank(tfidf: 'sparse.csr_matrix', damping: float = 0.85, tolerance: float = 1e-6,
+             max_iterations: int = 100, max_postings: int = 100) -> Tuple[np.ndarray, int]:
+    """TextRank centrality of each row, scaled to a mean of 1, and the iterations run.
+
+    Edges join sentences sharing a term, weighted by the cosine of their TF-IDF
+    rows. The product of the matrix with its transpose walks each term's
+    postings (an inverted index) rather than comparing all pairs. Terms found
+    in a single sentence add no edge, and terms found in more than max_postings
+    sentences are left out, so a term adds at most max_postings**2 entries and
+    the graph stays linear in the number of sentences. PageRank then runs by
+    power iteration until the L1 change drops below tolerance, or for
+    max_iterations at most.
+    """
+    num_rows = tfidf.shape[0]
+    if num_rows == 0:
+        return np.zeros(0), 0
+
+    postings = np.bincount(tfidf.indices, minlength=tfidf.shape[1])
+    kept = (postings > 1) & (postings <= max_postings)
+    rows = tfidf.copy()  # eliminate_zeros() rewrites the index arrays in place
+    rows.data[~kept[rows.indices]] = 0.0
+    rows.eliminate_zeros()
+    sparse = _sparse()
+    graph = (rows @ rows.T).tocsr()
+    graph.setdiag(0.0)
+    graph.eliminate_zeros()
+
+    # Column-stochastic transition matrix; sentences without edges spread their rank evenly
+    out_weights = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weights == 0
+    with np.errstate(divide='ignore'):
+        inverse = np.where(dangling, 0.0, 1.0 / out_weights)
+    transition = (sparse.diags(inverse) @ graph).T.tocsr()
+
+    rank = np.full(num_rows, 1.0 / num_rows)
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        spread = (1.0 - damping + damping * rank[dangling].sum()) / num_rows
+        updated = damping * (transition @ rank) + spread
+        change = np.abs(updated - rank).sum()
+        rank = updated
+        if change < tolerance:
+            break
+    return rank * num_rows, iterations
+
+class SparseScoringEngine:
+    """Builds sentence-by-term count matrices from token ids and scores them with array math.
+
+    Sentences play the role of documents for IDF. Several documents can be scored
+    in one call: their rows are stacked and their vocabularies occupy disjoint
+    column ranges, so a single sparse matrix serves the whole batch. Given the
+    corpus IDF of a document's terms, token frequencies and keyword weights are
+    also weighted by it, scaled to a mean of 1 over the document's tokens.
+    """
+
+    def count_matrix(self, documents: Sequence) -> 'sparse.csr_matrix':
+        """Stacked sentence-by-term counts; each document's terms are offset past the previous ones"""
+        indices, indptr, num_columns = self._stacked_tokens(documents)
+        data = np.ones(len(indices), dtype=np.float64)
+        matrix = _sparse().csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, num_columns))
+        matrix.sum_duplicates()
+        return matrix
+
+    def _stacked_tokens(self, documents: Sequence) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Raw CSR indices/indptr of all sentences (tokens repeated as they occur)"""
+        sentence_tokens = [tokens for document in documents for tokens in document.sentence_tokens]
+        indptr = np.zeros(len(sentence_tokens) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, sentence_tokens), dtype=np.int64, count=len(sentence_tokens)),
+                  out=indptr[1:])
+        indices = np.fromiter(chain.from_iterable(sentence_tokens), dtype=np.int64, count=int(indptr[-1]))
+
+        column_offset = 0
+        row_offset = 0
+        for document in documents:
+            num_rows = len(document.sentence_tokens)
+            if column_offset:
+                indices[indptr[row_offset]:indptr[row_offset + num_rows]] += column_offset
+            row_offset += num_rows
+            column_offset += len(document.vocabulary)
+        return indices, indptr, column_offset
+
+    @staticmethod
+    def _row_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+        """Sum of values within each CSR row, empty rows included"""
+        cumulative = np.zeros(len(values) + 1, dtype=np.float64)
+        np.cumsum(values, out=cumulative[1:])
+        return cumulative[indptr[1:]] - cumulative[indptr[:-1]]
+
+    def score_documents(self, documents: Sequence,
+                        term_idf: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[DocumentScores]:
+        """Score every document of a batch with one sparse matrix; term_idf holds the corpus IDF
+        of each document's vocabulary, or None for a document without one"""
+        if not documents:
+            return []
+
+        indices, indptr, num_columns = self._stacked_tokens(documents)
+        row_bounds = np.cumsum([0] + [len(document.sentence_tokens) for document in documents])
+        column_bounds = np.cumsum([0] + [len(document.vocabulary) for document in documents])
+        if term_idf is not None and any(weights is not None for weights in term_idf):
+            term_idf = np.concatenate([weights if weights is not None else np.ones(len(document.vocabulary))
+                                       for document, weights in zip(documents, term_idf)])
+        else:
+            term_idf = None
+        base_scores, token_counts, term_weights, tfidf = self._score(indices, indptr, num_columns,
+                                                                     row_bounds, column_bounds, term_idf)
+
+        if len(documents) == 1:
+            return [DocumentScores(base_scores, token_counts, term_weights, tfidf)]
+
+        results = []
+        for index in range(len(documents)):
+            rows = slice(row_bounds[index], row_bounds[index + 1])
+            columns = slice(column_bounds[index], column_bounds[index + 1])
+            results.append(DocumentScores(
+                base_scores=base_scores[rows],
+                token_counts=token_counts[rows],
+                term_weights=term_weights[columns],
+                tfidf=tfidf[rows][:, columns]
+            ))
+        return results
+
+    def score_token_arrays(self, indices: np.ndarray, indptr: np.ndarray, num_columns: int,
+                           term_idf: Optional[np.ndarray] = None) -> DocumentScores:
+        """Score one document given as raw CSR arrays of its sentences' token ids (kept as they occur)"""
+        num_rows = len(indptr) - 1
+        # The sparse matrix takes ownership of the index arrays and sorts them in place
+        indices = np.array(indices, dtype=np.int64)
+        indptr = np.array(indptr, dtype=np.int64)
+        return DocumentScores(*self._score(indices, indptr, num_columns,
+                                           np.array([0, num_rows]), np.array([0, num_columns]), term_idf))
+
+    def _score(self, indices: np.ndarray, indptr: np.ndarray, num_columns: int,
+               row_bounds: np.ndarray, column_bounds: np.ndarray, term_idf: Optional[np.ndarray] = None) -> Tuple:
+        num_rows = len(indptr) - 1
+
+        # Base score: the mean whole-text frequency of a sentence's tokens
+        term_freq = np.bincount(indices, minlength=num_columns).astype(np.float64)
+        corpus_weights = None
+        if term_idf is not None:
+            # Scaled to a mean of 1 per document, so that scores keep their range
+            column_documents = np.repeat(np.arange(len(column_bounds) - 1), np.diff(column_bounds))
+            totals = np.bincount(column_documents, term_freq * term_idf, len(column_bounds) - 1)
+            occurrences = np.bincount(column_documents, term_freq, len(column_bounds) - 1)
+            means = np.divide(totals, occurrences, out=np.ones_like(totals), where=totals > 0)
+            corpus_weights = term_idf / means[column_documents]
+            term_freq *= corpus_weights
+        token_counts = np.diff(indptr)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            base_scores = np.where(token_counts > 0, self._row_sums(term_freq[indices], indptr) / token_counts, 0.0)
+
+        # Collapse repeated tokens into per-sentence counts
+        sparse = _sparse()
+        counts = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(num_rows, num_columns))
+        counts.sum_duplicates()
+
+        # Smoothed IDF with each sentence as a document, as in scikit-learn
+        sentence_freq = np.bincount(counts.indices, minlength=num_columns)
+        sentences_per_column = np.repeat(np.diff(row_bounds), np.diff(column_bounds))
+        idf = np.log((1.0 + sentences_per_column) / (1.0 + sentence_freq)) + 1.0
+
+        # TF-IDF rows, L2-normalized
+        weights = counts.data * idf[counts.indices]
+        row_norms = np.sqrt(self._row_sums(weights * weights, counts.indptr))
+        row_norms[row_norms == 0] = 1.0
+        weights /= np.repeat(row_norms, np.diff(counts.indptr))
+        tfidf = sparse.csr_matrix((weights, counts.indices, counts.indptr), shape=counts.shape)
+        term_weights = np.bincount(counts.indices, weights=weights, minlength=num_columns)
+        if corpus_weights is not None:
+            term_weights *= corpus_weights
+        return base_scores, token_counts, term_weights, tfidf
+
+    def score_document(self, document, term_idf: Optional[np.ndarray] = None) -> DocumentScores:
+        return self.score_documents([document], None if term_idf is None else [term_idf])[0]
+
+__all__ = [
+    'DocumentScores',
+    'SparseScoringEngine',
+    'mmr_select',
+    'textrank'
+]
@@ -0,0 +1,99 @@
+"""
+Script histogram for language detection, independent of the number of scripts
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Unicode blocks of the scripts used by the supported languages
+SCRIPT_RANGES: Dict[str, Tuple[int, int]] = {
+    'devanagari': (0x0900, 0x097F),
+    'bengali': (0x0980, 0x09FF),
+    'telugu': (0x0C00, 0x0C7F),
+    'tamil': (0x0B80, 0x0BFF),
+    'gujarati': (0x0A80, 0x0AFF),
+    'kannada': (0x0C80, 0x0CFF),
+    'malayalam': (0x0D00, 0x0D7F),
+    'odia': (0x0B00, 0x0B7F),
+    'gurmukhi': (0x0A00, 0x0A7F),
+    'arabic': (0x0600, 0x06FF)
+}
+
+class ScriptDetector:
+    """Counts characters per script with a code point lookup table"""
+
+    def __init__(self, script_ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+                 chunk_size: int = 4096, min_sample: int = 512, dominance: float = 0.9):
+        self.script_ranges = dict(script_ranges or SCRIPT_RANGES)
+        self.scripts: List[str] = list(self.script_ranges)
+
+        # Sampling mode: stop once `min_sample` script characters were seen and
+        # one script accounts for at least `dominance` of them
+        self.chunk_size = chunk_size
+        self.min_sample = min_sample
+        self.dominance = dominance
+
+        # Slot 0 collects every code point outside the registered scripts
+        self.table_size = max(end for _, end in self.script_ranges.values()) + 1
+        table = [0] * self.table_size
+        for slot, script in enumerate(self.scripts, start=1):
+            start, end = self.script_ranges[script]
+            for code_point in range(start, end + 1):
+                if not table[code_point]:
+                    table[code_point] = slot
+        self._table = table
+        self._np_table = np.array(table, dtype=np.intp) if np is not None else None
+
+    def _count(self, text: str) -> List[int]:
+        """Per-slot counts for text, slot 0 being characters of no known script"""
+        # NumPy: one bincount over the UTF-32 code points. Otherwise count distinct
+        # characters in C first and look up only those.
+        num_slots = len(self.scripts) + 1
+        if self._np_table is not None:
+            code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+            code_points = code_points[code_points < self.table_size]
+            return np.bincount(self._np_table[code_points], minlength=num_slots).tolist()
+
+        counts = [0] * num_slots
+        table = self._table
+        table_size = self.table_size
+        for char, occurrences in Counter(text).items():
+            code_point = ord(char)
+            if code_point < table_size:
+                counts[table[code_point]] += occurrences
+        return counts
+
+    def histogram(self, text: str, sample: bool = False) -> Dict[str, int]:
+        """Count characters per script, optionally stopping once one script dominates"""
+        if not sample or len(text) <= self.chunk_size:
+            counts = self._count(text)
+        else:
+            counts = [0] * (len(self.scripts) + 1)
+            for start in range(0, len(text), self.chunk_size):
+                chunk_counts = self._count(text[start:start + self.chunk_size])
+                counts = [total + count for total, count in zip(counts, chunk_counts)]
+                script_total = sum(counts) - counts[0]
+                if script_total >= self.min_sample and max(counts[1:]) >= self.dominance * script_total:
+                    break
+
+        return dict(zip(self.scripts, counts[1:]))
+
+    def dominant_script(self, text: str, sample: bool = False) -> Optional[str]:
+        """Script with the most characters, or None if no known script occurs"""
+        counts = self.histogram(text, sample=sample)
+        script = max(counts, key=counts.get)
+        return script if counts[script] > 0 else None
+
+# Shared detector, built once per process at import time
+script_detector = ScriptDetector()
+
+__all__ = [
+    'ScriptDetector',
+    'script_detector',
+    'SCRIPT_RANGES'
+]
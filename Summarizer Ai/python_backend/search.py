@@ -0,0 +1,680 @@
+"""
+Full-text search over stored summaries: an in-process inverted index with
+compressed postings and BM25 ranking, kept up to date from the summary store
+and saved to one memory-mapped file
+"""
+
+import json
+import math
+import sqlite3
+import struct
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from atomic_file import file_lock, replace_file
+from config import Config
+
+_MAGIC = b'SUMSRCH1'
+_ALIGNMENT = 64
+# Delta widths in bytes, and the value marking a delta too large for its width
+_WIDTHS = (1, 2, 4)
+_ESCAPES = {1: 0xFF, 2: 0xFFFF}
+# Languages get a one-byte code; any language outside these (clients may name any) shares one
+_LANGUAGES = frozenset(Config.SUPPORTED_LANGUAGES)
+OTHER_LANGUAGE = 'other'
+
+_SEGMENT_ARRAYS = ('terms', 'starts', 'counts', 'widths', 'offsets', 'exception_starts', 'deltas', 'tfs', 'exceptions')
+
+def _exclusive_cumsum(values: np.ndarray) -> np.ndarray:
+    result = np.zeros(len(values), np.int64)
+    np.cumsum(values[:-1], out=result[1:])
+    return result
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+class PostingSegment:
+    """Immutable postings of a run of documents, grouped by term.
+
+    Doc ids are stored as gaps from the term's previous doc id, each term in
+    the narrowest of 1, 2 or 4 bytes per gap once the few gaps too large for
+    it (marked by an escape value) are moved to a shared uint32 exception
+    list. Term frequencies take one byte, capped at 255; BM25 saturates long
+    before. Only the terms present have an entry, found by binary search.
+    """
+
+    def __init__(self, terms: np.ndarray, starts: np.ndarray, counts: np.ndarray, widths: np.ndarray,
+                 offsets: np.ndarray, exception_starts: np.ndarray, deltas: np.ndarray, tfs: np.ndarray,
+                 exceptions: np.ndarray):
+        self.terms = terms
+        self.starts = starts
+        self.counts = counts
+        self.widths = widths
+        self.offsets = offsets
+        self.exception_starts = exception_starts
+        self.deltas = deltas
+        self.tfs = tfs
+        self.exceptions = exceptions
+
+    def __len__(self) -> int:
+        return len(self.tfs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in _SEGMENT_ARRAYS)
+
+    @classmethod
+    def encode(cls, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray) -> 'PostingSegment':
+        """Segment of postings sorted by term id, then doc id"""
+        term_ids = term_ids.astype(np.int64, copy=False)
+        docs = doc_ids.astype(np.int64)
+        size = len(docs)
+        boundaries = np.flatnonzero(np.diff(term_ids)) + 1
+        starts = np.concatenate(([0], boundaries)).astype(np.int64) if size else np.zeros(0, np.int64)
+        counts = np.diff(np.append(starts, size))
+        local = np.repeat(np.arange(len(starts)), counts)
+
+        gaps = np.empty(size, np.int64)
+        if size:
+            gaps[0] = docs[0]
+            np.subtract(docs[1:], docs[:-1], out=gaps[1:])
+            gaps[starts] = docs[starts]
+
+        # Bytes of each term at each width, counting its escaped gaps as 4 more
+        over = {width: np.bincount(local[gaps >= escape], minlength=len(starts))
+                for width, escape in _ESCAPES.items()}
+        cost = np.stack([counts + 4 * over[1], 2 * counts + 4 * over[2], 4 * counts])
+        widths = np.array(_WIDTHS, np.uint8)[cost.argmin(axis=0)] if size else np.zeros(0, np.uint8)
+        posting_widths = widths[local]
+        escaped = np.zeros(size, bool)
+        for width, escape in _ESCAPES.items():
+            escaped |= (posting_widths == width) & (gaps >= escape)
+
+        offsets = _exclusive_cumsum(counts * widths)
+        blob = np.zeros(int((counts * widths).sum()), np.uint8)
+        ranks = np.arange(size) - starts[local]
+        for width in _WIDTHS:
+            selected = posting_widths == width
+            if not selected.any():
+                continue
+            values = gaps[selected]
+            if width in _ESCAPES:
+                values = np.where(escaped[selected], _ESCAPES[width], values)
+            raw = values.astype(f'<u{width}').view(np.uint8).reshape(-1, width)
+            positions = offsets[local[selected]] + ranks[selected] * width
+            blob[positions[:, None] + np.arange(width)] = raw
+
+        # Positions fit 4 bytes in all but huge segments
+        position_type = np.uint32 if max(size, len(blob)) < 1 << 32 else np.int64
+        return cls(term_ids[starts].astype(np.uint32), starts.astype(position_type), counts.astype(np.uint32),
+                   widths, offsets.astype(position_type),
+                   _exclusive_cumsum(np.bincount(local[escaped], minlength=len(starts))).astype(position_type),
+                   blob, np.minimum(tfs, 255).astype(np.uint8), gaps[escaped].astype(np.uint32))
+
+    def postings(self, term_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(doc ids, term frequencies) of a term, or None when it has no postings here"""
+        # A Python int would make searchsorted convert the whole array
+        index = int(np.searchsorted(self.terms, np.uint32(term_id)))
+        if index == len(self.terms) or self.terms[index] != term_id:
+            return None
+        count, width, offset = int(self.counts[index]), int(self.widths[index]), int(self.offsets[index])
+        stored = self.deltas[offset:offset + count * width].view(f'<u{width}')
+        gaps = stored.astype(np.int32)
+        if width in _ESCAPES:
+            escaped = np.flatnonzero(stored == _ESCAPES[width])
+            if len(escaped):
+                start = int(self.exception_starts[index])
+                gaps[escaped] = self.exceptions[start:start + len(escaped)]
+        start = int(self.starts[index])
+        return np.cumsum(gaps, out=gaps), self.tfs[start:start + count]
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All (term ids, doc ids, term frequencies), sorted by term, then doc id"""
+        size = len(self.tfs)
+        counts = self.counts.astype(np.int64)
+        local = np.repeat(np.arange(len(counts)), counts)
+        posting_widths = self.widths[local]
+        ranks = np.arange(size) - self.starts[local].astype(np.int64)
+        gaps = np.empty(size, np.int64)
+        for width in _WIDTHS:
+            selected = posting_widths == width
+            if not selected.any():
+                continue
+            positions = self.offsets[local[selected]].astype(np.int64) + ranks[selected] * width
+            gaps[selected] = self.deltas[positions[:, None] + np.arange(width)].view(f'<u{width}').ravel()
+        escaped = np.zeros(size, bool)
+        for width, escape in _ESCAPES.items():
+            escaped |= (posting_widths == width) & (gaps == escape)
+        gaps[escaped] = self.exceptions
+        # Running sums restart at each term's first posting
+        totals = np.cumsum(gaps)
+        firsts = self.starts[local]
+        docs = totals - totals[firsts] + gaps[firsts]
+        return self.terms[local].astype(np.int64), docs, self.tfs
+
+    @classmethod
+    def merge(cls, segments: Sequence['PostingSegment']) -> 'PostingSegment':
+        """One segment of consecutive segments (older first)"""
+        parts = [segment.decode() for segment in segments]
+        term_ids = np.concatenate([part[0] for part in parts])
+        # A stable sort keeps each term's doc ids ascending, as each segment's follow the previous one's
+        order = np.argsort(term_ids, kind='stable')
+        return cls.encode(term_ids[order], np.concatenate([part[1] for part in parts])[order],
+                          np.concatenate([part[2] for part in parts])[order])
+
+def _intersect(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions in left and in right of the values both ascending arrays hold"""
+    if len(left) > len(right):
+        found, positions = _intersect(right, left)
+        return positions, found
+    positions = np.searchsorted(right, left)
+    positions[positions == len(right)] = 0
+    found = np.flatnonzero(right[positions] == left) if len(right) else np.zeros(0, np.int64)
+    return found, positions[found]
+
+class _Candidates:
+    """Public documents (in one language) matching the terms of a search so far, with their scores.
+
+    Kept in ascending arrays while few; past a 64th of the index, in the
+    index's per-document buffers, where adding a term is a scatter instead of
+    a merge, and looking documents up is a gather instead of a binary search.
+    """
+
+    def __init__(self, index: 'SearchIndex', language_id: Optional[int]):
+        self.index = index
+        self.language_id = language_id
+        self.docs: Optional[np.ndarray] = np.zeros(0, np.int32)
+        self.scores = np.zeros(0, np.float32)
+        self.totals: Optional[np.ndarray] = None
+        self.matched: Optional[np.ndarray] = None
+
+    def add(self, docs: np.ndarray, scores: np.ndarray) -> None:
+        """Add the documents of a term"""
+        num_docs = len(self.index)
+        if self.totals is None and len(self.docs) + len(docs) >= num_docs // 64:
+            self.totals, self.matched = self.index._buffers(num_docs)
+            self.totals[self.docs] = self.scores
+            self.matched[self.docs] = True
+        if self.totals is not None:
+            self.totals[docs] += scores
+            self.matched[docs] = True
+            self.docs = None  # filtered again by result()
+            return
+
+        visible = self.index.doc_public.values[docs] == 1
+        if self.language_id is not None:
+            visible &= self.index.doc_languages.values[docs] == self.language_id
+        docs, scores = docs[visible], scores[visible]
+        if not len(self.docs):
+            self.docs, self.scores = docs, scores
+        else:
+            self.docs, positions = np.unique(np.concatenate([self.docs, docs]), return_inverse=True)
+            self.scores = np.bincount(positions, np.concatenate([self.scores, scores]),
+                                      minlength=len(self.docs)).astype(np.float32)
+
+    def add_to_existing(self, idf: float, docs: np.ndarray, tfs: np.ndarray) -> None:
+        """Add the scores of a term to the documents already matched"""
+        if self.totals is not None:
+            found = np.flatnonzero(self.matched[docs])
+            found_docs = docs[found]
+            self.totals[found_docs] += self.index._term_scores(idf, found_docs, tfs[found])
+        else:
+            mine, theirs = _intersect(self.docs, docs)
+            self.scores[mine] += self.index._term_scores(idf, docs[theirs], tfs[theirs])
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ascending matched documents and their scores"""
+        if self.totals is not None:
+            if self.docs is None:
+                visible = self.matched & self.index.doc_public.values.view(bool)
+                if self.language_id is not None:
+                    visible &= self.index.doc_languages.values == self.language_id
+                self.docs = np.flatnonzero(visible).astype(np.int32)
+            self.scores = self.totals[self.docs]
+        return self.docs, self.scores
+
+    def release(self) -> None:
+        """Zero the index's buffers for the next search"""
+        if self.totals is not None:
+            self.totals.fill(0)
+            self.matched.fill(False)
+
+class _Column:
+    """Append-only numpy column, grown by doubling"""
+
+    def __init__(self, dtype: str, values: Optional[np.ndarray] = None):
+        self.data = np.zeros(1024, dtype) if values is None else np.array(values, dtype)
+        self.size = 0 if values is None else len(values)
+
+    def append(self, value: int) -> None:
+        if self.size == len(self.data):
+            self.data = np.concatenate([self.data, np.zeros(max(1024, self.size), self.data.dtype)])
+        self.data[self.size] = value
+        self.size += 1
+
+    def extend(self, values: Union[Sequence[int], int], count: Optional[int] = None) -> None:
+        """Append values, or count copies of one value"""
+        end = self.size + (len(values) if count is None else count)
+        if end > len(self.data):
+            self.data = np.concatenate([self.data, np.zeros(max(end, 2 * self.size) - len(self.data), self.data.dtype)])
+        self.data[self.size:end] = values
+        self.size = end
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data[:self.size]
+
+class _Tail:
+    """Postings not compressed yet, in the order documents were added"""
+
+    def __init__(self):
+        self.terms = _Column('<u4')
+        self.docs = _Column('<u4')
+        self.tfs = _Column('<u4')
+
+    def __len__(self) -> int:
+        return self.terms.size
+
+    def add(self, doc: int, term_ids: Sequence[int], tfs: Sequence[int]) -> None:
+        self.terms.extend(term_ids)
+        self.docs.extend(doc, len(term_ids))
+        self.tfs.extend(tfs)
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.flatnonzero(self.terms.values == term_id)
+        return self.docs.values[positions].astype(np.int32), self.tfs.values[positions]
+
+    def encode(self) -> PostingSegment:
+        terms = self.terms.values
+        # Stable, so each term's doc ids stay ascending
+        order = np.argsort(terms, kind='stable')
+        return PostingSegment.encode(terms[order], self.docs.values[order], self.tfs.values[order])
+
+def _language_key(language: str) -> str:
+    return language if language in _LANGUAGES else OTHER_LANGUAGE
+
+class SearchIndex:
+    """BM25 search over summaries, by the tokens of their original text.
+
+    New documents go to an uncompressed tail; maintain() compresses it into a
+    PostingSegment once it holds segment_postings postings, and merges every
+    run of merge_factor segments of similar size, so a term is spread over a
+    few segments per order of magnitude of the index. Compression and merges
+    run outside the lock that searches take. Documents are added by one
+    thread (see follow()); searches may come from any.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, segment_postings: int = 1 << 18,
+                 merge_factor: int = 8):
+        self.k1 = k1
+        self.b = b
+        self.segment_postings = segment_postings
+        self.merge_factor = merge_factor
+
+        self.term_ids: Dict[str, int] = {}
+        self.summary_ids: List[str] = []
+        self.doc_lengths = _Column('<u4')
+        self.doc_languages = _Column('u1')
+        self.doc_users = _Column('<u4')     # 0: no user
+        self.doc_public = _Column('u1')
+        self.languages: List[str] = []
+        self.users: List[Optional[str]] = [None]
+        self._language_ids: Dict[str, int] = {}
+        self._user_ids: Dict[str, int] = {}
+        self.total_length = 0
+        self.last_seq = 0    # summary store position of the last row indexed
+        self.changed = False
+
+        self.segments: List[PostingSegment] = []
+        self._tail = _Tail()
+        self._sealing: Optional[_Tail] = None
+        # Search state, reused under the lock
+        self._norms: Optional[_Column] = None
+        self._norms_average = 0.0
+        self._totals: Optional[np.ndarray] = None
+        self._matched: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._maintenance_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.summary_ids)
+
+    def add(self, summary_id: str, tokens: Iterable[str], language: str, user_id: Optional[str] = None,
+            is_public: bool = False, seq: int = 0) -> None:
+        """Index a summary under the tokens of its text"""
+        counts = Counter(tokens)
+        length = sum(counts.values())
+        with self._lock:
+            # Codes first: the columns must all grow or none
+            language_id = self._intern(_language_key(language), self.languages, self._language_ids)
+            user = 0 if user_id is None else self._intern(user_id, self.users, self._user_ids)
+            doc = len(self.summary_ids)
+            self.summary_ids.append(summary_id)
+            self.doc_lengths.append(length)
+            self.doc_languages.append(language_id)
+            self.doc_users.append(user)
+            self.doc_public.append(bool(is_public))
+            self.total_length += length
+            term_ids = list(map(self.term_ids.get, counts))
+            if None in term_ids:
+                for position, term in enumerate(counts):
+                    if term_ids[position] is None:
+                        term_ids[position] = self.term_ids.setdefault(term, len(self.term_ids))
+            self._tail.add(doc, term_ids, list(counts.values()))
+            self.last_seq = max(self.last_seq, seq)
+            self.changed = True
+
+    @staticmethod
+    def _intern(value: str, values: List[Any], ids: Dict[str, int]) -> int:
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def maintain(self, force: bool = False) -> None:
+        """Compress a full tail (any tail, with force) into a segment, then merge runs of similar segments"""
+        with self._maintenance_lock:
+            with self._lock:
+                if not len(self._tail) or (len(self._tail) < self.segment_postings and not force):
+                    return
+                # Searches read the tail being compressed until its segment replaces it
+                self._sealing, self._tail = self._tail, _Tail()
+            segment = self._sealing.encode()
+            with self._lock:
+                self.segments = self.segments + [segment]
+                self._sealing = None
+
+            while True:
+                run = self._merge_run()
+                if run is None:
+                    return
+                start, end = run
+                merged = PostingSegment.merge(self.segments[start:end])
+                with self._lock:
+                    self.segments = self.segments[:start] + [merged] + self.segments[end:]
+
+    def _level(self, segment: PostingSegment) -> int:
+        return int(math.log(max(1, len(segment) / self.segment_postings), self.merge_factor))
+
+    def _merge_run(self) -> Optional[Tuple[int, int]]:
+        """Bounds of the newest segments when merge_factor of them share a size level"""
+        segments = self.segments
+        if len(segments) < self.merge_factor:
+            return None
+        level = self._level(segments[-1])
+        start = len(segments)
+        while start > 0 and self._level(segments[start - 1]) == level:
+            start -= 1
+        return (start, len(segments)) if len(segments) - start >= self.merge_factor else None
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        docs, tfs = [], []
+        for segment in self.segments:
+            found = segment.postings(term_id)
+            if found is not None:
+                docs.append(found[0])
+                tfs.append(found[1])
+        for tail in (self._sealing, self._tail):
+            if tail is not None and len(tail):
+                found = tail.postings(term_id)
+                docs.append(found[0])
+                tfs.append(found[1])
+        if len(docs) == 1:
+            return docs[0], tfs[0]
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def search(self, tokens: Iterable[str], language: Optional[str] = None, user_id: Optional[str] = None,
+               limit: int = 10, public_only: bool = False) -> List[Tuple[str, float]]:
+        """Best (summary id, score) pairs for the query tokens, best first.
+
+        Matches are the user's summaries with a user_id (only the public ones
+        with public_only), the public ones otherwise, narrowed to one language
+        when given.
+
+        Terms are summed rarest first (MaxScore): once the limit-th best score
+        so far beats the most the remaining, frequent terms could add, a
+        document without any of the rarer terms cannot make the results, and
+        the frequent terms are only looked up for the documents found so far.
+        """
+        with self._lock:
+            num_docs = len(self.summary_ids)
+            term_ids = {self.term_ids[token] for token in tokens if token in self.term_ids}
+            language_id = self._language_ids.get(_language_key(language)) if language is not None else None
+            user = self._user_ids.get(user_id) if user_id is not None else None
+            if not term_ids or (language is not None and language_id is None) or (user_id is not None and user is None):
+                return []
+
+            terms = []
+            for term_id in term_ids:
+                docs, tfs = self._postings(term_id)
+                idf = math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                terms.append((idf, docs, tfs))
+            # Rarest first; BM25 gives a term at most idf * (k1 + 1)
+            terms.sort(key=lambda term: -term[0])
+            bounds = [idf * (self.k1 + 1) for idf, _, _ in terms]
+
+            if user is not None:
+                # A user's summaries are few: score just those
+                docs = np.flatnonzero(self.doc_users.values == user).astype(np.int32)
+                if public_only:
+                    docs = docs[self.doc_public.values[docs] == 1]
+                if language_id is not None:
+                    docs = docs[self.doc_languages.values[docs] == language_id]
+                scores = np.zeros(len(docs), np.float32)
+                for idf, term_docs, tfs in terms:
+                    found, positions = _intersect(docs, term_docs)
+                    scores[found] += self._term_scores(idf, term_docs[positions], tfs[positions])
+                docs, scores = docs[scores > 0], scores[scores > 0]
+            else:
+                candidates = _Candidates(self, language_id)
+                try:
+                    essential = 0
+                    while essential < len(terms):
+                        idf, term_docs, tfs = terms[essential]
+                        candidates.add(term_docs, self._term_scores(idf, term_docs, tfs))
+                        essential += 1
+                        if essential < len(terms):
+                            _, scores = candidates.result()
+                            if len(scores) >= limit and np.partition(scores, -limit)[-limit] > sum(bounds[essential:]):
+                                break
+                    for term in terms[essential:]:
+                        candidates.add_to_existing(*term)
+                    docs, scores = candidates.result()
+                finally:
+                    candidates.release()
+
+            if len(docs) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                docs, scores = docs[top], scores[top]
+            # Newer summaries first among equal scores
+            order = np.lexsort((-docs, -scores))
+            return [(self.summary_ids[doc], float(score))
+                    for doc, score in zip(docs[order].tolist(), scores[order].tolist())]
+
+    def _term_scores(self, idf: float, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        tf = tfs.astype(np.float32)
+        return tf * np.float32(idf * (self.k1 + 1)) / (tf + self._doc_norms()[docs])
+
+    def _doc_norms(self) -> np.ndarray:
+        """k1 * (1 - b + b * length / average length) per document.
+
+        Kept between searches: documents added since are appended at the
+        average the column was computed with, and the column is redone once
+        the average has moved by more than 1%.
+        """
+        average = self.total_length / len(self.summary_ids)
+        if self._norms is None or abs(average - self._norms_average) > 0.01 * self._norms_average:
+            self._norms, self._norms_average = _Column('<f4'), average
+        norms = self._norms
+        if norms.size < len(self.summary_ids):
+            lengths = self.doc_lengths.values[norms.size:].astype(np.float32)
+            norms.extend(lengths * np.float32(self.k1 * self.b / self._norms_average) + np.float32(self.k1 * (1 - self.b)))
+        return norms.values
+
+    def _buffers(self, num_docs: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Zeroed score and match buffers of num_docs entries"""
+        if self._totals is None or len(self._totals) < num_docs:
+            size = max(num_docs, 2 * len(self._totals)) if self._totals is not None else num_docs
+            self._totals, self._matched = np.zeros(size, np.float32), np.zeros(size, bool)
+        return self._totals[:num_docs], self._matched[:num_docs]
+
+    def catch_up(self, store, tokenize: Callable[[str, str], List[str]], batch_size: int = 500) -> int:
+        """Index the rows a SummaryStore inserted since the last call; returns how many"""
+        added = 0
+        while True:
+            rows = store.rows_after(self.last_seq, batch_size)
+            if not rows:
+                break
+            for seq, summary_id, user_id, language, is_public, text in rows:
+                self.add(summary_id, tokenize(text, language), language, user_id, bool(is_public), seq)
+            self.maintain()
+            added += len(rows)
+        return added
+
+    def follow(self, store, tokenize: Callable[[str, str], List[str]], path: Optional[str] = None,
+               interval: float = 1.0, save_interval: float = 300.0) -> None:
+        """Index what store inserts from a background thread, woken by notify() or every
+        interval seconds, and save a changed index to path every save_interval seconds"""
+        def run() -> None:
+            last_save = time.monotonic()
+            while not self._stop.is_set():
+                self._wake.wait(interval)
+                self._wake.clear()
+                try:
+                    self.catch_up(store, tokenize)
+                    if path is not None and self.changed and time.monotonic() - last_save >= save_interval:
+                        self.save(path)
+                        last_save = time.monotonic()
+                except sqlite3.Error:
+                    continue  # e.g. a locked database; the rows are read next time
+                except Exception as e:
+                    # Keep following: a thread that died here would leave search silently stale
+                    print(f"Search index update failed: {e}")  # retried at the next wake-up
+
+        self._thread = threading.Thread(target=run, name='search-index', daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Wake the follow() thread, e.g. as a SummaryStore listener"""
+        self._wake.set()
+
+    def close(self, store=None, tokenize: Optional[Callable[[str, str], List[str]]] = None,
+              path: Optional[str] = None) -> None:
+        """Stop the follow() thread, index what is left in store and save to path"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        if store is not None and tokenize is not None:
+            self.catch_up(store, tokenize)
+        if path is not None and self.changed:
+            self.save(path)
+
+    def save(self, path: str) -> int:
+        """Write the index to path (atomically replaced); returns its size in bytes"""
+        self.maintain(force=True)
+        with self._lock:
+            segments = list(self.segments)
+            header = {
+                'version': 1,
+                'total_length': self.total_length,
+                'last_seq': self.last_seq,
+                'languages': self.languages,
+                'users': self.users,
+                'segments': len(segments),
+                'arrays': {}
+            }
+            columns = {
+                'terms': np.frombuffer('\0'.join(self.term_ids).encode('utf-8'), np.uint8),
+                'summary_ids': np.frombuffer('\0'.join(self.summary_ids).encode('utf-8'), np.uint8),
+                'doc_lengths': self.doc_lengths.values.copy(),
+                'doc_languages': self.doc_languages.values.copy(),
+                'doc_users': self.doc_users.values.copy(),
+                'doc_public': self.doc_public.values.copy()
+            }
+            self.changed = False
+        for index, segment in enumerate(segments):
+            for name in _SEGMENT_ARRAYS:
+                columns[f'segment{index}.{name}'] = getattr(segment, name)
+
+        offset = 0
+        for name, values in columns.items():
+            header['arrays'][name] = [offset, values.dtype.str, len(values)]
+            offset = _align(offset + values.nbytes)
+        encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        data_start = _align(len(_MAGIC) + 8 + len(encoded))
+
+        # API processes sharing the store each index all of it and save to the same path; whichever
+        # saves last wins, and a loader indexes the rows after its last_seq on top
+        with file_lock(f'{path}.lock'), replace_file(path) as file:
+            file.write(_MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+            for name, values in columns.items():
+                file.seek(data_start + header['arrays'][name][0])
+                file.write(np.ascontiguousarray(values).data)
+            file.truncate(data_start + offset)
+        return data_start + offset
+
+    @classmethod
+    def load(cls, path: str, k1: float = 1.2, b: float = 0.75, segment_postings: int = 1 << 18,
+             merge_factor: int = 8) -> 'SearchIndex':
+        """Index saved by save(); postings stay in the memory-mapped file. ValueError when it is not one"""
+        with open(path, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f'{path} is not a search index')
+            (length,) = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(length).decode('utf-8'))
+        data_start = _align(len(_MAGIC) + 8 + length)
+        # A plain array over the mapping: memmap slices run Python hooks on every access
+        mapped = np.asarray(np.memmap(path, np.uint8, 'r'))
+
+        def column(name: str) -> np.ndarray:
+            offset, dtype, count = header['arrays'][name]
+            start = data_start + offset
+            return mapped[start:start + count * np.dtype(dtype).itemsize].view(dtype)
+
+        def strings(name: str) -> List[str]:
+            values = column(name)
+            return bytes(values).decode('utf-8').split('\0') if len(values) else []
+
+        index = cls(k1, b, segment_postings, merge_factor)
+        index.term_ids = {term: term_id for term_id, term in enumerate(strings('terms'))}
+        index.summary_ids = strings('summary_ids')
+        for name, dtype in (('doc_lengths', '<u4'), ('doc_languages', 'u1'), ('doc_users', '<u4'), ('doc_public', 'u1')):
+            setattr(index, name, _Column(dtype, column(name)))
+        index.languages = header['languages']
+        index.users = header['users']
+        index._language_ids = {language: language_id for language_id, language in enumerate(index.languages)}
+        index._user_ids = {user: user_id for user_id, user in enumerate(index.users) if user is not None}
+        index.total_length = header['total_length']
+        index.last_seq = header['last_seq']
+        index.segments = [PostingSegment(*(column(f'segment{number}.{name}') for name in _SEGMENT_ARRAYS))
+                          for number in range(header['segments'])]
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes for monitoring"""
+        with self._lock:
+            segments = list(self.segments)
+            tail = len(self._tail)
+        return {
+            'documents': len(self.summary_ids),
+            'terms': len(self.term_ids),
+            'segments': len(segments),
+            'postings': sum(len(segment) for segment in segments) + tail,
+            'compressed_bytes': sum(segment.nbytes for segment in segments),
+            'last_seq': self.last_seq
+        }
+
+__all__ = [
+    'PostingSegment',
+    'SearchIndex'
+]
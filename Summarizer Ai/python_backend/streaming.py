@@ -0,0 +1,139 @@
+"""
+Incremental sentence segmentation over streams of text chunks (request bodies, open files)
+"""
+
+import codecs
+import re
+from typing import Iterable, Iterator, List, Union
+
+from config import Config
+
+Chunk = Union[str, bytes]
+
+class StreamLimitExceeded(ValueError):
+    """Raised when a stream grows past its character limit"""
+
+def sentence_pattern(delimiters: str) -> 're.Pattern':
+    """A sentence: a run of non-delimiters that starts and ends on a non-space character"""
+    return re.compile('[^{0}\\s](?:[^{0}]*[^{0}\\s])?'.format(re.escape(delimiters)))
+
+def decode_chunks(chunks: Iterable[Chunk], encoding: str = 'utf-8') -> Iterator[str]:
+    """Decode byte chunks incrementally, so a character split across two chunks is kept whole"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for chunk in chunks:
+        text = decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray, memoryview)) else chunk
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def limit_chunks(chunks: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Pass chunks through, raising StreamLimitExceeded once more than max_chars arrived"""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if total > max_chars:
+            raise StreamLimitExceeded(f'Text exceeds the maximum of {max_chars} characters')
+        yield chunk
+
+class StreamingSentenceSplitter:
+    """Splits text fed chunk by chunk into the same sentences as splitting it whole.
+
+    Only the text after the last delimiter seen so far is buffered: everything
+    before it is complete, whether a delimiter run ends a chunk or begins the
+    next one. When more than max_sentence_chars arrive without a delimiter, the
+    buffer is cut at whitespace, so its size stays bounded on any input.
+    Character, word and paragraph counts of the whole stream are kept as the
+    text goes by, matching len(text), len(text.split()) and the non-blank
+    blocks of text.split('\\n\\n').
+    """
+
+    def __init__(self, delimiters: str, max_sentence_chars: int = Config.STREAM_MAX_SENTENCE_CHARS):
+        self.delimiters = delimiters
+        self.pattern = sentence_pattern(delimiters)
+        self.max_sentence_chars = max_sentence_chars
+        self.char_count = 0
+        self.word_count = 0
+        self.paragraph_count = 0
+        self._buffer = ''
+        # State of the text consumed so far, for words and paragraph breaks across cuts
+        self._in_word = False
+        self._gap_has_break = False
+        self._gap_ends_newline = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk and return the sentences it completed"""
+        self.char_count += len(chunk)
+        buffer = self._buffer + chunk if self._buffer else chunk
+
+        sentences: List[str] = []
+        cut = max(map(buffer.rfind, self.delimiters)) + 1
+        if cut:
+            sentences = self._consume(buffer, cut)
+            buffer = buffer[cut:]
+
+        limit = self.max_sentence_chars
+        while len(buffer) > limit:
+            # No delimiter in sight: end the sentence at the last whitespace (or anywhere)
+            cut = max(buffer.rfind(' ', 0, limit), buffer.rfind('\n', 0, limit))
+            if cut <= 0:
+                cut = limit
+            sentences.extend(self._consume(buffer, cut))
+            buffer = buffer[cut:]
+
+        self._buffer = buffer
+        return sentences
+
+    def close(self) -> List[str]:
+        """Return the sentences left in the buffer at the end of the stream"""
+        buffer, self._buffer = self._buffer, ''
+        return self._consume(buffer, len(buffer))
+
+    def split(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield the sentences of a stream of chunks"""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def _consume(self, buffer: str, end: int) -> List[str]:
+        if not end:
+            return []
+        segment = buffer[:end] if end < len(buffer) else buffer
+        self._count(segment)
+        return [match.group() for match in self.pattern.finditer(segment)]
+
+    def _count(self, segment: str) -> None:
+        stripped = segment.strip()
+        if not stripped:
+            # Whitespace only: it extends the gap after the last word
+            self._gap_has_break = (self._gap_has_break or '\n\n' in segment
+                                   or (self._gap_ends_newline and segment[0] == '\n'))
+            self._gap_ends_newline = segment[-1] == '\n'
+            self._in_word = False
+            return
+
+        words = len(segment.split())
+        if self._in_word and not segment[0].isspace():
+            words -= 1  # the first word continues the last one
+        self.word_count += words
+
+        lead = segment[:len(segment) - len(segment.lstrip())]
+        paragraph_break = self._gap_has_break or '\n\n' in lead or (self._gap_ends_newline and lead[:1] == '\n')
+        paragraphs = len([p for p in stripped.split('\n\n') if p.strip()])
+        if self.paragraph_count and not paragraph_break:
+            paragraphs -= 1  # the first paragraph continues the last one
+        self.paragraph_count += paragraphs
+
+        tail = segment[len(segment.rstrip()):]
+        self._in_word = not tail
+        self._gap_has_break = '\n\n' in tail
+        self._gap_ends_newline = tail.endswith('\n')
+
+__all__ = [
+    'StreamingSentenceSplitter',
+    'StreamLimitExceeded',
+    'decode_chunks',
+    'limit_chunks',
+    'sentence_pattern'
+]
@@ -0,0 +1,129 @@
+"""
+Deterministic synthetic multilingual corpus for benchmarks
+"""
+
+import random
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import Config
+from script_detector import SCRIPT_RANGES
+from tokenizer import STOPWORDS
+
+# Document sizes in characters, from 1 KB up to the API limit
+DEFAULT_SIZES = (1024, 4096, 16384, Config.MAX_TEXT_LENGTH)
+
+# Letters and dependent vowel signs of each script's block (offsets from the block start)
+SCRIPT_LETTERS: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]] = {
+    'devanagari': ((0x15, 0x39), (0x3E, 0x4C)),
+    'bengali': ((0x15, 0x39), (0x3E, 0x4C)),
+    'telugu': ((0x15, 0x39), (0x3E, 0x4C)),
+    'tamil': ((0x15, 0x39), (0x3E, 0x4C)),
+    'gujarati': ((0x15, 0x39), (0x3E, 0x4C)),
+    'kannada': ((0x15, 0x39), (0x3E, 0x4C)),
+    'malayalam': ((0x15, 0x39), (0x3E, 0x4C)),
+    'odia': ((0x15, 0x39), (0x3E, 0x4C)),
+    'gurmukhi': ((0x15, 0x39), (0x3E, 0x4C)),
+    'arabic': ((0x28, 0x4A), (0x4B, 0x4F))
+}
+
+# Languages missing from Config.get_language_config() are written in Devanagari
+EXTRA_LANGUAGE_SCRIPTS = {'mai': 'devanagari', 'sa': 'devanagari', 'ne': 'devanagari'}
+
+# Sentence terminators: danda for the North Indian scripts, full stop elsewhere
+DANDA_SCRIPTS = {'devanagari', 'bengali', 'gurmukhi', 'odia'}
+
+IMPORTANT_WORDS = {'en': 'important', 'hi': 'महत्वपूर्ण'}
+
+def language_script(language: str) -> str:
+    """Lowercase script name of a supported language ('latin' for English)"""
+    info = Config.get_language_config().get(language)
+    if info is None:
+        return EXTRA_LANGUAGE_SCRIPTS.get(language, 'latin')
+    return info['script'].lower()
+
+class SyntheticCorpus:
+    """Generates reproducible documents per language and size.
+
+    Each language gets a fixed vocabulary of pseudo-words in its own script
+    (plus its stopwords), drawn with Zipf-like frequencies into sentences and
+    paragraphs. The same seed, language, size and index always give the
+    same text, so benchmark runs are comparable across commits and machines.
+    """
+
+    def __init__(self, seed: int = 42, vocabulary_size: int = 2000):
+        self.seed = seed
+        self.vocabulary_size = vocabulary_size
+        self._vocabularies: Dict[str, List[str]] = {}
+
+    def _rng(self, *parts) -> random.Random:
+        # String seeds are hashed with SHA-512, so they do not depend on PYTHONHASHSEED
+        return random.Random(':'.join(str(part) for part in (self.seed,) + parts))
+
+    def _alphabet(self, script: str) -> Tuple[List[str], List[str]]:
+        if script not in SCRIPT_RANGES:
+            return list('bcdfghjklmnpqrstvwxyz'), list('aeiou')
+        block_start = SCRIPT_RANGES[script][0]
+        (letters_start, letters_end), (signs_start, signs_end) = SCRIPT_LETTERS[script]
+        letters = [chr(block_start + offset) for offset in range(letters_start, letters_end + 1)]
+        signs = [chr(block_start + offset) for offset in range(signs_start, signs_end + 1)]
+        return letters, signs
+
+    def vocabulary(self, language: str) -> List[str]:
+        """Pseudo-words of a language, most frequent first"""
+        if language not in self._vocabularies:
+            rng = self._rng('vocabulary', language)
+            letters, signs = self._alphabet(language_script(language))
+            words = set()
+            while len(words) < self.vocabulary_size:
+                syllables = rng.randint(1, 4)
+                words.add(''.join(rng.choice(letters) + (rng.choice(signs) if rng.random() < 0.6 else '')
+                                  for _ in range(syllables)))
+
+            # Stopwords lead the frequency ranking, as in real text
+            stopwords = sorted(STOPWORDS.get(language, ()))
+            self._vocabularies[language] = stopwords + sorted(words - set(stopwords))
+        return self._vocabularies[language]
+
+    def document(self, language: str, size: int, index: int = 0) -> str:
+        """A document of at most `size` characters in the given language"""
+        rng = self._rng('document', language, size, index)
+        vocabulary = self.vocabulary(language)
+        weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+        terminator = '।' if language_script(language) in DANDA_SCRIPTS else '.'
+        important = IMPORTANT_WORDS.get(language)
+
+        paragraphs: List[str] = []
+        length = 0
+        while length < size:
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                words = rng.choices(vocabulary, weights=weights, k=rng.randint(6, 24))
+                if rng.random() < 0.15:
+                    words.insert(rng.randrange(len(words)), str(rng.randint(1, 2024)))
+                if important and rng.random() < 0.05:
+                    words.insert(0, important)
+                sentences.append(' '.join(words) + terminator)
+            paragraph = ' '.join(sentences)
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+
+        text = '\n\n'.join(paragraphs)
+        if len(text) > size:
+            # Cut at a word boundary and close the last sentence
+            cut = text.rfind(' ', 0, size)
+            text = text[:cut if cut > 0 else size - 1].rstrip(terminator + ' \n') + terminator
+        return text
+
+    def documents(self, languages: Optional[Sequence[str]] = None, sizes: Sequence[int] = DEFAULT_SIZES,
+                  count: int = 1) -> Iterator[Tuple[str, int, int, str]]:
+        """Yield (language, size, index, text) for every combination"""
+        for language in languages or Config.SUPPORTED_LANGUAGES:
+            for size in sizes:
+                for index in range(count):
+                    yield language, size, index, self.document(language, size, index)
+
+__all__ = [
+    'SyntheticCorpus',
+    'DEFAULT_SIZES',
+    'language_script'
+]
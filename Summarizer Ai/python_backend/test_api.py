@@ -117,7 +117,9 @@ class APITester:
         test_options = [
             {"length": "short", "language": "hi"},
             {"length": "medium", "language": "hi"},
-            {"length": "long", "language": "hi"}
+            {"length": "long", "language": "hi"},
+            {"length": "medium", "language": "hi", "mode": "mmr"},
+            {"length": "medium", "language": "hi", "mode": "textrank"}
         ]
         
         success_count = 0
@@ -130,7 +132,7 @@ class APITester:
                 
                 if response.status_code == 200:
                     data = response.json()
-                    print(f"✅ {options['length'].title()} summary generated:")
+                    print(f"✅ {options['length'].title()} {options.get('mode', 'score')} summary generated:")
                     print(f"   Original words: {data['original_stats']['words']}")
                     print(f"   Summary words: {data['summary_stats']['words']}")
                     print(f"   Compression: {data['compression_ratio']:.2%}")
@@ -146,6 +148,42 @@ class APITester:
         print(f"   Summarization: {success_count}/{len(test_options)} successful")
         return success_count == len(test_options)
     
+    def test_field_projection(self) -> bool:
+        """Test response field projections"""
+        print("\n🔍 Testing field projections...")
+        
+        text = "भारत एक महान देश है। यहाँ की संस्कृति बहुत समृद्ध है। यहाँ अनेक भाषाएँ बोली जाती हैं। भारत की राजधानी नई दिल्ली है।"
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/summarize",
+                json={"text": text, "options": {"language": "hi"}, "fields": "summary,keywords"}
+            )
+            if response.status_code != 200 or set(response.json()) != {'summary', 'keywords'}:
+                print(f"❌ Projection in the body failed: {response.status_code} {sorted(response.json())}")
+                return False
+            print(f"✅ Body projection returned: {', '.join(sorted(response.json()))}")
+            
+            response = self.session.post(
+                f"{self.base_url}/api/summarize",
+                params={"fields": "summary,stats"},
+                json={"text": text, "options": {"language": "hi"}}
+            )
+            if response.status_code != 200 or 'summary' not in response.json() or 'original_text' in response.json():
+                print(f"❌ Projection in the query string failed: {response.status_code}")
+                return False
+            print(f"✅ Query projection returned: {', '.join(sorted(response.json()))}")
+            
+            response = self.session.post(
+                f"{self.base_url}/api/summarize",
+                json={"text": text, "fields": "summary,no_such_field"}
+            )
+            print(f"   Unknown field: {response.status_code} {response.json().get('error')}")
+            return response.status_code == 400
+        except Exception as e:
+            print(f"❌ Field projection error: {e}")
+            return False
+    
     def test_keyword_extraction(self) -> bool:
         """Test keyword extraction endpoint"""
         print("\n🔍 Testing keyword extraction...")
@@ -218,6 +256,175 @@ class APITester:
             print(f"❌ Batch summarization error: {e}")
             return False
     
+    def test_batch_stream(self) -> bool:
+        """Test streaming NDJSON batch summarization"""
+        print("\n🔍 Testing streaming batch summarization...")
+        
+        articles = [
+            "भारत एक महान देश है। यहाँ की संस्कृति बहुत समृद्ध है। यहाँ अनेक भाषाएँ बोली जाती हैं।",
+            {"text": "तकनीक आज के युग में बहुत महत्वपूर्ण है। आर्टिफिशियल इंटेलिजेंस का उपयोग बढ़ रहा है।",
+             "options": {"length": "short", "language": "hi"}},
+            {"no_text": True}
+        ]
+        body = "\n".join(json.dumps(article, ensure_ascii=False) for article in articles).encode('utf-8')
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/batch-summarize/stream",
+                data=body,
+                headers={'Content-Type': 'application/x-ndjson'},
+                stream=True
+            )
+            if response.status_code != 200:
+                print(f"❌ Streaming batch failed: {response.status_code}")
+                return False
+            
+            # One line per article, in completion order
+            entries = {}
+            for line in response.iter_lines():
+                if line:
+                    entry = json.loads(line)
+                    entries[entry['index']] = entry
+                    outcome = entry.get('summary', entry.get('error', ''))
+                    print(f"   Text {entry['index']+1}: {outcome[:50]}...")
+            
+            if sorted(entries) != [0, 1, 2] or 'summary' not in entries[0] or 'summary' not in entries[1] \
+                    or 'error' not in entries[2]:
+                print("❌ Streaming batch returned unexpected lines")
+                return False
+            print(f"✅ Streaming batch returned {len(entries)} lines")
+            return True
+        except Exception as e:
+            print(f"❌ Streaming batch error: {e}")
+            return False
+    
+    def test_sessions(self) -> bool:
+        """Test incremental summarization sessions"""
+        print("\n🔍 Testing summarization sessions...")
+        
+        parts = [
+            "भारत दुनिया का सबसे बड़ा लोकतंत्र है। यह दक्षिण एशिया में स्थित है। भारत में 28 राज्य हैं। ",
+            "यहाँ की राजधानी नई दिल्ली है। भारत की अर्थव्यवस्था तेजी से बढ़ रही है। ",
+            "आज भारत तकनीक और नवाचार के क्षेत्र में आगे बढ़ रहा है। यहाँ 22 आधिकारिक भाषाएँ हैं।"
+        ]
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/sessions",
+                json={"text": parts[0], "options": {"length": "short", "language": "hi"}}
+            )
+            if response.status_code != 201:
+                print(f"❌ Session creation failed: {response.status_code}")
+                return False
+            session_id = response.json()['session']['id']
+            print(f"✅ Session created: {session_id}")
+            
+            for part in parts[1:]:
+                response = self.session.post(f"{self.base_url}/api/sessions/{session_id}", json={"text": part})
+                if response.status_code != 200:
+                    print(f"❌ Session append failed: {response.status_code}")
+                    return False
+                data = response.json()
+                print(f"   Appended: {data['original_stats']['sentences']} sentences -> {data['summary'][:50]}...")
+            
+            # The session summary equals a one-shot summary of the whole text
+            one_shot = self.session.post(
+                f"{self.base_url}/api/summarize",
+                json={"text": "".join(parts), "options": {"length": "short", "language": "hi"}}
+            ).json()
+            if data['summary'] != one_shot['summary']:
+                print("❌ Session summary differs from the one-shot summary")
+                return False
+            
+            read = self.session.get(f"{self.base_url}/api/sessions/{session_id}", params={"fields": "summary"})
+            deleted = self.session.delete(f"{self.base_url}/api/sessions/{session_id}")
+            gone = self.session.get(f"{self.base_url}/api/sessions/{session_id}")
+            print(f"   Read: {read.status_code}, delete: {deleted.status_code}, read after delete: {gone.status_code}")
+            return read.status_code == 200 and deleted.status_code == 200 and gone.status_code == 404
+        except Exception as e:
+            print(f"❌ Sessions error: {e}")
+            return False
+    
+    def _save_summaries(self, user_id: str, marker: str) -> Dict[str, str]:
+        """Summarize a public and a private article (made unique by marker) for user_id; returns their ids"""
+        ids = {}
+        for visibility in ("public", "private"):
+            text = (f"The {visibility} report {marker} covers monsoon rainfall across the region. "
+                    "Farmers welcomed the rain after a long dry spell. Rivers rose in several districts. "
+                    "Officials expect a good harvest this year.")
+            response = self.session.post(
+                f"{self.base_url}/api/summarize",
+                json={"text": text, "user_id": user_id,
+                      "options": {"language": "en", "is_public": visibility == "public"}}
+            )
+            ids[visibility] = response.json()['id']
+        return ids
+    
+    def test_summary_history(self) -> bool:
+        """Test the stored summary history"""
+        print("\n🔍 Testing summary history...")
+        
+        try:
+            response = self.session.get(f"{self.base_url}/api/summaries")
+            if response.status_code == 503:
+                print("⚠️  Summary history is disabled on the server (SUMMARY_STORE_ENABLED); skipped")
+                return True
+            
+            user_id = f"api-test-{int(time.time() * 1000)}"
+            ids = self._save_summaries(user_id, user_id)
+            
+            # Without a signed-in user only the public summary is listed or found
+            listed = self.session.get(f"{self.base_url}/api/summaries",
+                                      params={"user_id": user_id, "limit": 10}).json()['summaries']
+            print(f"   Listed for {user_id}: {len(listed)}")
+            public = self.session.get(f"{self.base_url}/api/summaries/{ids['public']}", params={"fields": "summary"})
+            private = self.session.get(f"{self.base_url}/api/summaries/{ids['private']}")
+            print(f"   Public by id: {public.status_code}, private by id: {private.status_code}")
+            if [summary['id'] for summary in listed] != [ids['public']] or public.status_code != 200 \
+                    or set(public.json()) != {'summary'} or private.status_code != 404:
+                print("❌ Summary history returned unexpected results")
+                return False
+            print("✅ Summary history lists and serves only public summaries to anonymous clients")
+            return True
+        except Exception as e:
+            print(f"❌ Summary history error: {e}")
+            return False
+    
+    def test_search(self) -> bool:
+        """Test full-text search over stored summaries"""
+        print("\n🔍 Testing search...")
+        
+        try:
+            response = self.session.get(f"{self.base_url}/api/search", params={"q": "monsoon"})
+            if response.status_code == 503:
+                print("⚠️  Search is disabled on the server (SUMMARY_STORE_ENABLED, SEARCH_ENABLED); skipped")
+                return True
+            
+            # A word found in no other summary, so this user's two summaries are the only matches
+            marker = f"zq{int(time.time() * 1000)}"
+            user_id = f"api-test-{marker}"
+            ids = self._save_summaries(user_id, marker)
+            
+            # Summaries are indexed in the background, within SEARCH_SYNC_INTERVAL seconds
+            for _ in range(20):
+                response = self.session.get(f"{self.base_url}/api/search",
+                                            params={"q": f"{marker} rainfall", "user_id": user_id, "fields": "id,summary"})
+                results = response.json().get('results', [])
+                if results:
+                    break
+                time.sleep(0.25)
+            
+            print(f"   Results: {[(result['id'], result['score']) for result in results]}, "
+                  f"took {response.json().get('took_ms')} ms")
+            if response.status_code != 200 or [result['id'] for result in results] != [ids['public']]:
+                print("❌ Search should find only the public summary for an anonymous client")
+                return False
+            print("✅ Search found the public summary")
+            return True
+        except Exception as e:
+            print(f"❌ Search error: {e}")
+            return False
+    
     def test_supported_languages(self) -> bool:
         """Test supported languages endpoint"""
         print("\n🔍 Testing supported languages...")
@@ -255,8 +462,13 @@ class APITester:
             "Language Detection": self.test_language_detection,
             "Text Statistics": self.test_text_stats,
             "Summarization": self.test_summarization,
+            "Field Projection": self.test_field_projection,
             "Keyword Extraction": self.test_keyword_extraction,
             "Batch Summarization": self.test_batch_summarization,
+            "Streaming Batch": self.test_batch_stream,
+            "Sessions": self.test_sessions,
+            "Summary History": self.test_summary_history,
+            "Search": self.test_search,
             "Supported Languages": self.test_supported_languages
         }
         
@@ -296,7 +508,7 @@ def main():
     
     parser = argparse.ArgumentParser(description="Test the Advanced Multilingual Summarizer API")
     parser.add_argument("--url", default="http://localhost:5000", help="API base URL")
-    parser.add_argument("--test", help="Run specific test (health, language, stats, summarize, keywords, batch, languages)")
+    parser.add_argument("--test", help="Run specific test (health, language, stats, summarize, fields, keywords, batch, stream, sessions, history, search, languages)")
     
     args = parser.parse_args()
     
@@ -308,8 +520,13 @@ def main():
             "language": tester.test_language_detection,
             "stats": tester.test_text_stats,
             "summarize": tester.test_summarization,
+            "fields": tester.test_field_projection,
             "keywords": tester.test_keyword_extraction,
             "batch": tester.test_batch_summarization,
+            "stream": tester.test_batch_stream,
+            "sessions": tester.test_sessions,
+            "history": tester.test_summary_history,
+            "search": tester.test_search,
             "languages": tester.test_supported_languages
         }
         
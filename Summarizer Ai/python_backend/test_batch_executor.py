@@ -0,0 +1,34 @@
+"""
+Batch pool workers are told apart from the server process.
+Run with: python -m pytest test_batch_executor.py
+"""
+
+import os
+
+import batch_executor
+from batch_executor import BatchExecutor
+
+def _worker_state(_):
+    import batch_executor
+    return batch_executor.IN_POOL_WORKER, os.getpid()
+
+def test_only_pool_workers_see_the_worker_flag():
+    executor = BatchExecutor(2, 'spawn')
+    environ = dict(os.environ)
+    try:
+        states = executor.map(_worker_state, [0, 1, 2, 3])
+    finally:
+        executor.shutdown()
+    assert all(in_worker and pid != os.getpid() for in_worker, pid in states)
+    # Starting the pool changes nothing the server (or a process it starts later) sees
+    assert not batch_executor.IN_POOL_WORKER
+    assert dict(os.environ) == environ
+
+def test_workers_keep_the_flag_after_the_pool_is_replaced():
+    executor = BatchExecutor(2, 'spawn')
+    try:
+        executor.map(_worker_state, [0, 1])
+        executor._discard(executor._get_pool())
+        assert all(in_worker for in_worker, _ in executor.map(_worker_state, [0, 1]))
+    finally:
+        executor.shutdown()
@@ -0,0 +1,92 @@
+"""
+Sentence selection and ranking checked against dense brute-force references.
+Run with: python -m pytest test_selection.py
+"""
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from app import summarizer
+from scoring import mmr_select, textrank
+from synthetic_corpus import SyntheticCorpus
+
+def random_tfidf(num_rows: int, num_terms: int, seed: int) -> sparse.csr_matrix:
+    """L2-normalized random sparse rows, as SparseScoringEngine produces"""
+    matrix = sparse.random(num_rows, num_terms, density=0.02, format='csr', random_state=seed)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ matrix
+
+def dense_mmr(tfidf: sparse.csr_matrix, relevance: np.ndarray, count: int, trade_off: float):
+    """MMR over the full pairwise similarity matrix, re-scoring every row at every pick"""
+    similarity = (tfidf @ tfidf.T).toarray()
+    gain = trade_off * relevance / relevance.max()
+    selected = []
+    for _ in range(min(count, len(relevance))):
+        redundancy = similarity[:, selected].max(axis=1) if selected else np.zeros(len(relevance))
+        marginal = gain - (1 - trade_off) * redundancy
+        marginal[selected] = -np.inf
+        selected.append(int(np.argmax(marginal)))
+    return selected
+
+def dense_pagerank(tfidf: sparse.csr_matrix, damping: float = 0.85, iterations: int = 1000) -> np.ndarray:
+    """PageRank over all sentence pairs (cosine edges), scaled to a mean of 1"""
+    weights = (tfidf @ tfidf.T).toarray()
+    np.fill_diagonal(weights, 0.0)
+    num_rows = len(weights)
+    out_weights = weights.sum(axis=1)
+    # Sentences without edges link to every sentence alike
+    transition = np.where(out_weights[:, None] > 0, weights / np.where(out_weights > 0, out_weights, 1.0)[:, None],
+                          1.0 / num_rows)
+    rank = np.full(num_rows, 1.0 / num_rows)
+    for _ in range(iterations):
+        rank = (1 - damping) / num_rows + damping * transition.T @ rank
+    return rank * num_rows
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('trade_off', [0.3, 0.7, 0.95])
+def test_mmr_matches_dense_reference_on_random_rows(seed, trade_off):
+    tfidf = random_tfidf(300, 500, seed)
+    relevance = np.random.default_rng(seed).random(300)
+    assert mmr_select(tfidf, relevance, 25, trade_off) == dense_mmr(tfidf, relevance, 25, trade_off)
+
+@pytest.mark.parametrize('language', ['en', 'hi'])
+def test_mmr_matches_dense_reference_on_documents(language):
+    document = summarizer.language_processor.analyze(SyntheticCorpus().document(language, 50000, 3), language)
+    scores = summarizer.calculate_sentence_scores(document)
+    tfidf = summarizer.score_document(document).tfidf
+    assert mmr_select(tfidf, scores, 30, 0.7) == dense_mmr(tfidf, scores, 30, 0.7)
+
+def test_mmr_without_redundancy_penalty_picks_top_sentences():
+    text = SyntheticCorpus().document('en', 20000, 4)
+    document = summarizer.language_processor.analyze(text, 'en')
+    scores = summarizer.calculate_sentence_scores(document)
+    assert summarizer.select_sentences(document, scores, {'mode': 'mmr', 'mmr_lambda': 1}) == \
+        summarizer.select_sentences(document, scores, {})
+
+def test_mmr_repeats_fewer_sentences_than_score_mode():
+    text = SyntheticCorpus().document('en', 4000, 5)
+    doubled = text + ' ' + text
+    document = summarizer.language_processor.analyze(doubled, 'en')
+    scores = summarizer.calculate_sentence_scores(document)
+    
+    def repeats(options):
+        sentences = [doubled[start:end].strip() for start, end in
+                     (document.sentence_spans[i] for i in summarizer.select_sentences(document, scores, options))]
+        return len(sentences) - len(set(sentences))
+    
+    assert repeats({'mode': 'mmr'}) < repeats({}) / 2
+
+@pytest.mark.parametrize('seed', range(3))
+def test_textrank_matches_dense_pagerank_on_random_rows(seed):
+    tfidf = random_tfidf(200, 400, seed)
+    rank, _ = textrank(tfidf, tolerance=1e-12, max_iterations=1000, max_postings=200)
+    np.testing.assert_allclose(rank, dense_pagerank(tfidf), rtol=1e-8, atol=1e-10)
+
+@pytest.mark.parametrize('language', ['en', 'hi'])
+def test_textrank_matches_dense_pagerank_on_documents(language):
+    document = summarizer.language_processor.analyze(SyntheticCorpus().document(language, 16384, 3), language)
+    tfidf = summarizer.score_document(document).tfidf
+    # With no postings cap, the sparse graph holds every pair of sentences sharing a term
+    rank, _ = textrank(tfidf, tolerance=1e-12, max_iterations=1000, max_postings=tfidf.shape[0])
+    np.testing.assert_allclose(rank, dense_pagerank(tfidf), rtol=1e-8, atol=1e-10)
@@ -0,0 +1,51 @@
+"""
+Incremental sessions must summarize exactly like a one-shot summary of the same text.
+Run with: python -m pytest test_sessions.py
+"""
+
+import random
+
+import pytest
+
+from app import summarizer
+from synthetic_corpus import SyntheticCorpus
+
+# Fields that differ between any two summaries of one text
+VOLATILE_FIELDS = ('id', 'created_at', 'original_text', 'reused')
+
+@pytest.mark.parametrize('language', ['en', 'hi', 'ta'])
+def test_session_matches_one_shot_at_random_append_points(language):
+    text = SyntheticCorpus().document(language, 30000, 2)
+    options = {'length': 'short', 'language': language}
+    session = summarizer.create_session(options)
+    rng = random.Random(3)
+    position = checked = 0
+    while position < len(text):
+        # Appends cut through words, sentences and paragraphs alike
+        step = rng.randint(1, 3000)
+        session.append(text[position:position + step])
+        position += step
+        if rng.random() >= 0.3 and position < len(text):
+            continue
+        incremental = summarizer.summarize_session(session)
+        one_shot = summarizer._summarize_text_uncached(text[:position], options)
+        for name in one_shot.__dataclass_fields__:
+            if name in VOLATILE_FIELDS:
+                continue
+            expected, actual = getattr(one_shot, name), getattr(incremental, name)
+            if isinstance(expected, float):
+                assert actual == pytest.approx(expected, abs=1e-9), (position, name)
+            else:
+                assert actual == expected, (position, name)
+        checked += 1
+    assert checked > 3
+
+def test_session_summary_after_many_small_appends():
+    text = SyntheticCorpus().document('en', 8000, 5)
+    session = summarizer.create_session({'length': 'medium'})
+    for offset in range(0, len(text), 7):
+        session.append(text[offset:offset + 7])
+    incremental = summarizer.summarize_session(session)
+    one_shot = summarizer._summarize_text_uncached(text, {'length': 'medium', 'language': incremental.language})
+    assert incremental.summary == one_shot.summary
+    assert incremental.keywords == one_shot.keywords
@@ -0,0 +1,30 @@
+"""
+New summaries are filed under the signed-in user, never under a user named in the request body.
+Run with: python -m pytest test_summary_owner.py
+"""
+
+import pytest
+
+from app import app
+from config import Config
+
+TEXT = 'The river rose overnight. Farmers moved their cattle to higher ground. Schools in the valley stayed closed.'
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, 'AUTH_USER_HEADER', 'X-Authenticated-User')
+    return app.test_client()
+
+def test_summary_is_filed_under_the_signed_in_user(client):
+    response = client.post('/api/summarize', json={'text': TEXT}, headers={'X-Authenticated-User': 'alice'})
+    assert response.status_code == 200
+    assert response.get_json()['user_id'] == 'alice'
+    response = client.post('/api/batch-summarize', json={'texts': [TEXT], 'user_id': 'alice'},
+                           headers={'X-Authenticated-User': 'alice'})
+    assert response.get_json()['results'][0]['user_id'] == 'alice'
+
+@pytest.mark.parametrize('path, body', [('/api/summarize', {'text': TEXT}), ('/api/batch-summarize', {'texts': [TEXT]})])
+@pytest.mark.parametrize('headers', [{'X-Authenticated-User': 'alice'}, {}])
+def test_another_users_id_in_the_body_is_rejected(client, path, body, headers):
+    response = client.post(path, json=dict(body, user_id='mallory'), headers=headers)
+    assert response.status_code == 403
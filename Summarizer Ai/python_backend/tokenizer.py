@@ -0,0 +1,121 @@
+"""
+Compiled tokenizer engine shared by the API and the text utilities
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from config import Config
+
+# Unicode blocks of the Indian scripts we keep intact while tokenizing
+INDIC_CHAR_RANGES = (
+    '\u0900-\u097F\u0980-\u09FF\u0C00-\u0C7F\u0B80-\u0BFF\u0600-\u06FF'
+    '\u0A80-\u0AFF\u0C80-\u0CFF\u0D00-\u0D7F\u0B00-\u0B7F\u0A00-\u0A7F'
+)
+
+BATCH_SEPARATOR = '\x00'
+
+# Characters that are neither word characters, whitespace nor Indian script
+# characters. Matching single characters is measurably faster in sre than
+# matching runs, and the extra spaces disappear in split().
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s' + INDIC_CHAR_RANGES + r']')
+
+# Same, but leaving the batch separator in place
+BATCH_PUNCTUATION_PATTERN = re.compile(r'[^\w\s' + BATCH_SEPARATOR + INDIC_CHAR_RANGES + r']')
+
+# Translation tables for the pure-ASCII fast path of the substitutions above
+ASCII_PUNCTUATION_TABLE = {
+    code_point: ' ' for code_point in range(128)
+    if PUNCTUATION_PATTERN.match(chr(code_point))
+}
+ASCII_BATCH_PUNCTUATION_TABLE = {
+    code_point: replacement for code_point, replacement in ASCII_PUNCTUATION_TABLE.items()
+    if chr(code_point) != BATCH_SEPARATOR
+}
+
+STOPWORDS: Dict[str, FrozenSet[str]] = {
+    'hi': frozenset({'और', 'का', 'के', 'की', 'को', 'में', 'से', 'पर', 'है', 'हैं', 'था', 'थे', 'यह', 'वह', 'इस', 'उस', 'एक', 'दो', 'तीन', 'चार', 'पांच'}),
+    'bn': frozenset({'এবং', 'বা', 'কিন্তু', 'যে', 'যা', 'এই', 'সেই', 'একটি', 'একটা', 'হয়', 'হয়েছে', 'করা', 'করে', 'থেকে', 'সাথে', 'জন্য', 'দিয়ে'}),
+    'te': frozenset({'మరియు', 'లేదా', 'కానీ', 'అని', 'ఇది', 'అది', 'ఒక', 'రెండు', 'మూడు', 'నాలుగు', 'అయిన', 'అయినది', 'చేసిన', 'చేసింది', 'లో', 'తో'}),
+    'ta': frozenset({'மற்றும்', 'அல்லது', 'ஆனால்', 'என்று', 'இது', 'அது', 'ஒரு', 'இரண்டு', 'மூன்று', 'நான்கு', 'ஆகும்', 'செய்த', 'செய்யும்', 'இல்', 'உடன்'}),
+    'mr': frozenset({'आणि', 'किंवा', 'पण', 'म्हणून', 'हे', 'ते', 'एक', 'दोन', 'तीन', 'चार', 'आहे', 'होते', 'केले', 'करणे', 'मध्ये', 'सोबत'}),
+    'gu': frozenset({'અને', 'અથવા', 'પણ', 'કે', 'આ', 'તે', 'એક', 'બે', 'ત્રણ', 'ચાર', 'છે', 'હતું', 'કર્યું', 'કરવું', 'માં', 'સાથે'}),
+    'en': frozenset({'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the', 'to', 'was', 'will', 'with'})
+}
+
+DEFAULT_STOPWORDS_LANGUAGE = 'en'
+
+def strip_punctuation(text: str) -> str:
+    """Replace punctuation and symbols with spaces, keeping Indian script characters"""
+    if text.isascii():
+        return text.translate(ASCII_PUNCTUATION_TABLE)
+    return PUNCTUATION_PATTERN.sub(' ', text)
+
+def _strip_batch_punctuation(text: str) -> str:
+    if text.isascii():
+        return text.translate(ASCII_BATCH_PUNCTUATION_TABLE)
+    return BATCH_PUNCTUATION_PATTERN.sub(' ', text)
+
+class LanguageTokenizer:
+    """Tokenizer for a single language, built once and reused for every request"""
+
+    def __init__(self, language: str, stopwords: FrozenSet[str]):
+        self.language = language
+        self.stopwords = stopwords
+
+    def tokenize(self, text: str) -> List[str]:
+        """Tokenize a single text into lowercase, stopword-free words"""
+        stopwords = self.stopwords
+        return [word for word in strip_punctuation(text).lower().split()
+                if word not in stopwords and len(word) > 1]
+
+    def tokenize_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        """Tokenize many texts (e.g. all sentences of a document) in one call"""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        # One substitution and one lower() over the joined batch instead of one per text
+        parts = _strip_batch_punctuation(BATCH_SEPARATOR.join(texts)).lower().split(BATCH_SEPARATOR)
+        if len(parts) != len(texts):
+            # A text contained the separator itself; fall back to tokenizing one by one
+            return [self.tokenize(text) for text in texts]
+
+        stopwords = self.stopwords
+        return [[word for word in part.split() if word not in stopwords and len(word) > 1]
+                for part in parts]
+
+class TokenizerEngine:
+    """Registry of per-language tokenizers compiled at startup"""
+
+    def __init__(self, languages: Optional[Iterable[str]] = None):
+        self._tokenizers: Dict[str, LanguageTokenizer] = {}
+        for language in set(languages or ()) | set(STOPWORDS):
+            self._tokenizers[language] = LanguageTokenizer(language, self.get_stopwords(language))
+        self._default = self._tokenizers[DEFAULT_STOPWORDS_LANGUAGE]
+
+    @staticmethod
+    def get_stopwords(language: str) -> FrozenSet[str]:
+        """Get stopwords for a language, falling back to English"""
+        return STOPWORDS.get(language, STOPWORDS[DEFAULT_STOPWORDS_LANGUAGE])
+
+    def get(self, language: str) -> LanguageTokenizer:
+        """Get the tokenizer for a language, falling back to English stopwords"""
+        return self._tokenizers.get(language, self._default)
+
+    def tokenize(self, text: str, language: str) -> List[str]:
+        return self.get(language).tokenize(text)
+
+    def tokenize_batch(self, texts: Iterable[str], language: str) -> List[List[str]]:
+        return self.get(language).tokenize_batch(texts)
+
+# Shared engine, built once per process at import time
+tokenizer_engine = TokenizerEngine(Config.SUPPORTED_LANGUAGES)
+
+__all__ = [
+    'LanguageTokenizer',
+    'TokenizerEngine',
+    'tokenizer_engine',
+    'strip_punctuation',
+    'STOPWORDS'
+]
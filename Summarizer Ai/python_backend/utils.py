@@ -6,10 +6,13 @@ import re
 import string
 import random
 import hashlib
-from typing import List, Dict, Set, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Set, Tuple, Optional
 from datetime import datetime
 import unicodedata
 
+from tokenizer import strip_punctuation
+from script_detector import script_detector, SCRIPT_RANGES
+
 class TextProcessor:
     """Advanced text processing utilities"""
     
@@ -20,7 +23,7 @@ class TextProcessor:
         text = re.sub(r'\s+', ' ', text)
         
         # Remove special characters but keep Indian language characters
-        text = re.sub(r'[^\w\s\u0900-\u097F\u0980-\u09FF\u0C00-\u0C7F\u0B80-\u0BFF\u0600-\u06FF\u0A80-\u0AFF\u0C80-\u0CFF\u0D00-\u0D7F\u0B00-\u0B7F\u0A00-\u0A7F\u0900-\u097F]', ' ', text)
+        text = strip_punctuation(text)
         
         # Normalize unicode
         text = unicodedata.normalize('NFKC', text)
@@ -110,32 +113,12 @@ class TextProcessor:
 class LanguageUtils:
     """Language-specific utilities"""
     
-    SCRIPT_RANGES = {
-        'devanagari': (0x0900, 0x097F),
-        'bengali': (0x0980, 0x09FF),
-        'telugu': (0x0C00, 0x0C7F),
-        'tamil': (0x0B80, 0x0BFF),
-        'gujarati': (0x0A80, 0x0AFF),
-        'kannada': (0x0C80, 0x0CFF),
-        'malayalam': (0x0D00, 0x0D7F),
-        'odia': (0x0B00, 0x0B7F),
-        'gurmukhi': (0x0A00, 0x0A7F),
-        'arabic': (0x0600, 0x06FF)
-    }
+    SCRIPT_RANGES = SCRIPT_RANGES
     
     @staticmethod
-    def detect_script(text: str) -> Dict[str, int]:
+    def detect_script(text: str, sample: bool = False) -> Dict[str, int]:
         """Detect scripts used in text"""
-        script_counts = {script: 0 for script in LanguageUtils.SCRIPT_RANGES}
-        
-        for char in text:
-            code_point = ord(char)
-            for script, (start, end) in LanguageUtils.SCRIPT_RANGES.items():
-                if start <= code_point <= end:
-                    script_counts[script] += 1
-                    break
-        
-        return script_counts
+        return script_detector.histogram(text, sample=sample)
     
     @staticmethod
     def is_rtl_language(language: str) -> bool:
@@ -225,8 +208,8 @@ class SecurityUtils:
     
     @staticmethod
     def rate_limit_key(user_id: str, endpoint: str) -> str:
-        """Generate rate limiting key"""
-        return f"rate_limit:{user_id}:{endpoint}:{datetime.now().strftime('%Y%m%d%H%M')}"
+        """Key of a client's token bucket for an endpoint (buckets refill continuously, so no time window)"""
+        return f"rate_limit:{user_id}:{endpoint}"
 
 class PerformanceUtils:
     """Performance optimization utilities"""
@@ -243,6 +226,25 @@ class PerformanceUtils:
         
         return chunks
     
+    @staticmethod
+    def chunk_spans(spans: Iterable[Tuple[int, int]], max_chars: int) -> Iterator[Tuple[int, int]]:
+        """Group consecutive (start, end) spans, e.g. sentences, into chunks of at most max_chars.
+        
+        A single span longer than max_chars becomes a chunk of its own. Spans are
+        consumed lazily, so a generator of sentence matches is never materialized.
+        """
+        chunk_start = chunk_end = None
+        for start, end in spans:
+            if chunk_start is not None and end - chunk_start > max_chars:
+                yield chunk_start, chunk_end
+                chunk_start = None
+            if chunk_start is None:
+                chunk_start = start
+            chunk_end = end
+        
+        if chunk_start is not None:
+            yield chunk_start, chunk_end
+    
     @staticmethod
     def estimate_processing_time(text: str) -> float:
         """Estimate processing time in seconds"""